@@ -0,0 +1,561 @@
+import math
+import heapq
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+INF = float('inf')
+
+# Zapas (w sekundach) doliczany do górnego ograniczenia biegnącego czasu
+# oczekiwania, pokrywa błędy zaokrągleń czasów zmiennoprzecinkowych
+LUZ_CZASU = 1e-9
+
+# Przepustowość, dla której efektywny rozmiar pliku równa się rzeczywistemu;
+# na szybszym dysku plik "waży" proporcjonalnie mniej
+PREDKOSC_ODNIESIENIA = 25 * 10 ** 6
+
+def _teraz():
+    return time.monotonic()
+
+
+def oblicz_wynik(k, rozmiar_pliku, t):
+    return (k / (rozmiar_pliku + 1)) + math.log(t + 1) / k
+
+
+# Polityki wyboru klienta - wynik pierwszego pliku klienta przy danym czasie
+# oczekiwania t, liczbie klientów z plikami k i liczbie wszystkich klientów n
+def wynik_main(rozmiar_pliku, t, k, n):
+    return oblicz_wynik(k, rozmiar_pliku, t)
+
+
+# Wariant z main_3.py: rozmiar skalowany przez 10^9, k liczone po wszystkich klientach
+def wynik_main_3(rozmiar_pliku, t, k, n):
+    return (n * 10**9 / (rozmiar_pliku + 1)) + math.log(t + 1) / n
+
+
+# Wariant z main_old_1.py: czas oczekiwania nigdy nie jest aktualizowany (t = 0)
+def wynik_main_old_1(rozmiar_pliku, t, k, n):
+    return (n / (rozmiar_pliku + 1)) + math.log(0 + 1) / n
+
+
+# Najdłużej czekający klient jako pierwszy
+def wynik_fifo(rozmiar_pliku, t, k, n):
+    return t
+
+
+# Najmniejszy plik jako pierwszy
+def wynik_sff(rozmiar_pliku, t, k, n):
+    return -rozmiar_pliku
+
+
+POLITYKI = {
+    'main': wynik_main,
+    'main_3': wynik_main_3,
+    'main_old_1': wynik_main_old_1,
+    'fifo': wynik_fifo,
+    'sff': wynik_sff,
+}
+
+
+# Współczynnik przeliczający rozmiar pliku na czas przesyłania na danym dysku
+def wspolczynnik_predkosci(predkosc_przesylania):
+    if predkosc_przesylania is None:
+        return 1.0
+    return PREDKOSC_ODNIESIENIA / predkosc_przesylania
+
+
+# Aukcja liniowa - przegląd wszystkich klientów przy każdym wywołaniu
+def aukcja_liniowa(klienci, predkosc_przesylania=None, polityka=wynik_main):
+    wspolczynnik = wspolczynnik_predkosci(predkosc_przesylania)
+    najlepszy_wynik = None
+    wybrany_klient = None
+    wybrany_plik = None
+
+    # Lista klientów z plikami do przesłania
+    klienci_z_plikami = [klient for klient in klienci if klient.pliki]
+
+    # Liczba klientów biorących udział w aukcji
+    k = len(klienci_z_plikami)
+
+    for klient in klienci_z_plikami:
+        rozmiar_pliku = klient.pliki[0]  # najmniejszy plik
+        t = klient.oblicz_czas_oczekiwania()
+        wynik = polityka(rozmiar_pliku * wspolczynnik, t, k, len(klienci))
+        if najlepszy_wynik is None or wynik > najlepszy_wynik:
+            najlepszy_wynik = wynik
+            wybrany_klient = klient
+            wybrany_plik = rozmiar_pliku
+
+    # Aktualizujemy wynik aukcji dla klienta, który wygrał aukcję
+    if wybrany_klient:
+        wybrany_klient.ostatni_wynik_aukcji = najlepszy_wynik
+        wybrany_klient.pliki.pop(0)  # Usunięcie pliku z listy klienta
+        return wybrany_klient, wybrany_plik
+    else:
+        return None, None
+
+
+# Aukcja wsadowa dla m dysków naraz: wyniki pierwszych plików wszystkich
+# klientów magazynu liczone w jednym przebiegu (wektorowo, gdy jest numpy),
+# zwraca do m par (indeks klienta, wynik) od najlepszej. Każdy klient wygrywa
+# najwyżej raz na rundę, k jest ustalone na całą rundę; przy m = 1 zwycięzca
+# jest ten sam co w aukcji liniowej, remisy rozstrzyga niższy indeks.
+# Wektorowo liczona jest tylko polityka wynik_main, pozostałe polityki
+# przechodzą przez pętlę w czystym Pythonie.
+def aukcja_wsadowa(magazyn, m, predkosc_przesylania=None, wektorowo=True, polityka=wynik_main):
+    wspolczynnik = wspolczynnik_predkosci(predkosc_przesylania)
+    if np is not None and wektorowo and polityka is wynik_main:
+        return _aukcja_wsadowa_wektorowo(magazyn, m, wspolczynnik)
+    indeksy, rozmiary, czasy = magazyn.glowy_kolejek(False)
+    k = len(indeksy)
+    m = min(m, k)
+    if not m:
+        return []
+    n = len(magazyn)
+    najlepsze = heapq.nlargest(m, ((polityka(rozmiar * wspolczynnik, t, k, n), -i)
+                                   for i, rozmiar, t in zip(indeksy, rozmiary, czasy)))
+    return [(-i, wynik) for wynik, i in najlepsze]
+
+
+# Klienci w próbce wyznaczającej próg kandydatów, na jeden przydział rundy
+PROBKA_NA_PRZYDZIAL = 32
+
+
+# Wyniki klientów o indeksach `indeksy` jak w oblicz_wynik (ta sama kolejność
+# działań). Zatrzymane odliczanie (start NaN) daje sam czas zebrany przed zatrzymaniem.
+def _wyniki(magazyn, indeksy, k, wspolczynnik, teraz):
+    czasy = np.fmax(teraz - np.frombuffer(magazyn.czasy_startu)[indeksy], 0.0)
+    czasy += np.frombuffer(magazyn.czasy_zatrzymania)[indeksy]
+    return k / (np.frombuffer(magazyn.glowy)[indeksy] * wspolczynnik + 1) + np.log(czasy + 1) / k
+
+
+# Wersja wektorowa na kolumnach magazynu, bez zbierania klientów z plikami
+# (klient bez plików ma w kolumnie pierwszych plików NaN, więc i wynik NaN).
+# Pełne wyniki liczymy tylko dla próbki (co `krok`-ty klient) i kandydatów:
+# m-ty najlepszy wynik próbki nie przewyższa m-tego najlepszego wyniku
+# wszystkich, a wynik klienta nie przewyższa składnika rozmiaru powiększonego
+# o składnik czasu dla górnego ograniczenia czasów oczekiwania. Stąd próg na
+# rozmiar pierwszego pliku, poszerzony o zapas na zaokrąglenia - nadmiarowi
+# kandydaci odpadają przy porównaniu dokładnych wyników.
+def _aukcja_wsadowa_wektorowo(magazyn, m, wspolczynnik):
+    k = magazyn.z_plikami
+    m = min(m, k)
+    if not m:
+        return []
+    teraz = magazyn.zegar()
+    glowy = np.frombuffer(magazyn.glowy)
+    n = len(glowy)
+
+    krok = max(1, n // (PROBKA_NA_PRZYDZIAL * m))
+    probka = _wyniki(magazyn, slice(0, n, krok), k, wspolczynnik, teraz)
+    probka = probka[~np.isnan(probka)]
+    prog_rozmiaru = math.inf
+    if len(probka) >= m:
+        prog = np.partition(probka, len(probka) - m)[len(probka) - m]
+        najdluzej = np.fmin.reduce(np.frombuffer(magazyn.czasy_startu))
+        najdluzej = 0.0 if math.isnan(najdluzej) else max(teraz - najdluzej, 0.0)
+        najdluzej += np.frombuffer(magazyn.czasy_zatrzymania).max() + LUZ_CZASU
+        skladnik_rozmiaru = prog - math.log(najdluzej + 1) / k
+        if skladnik_rozmiaru > 0 and wspolczynnik > 0:
+            prog_rozmiaru = ((k / skladnik_rozmiaru - 1) / wspolczynnik) * (1 + 1e-9) + 1
+    kandydaci = np.flatnonzero(glowy <= prog_rozmiaru)
+    wyniki = _wyniki(magazyn, kandydaci, k, wspolczynnik, teraz)
+
+    # m najlepszych kandydatów; spośród równych m-temu wynikowi najniższe indeksy
+    if len(wyniki) > m:
+        prog = np.partition(wyniki, len(wyniki) - m)[len(wyniki) - m]
+        lepsze = np.flatnonzero(wyniki > prog)
+        rowne = np.flatnonzero(wyniki == prog)[:m - len(lepsze)]
+        pozycje = np.concatenate((lepsze, rowne))
+    else:
+        pozycje = np.arange(len(wyniki))
+    pozycje = pozycje[np.lexsort((pozycje, -wyniki[pozycje]))]
+    return list(zip(kandydaci[pozycje].tolist(), wyniki[pozycje].tolist()))
+
+
+# Silnik aukcji oparty na przeglądzie liniowym (zachowanie sprzed drzewa
+# turniejowego); obsługuje dowolną politykę wyboru
+class AukcjaLiniowa:
+    def __init__(self, polityka=wynik_main):
+        self.klienci = []
+        self.polityka = polityka
+
+    def dodaj_klienta(self, klient):
+        self.klienci.append(klient)
+
+    def odswiez(self):
+        pass
+
+    def przeprowadz_aukcje(self, predkosc_przesylania=None):
+        return aukcja_liniowa(self.klienci, predkosc_przesylania, self.polityka)
+
+    # Przydziały rozstrzygnięte poza silnikiem (aukcja wsadowa): lista
+    # (indeks klienta, wynik) -> lista (klient, plik)
+    def zdejmij_pliki(self, zwyciezcy):
+        przydzialy = []
+        for i, wynik in zwyciezcy:
+            klient = self.klienci[i]
+            klient.ostatni_wynik_aukcji = wynik
+            przydzialy.append((klient, klient.pliki.pop(0)))
+        return przydzialy
+
+
+# Silnik aukcji liniowej z pamięcią wyników. Składnik rozmiaru k / (rozmiar + 1)
+# zmienia się tylko przy zdjęciu pierwszego pliku klienta, dodaniu klienta
+# i zmianie k, więc jest zapamiętany dla każdego klienta i każdego
+# współczynnika prędkości licytujących dysków. Klient zmieniony od ostatniej
+# aukcji jest tylko oznaczany, a jego pozycje przeliczane dopiero przy następnej
+# aukcji; zmiana k unieważnia całą kolumnę. Składnik czasu log(t + 1) / k liczy
+# się w chwili aukcji z zapamiętanych chwil startu i czasów zebranych przed
+# zatrzymaniem, przy jednym odczycie zegara. Zegar musi być zegarem odliczania
+# klientów (domyślnie zegar magazynu pierwszego dodanego klienta), a po
+# zatrzymaniu lub wznowieniu odliczań klientów trzeba wywołać odswiez().
+# Zwycięzca i remisy (niższy indeks) jak w aukcji liniowej.
+class AukcjaZPamieciaWynikow:
+    def __init__(self, zegar=None, wektorowo=True):
+        self.zegar = zegar
+        self.wektorowo = wektorowo and np is not None
+        self.klienci = []
+        self.k = 0  # liczba klientów z plikami
+        self.glowy = array('d')  # rozmiar pierwszego pliku, INF - klient bez plików
+        self.starty = array('d')  # chwila startu odliczania, NaN - odliczanie zatrzymane
+        self.zatrzymania = array('d')  # czas oczekiwania zebrany przed zatrzymaniem
+        self.skladowe = {}  # współczynnik prędkości -> (k, kolumna składników rozmiaru)
+        self.nieaktualni = set()  # indeksy klientów zmienionych od ostatniej aukcji
+
+    def dodaj_klienta(self, klient):
+        if self.zegar is None:
+            self.zegar = klient.zegar
+        self.klienci.append(klient)
+        self.glowy.append(INF)
+        self.starty.append(math.nan)
+        self.zatrzymania.append(0.0)
+        if klient.pliki:
+            self.k += 1
+        self.nieaktualni.add(len(self.klienci) - 1)
+
+    def odswiez(self):
+        self.nieaktualni.update(range(len(self.klienci)))
+
+    def _czytaj_klienta(self, i):
+        klient = self.klienci[i]
+        self.glowy[i] = klient.pliki[0] if klient.pliki else INF
+        czas_start = klient.czas_start
+        self.starty[i] = math.nan if czas_start is None else czas_start
+        self.zatrzymania[i] = klient.czas_zatrzymania
+
+    def _skladowa(self, glowa, k, wspolczynnik):
+        return -INF if glowa == INF else k / (glowa * wspolczynnik + 1)
+
+    def _przelicz_kolumne(self, wspolczynnik):
+        k = self.k
+        if self.wektorowo:
+            glowy = np.frombuffer(self.glowy)
+            with np.errstate(divide='ignore'):
+                return np.where(glowy == INF, -INF, k / (glowy * wspolczynnik + 1))
+        return array('d', [self._skladowa(glowa, k, wspolczynnik) for glowa in self.glowy])
+
+    # Kolumna składników rozmiaru dla współczynnika prędkości, aktualna dla
+    # bieżącego k. Zmienionych klientów czytamy raz i poprawiamy ich pozycje
+    # we wszystkich kolumnach z tym samym k; pozostałe kolumny są budowane od
+    # nowa dopiero przy aukcji z ich współczynnikiem.
+    def _kolumna(self, wspolczynnik):
+        if self.nieaktualni:
+            for i in self.nieaktualni:
+                self._czytaj_klienta(i)
+            for wspolczynnik_kolumny, (k, kolumna) in self.skladowe.items():
+                if k == self.k and len(kolumna) == len(self.glowy):
+                    for i in self.nieaktualni:
+                        kolumna[i] = self._skladowa(self.glowy[i], k, wspolczynnik_kolumny)
+            self.nieaktualni.clear()
+        wpis = self.skladowe.get(wspolczynnik)
+        if wpis is None or wpis[0] != self.k or len(wpis[1]) != len(self.glowy):
+            wpis = (self.k, self._przelicz_kolumne(wspolczynnik))
+            self.skladowe[wspolczynnik] = wpis
+        return wpis[1]
+
+    def _najlepszy(self, kolumna, teraz):
+        k = self.k
+        if self.wektorowo:
+            starty = np.frombuffer(self.starty)
+            zatrzymania = np.frombuffer(self.zatrzymania)
+            czasy = np.where(np.isnan(starty), zatrzymania, teraz - starty + zatrzymania)
+            wyniki = kolumna + np.log(czasy + 1) / k
+            i = int(np.argmax(wyniki))
+            return i, float(wyniki[i])
+        log = math.log
+        najlepszy_wynik = -INF
+        najlepszy_indeks = None
+        for i, (skladowa, czas_start, czas_zatrzymania) in enumerate(zip(kolumna, self.starty, self.zatrzymania)):
+            if skladowa == -INF:
+                continue
+            t = czas_zatrzymania if czas_start != czas_start else teraz - czas_start + czas_zatrzymania
+            wynik = skladowa + log(t + 1) / k
+            if wynik > najlepszy_wynik:
+                najlepszy_wynik = wynik
+                najlepszy_indeks = i
+        return najlepszy_indeks, najlepszy_wynik
+
+    def _zdejmij(self, i, wynik):
+        klient = self.klienci[i]
+        plik = klient.pliki.pop(0)
+        klient.ostatni_wynik_aukcji = wynik
+        if not klient.pliki:
+            self.k -= 1
+        self.nieaktualni.add(i)
+        return klient, plik
+
+    def przeprowadz_aukcje(self, predkosc_przesylania=None):
+        if not self.k:
+            return None, None
+        kolumna = self._kolumna(wspolczynnik_predkosci(predkosc_przesylania))
+        i, wynik = self._najlepszy(kolumna, self.zegar())
+        return self._zdejmij(i, wynik)
+
+    # Przydziały rozstrzygnięte poza silnikiem (aukcja wsadowa): lista
+    # (indeks klienta, wynik) -> lista (klient, plik)
+    def zdejmij_pliki(self, zwyciezcy):
+        return [self._zdejmij(i, wynik) for i, wynik in zwyciezcy]
+
+
+# Silnik aukcji oparty na drzewie turniejowym.
+# Liście to klienci w kolejności dodania, węzły wewnętrzne przechowują najmniejszy
+# rozmiar pierwszego pliku i największy klucz czasu oczekiwania w poddrzewie.
+# Z obu wartości wynika górne ograniczenie wyniku poddrzewa, więc zwycięzcę
+# znajdujemy przeszukiwaniem "najpierw najlepszy", odcinając poddrzewa, które
+# nie mogą pobić bieżącego wyniku. Remisy rozstrzyga niższy indeks klienta,
+# tak samo jak w aukcji liniowej.
+class AukcjaTurniejowa:
+    def __init__(self, zegar=None):
+        self.zegar = zegar or _teraz
+        self.klienci = []
+        self.k = 0  # liczba klientów z plikami
+        self.pojemnosc = 1
+        self.rozmiary = [INF, INF]
+        # Dla klientów z biegnącym odliczaniem klucz = czas oczekiwania - chwila
+        # pomiaru; czas rośnie co najwyżej tak szybko jak zegar, więc
+        # t(teraz) <= klucz + teraz. Gdy zegar silnika jest zegarem odliczania klientów
+        # (ZegarSymulacji serwera), nierówność jest równością również w pauzie.
+        # Klienci z zatrzymanym odliczaniem mają stały czas.
+        self.klucze = [-INF, -INF]
+        self.stale = [-INF, -INF]
+        # Magazyn, którego wiersze 0..n-1 są kolejnymi klientami silnika (jak
+        # w Serwer); pozwala przebudować drzewo wektorowo z kolumn magazynu
+        self.magazyn = None
+        self.jeden_magazyn = True
+        # Liście klientów, którym przydział wsadowy zdjął plik; drzewo przeliczamy
+        # dopiero przed kolejną aukcją silnika - przy samych przydziałach
+        # wsadowych nie kosztuje nic
+        self.brudne = set()
+
+    def _sledz_magazyn(self, klient):
+        magazyn = getattr(klient, 'magazyn', None)
+        if not self.klienci:
+            self.magazyn = magazyn
+        if magazyn is None or magazyn is not self.magazyn or klient.indeks != len(self.klienci):
+            self.jeden_magazyn = False
+
+    def dodaj_klienta(self, klient):
+        self._sledz_magazyn(klient)
+        self.klienci.append(klient)
+        if len(self.klienci) > self.pojemnosc:
+            self.pojemnosc *= 2
+            self.odswiez()
+        else:
+            if klient.pliki:
+                self.k += 1
+            self._ustaw_lisc(len(self.klienci) - 1, self.zegar())
+
+    # Wielu klientów naraz (np. wczytanych z zapisanego stanu) - jedna
+    # przebudowa drzewa zamiast przeliczania ścieżki dla każdego liścia
+    def dodaj_klientow(self, klienci):
+        for klient in klienci:
+            if self.jeden_magazyn:
+                self._sledz_magazyn(klient)
+            self.klienci.append(klient)
+        while len(self.klienci) > self.pojemnosc:
+            self.pojemnosc *= 2
+        self.odswiez()
+
+    # Pełna przebudowa drzewa - wymagana po zatrzymaniu lub wznowieniu odliczania
+    def odswiez(self):
+        self.brudne = set()
+        teraz = self.zegar()
+        if np is not None and self.jeden_magazyn and self.klienci:
+            self._odswiez_wektorowo(teraz)
+            return
+        self.rozmiary = [INF] * (2 * self.pojemnosc)
+        self.klucze = [-INF] * (2 * self.pojemnosc)
+        self.stale = [-INF] * (2 * self.pojemnosc)
+        self.k = 0
+        for i, klient in enumerate(self.klienci):
+            if klient.pliki:
+                self.k += 1
+                self._zapisz_lisc(i, klient, teraz, klient.oblicz_czas_oczekiwania())
+        self._przelicz_poziomy(self.rozmiary, self.klucze, self.stale,
+                               lambda a, b: list(map(min, a, b)), lambda a, b: list(map(max, a, b)))
+
+    # Liście prosto z kolumn magazynu - czasy oczekiwania jak w
+    # Klient.oblicz_czas_oczekiwania, klucze jak w _zapisz_lisc
+    def _odswiez_wektorowo(self, teraz):
+        magazyn = self.magazyn
+        n = len(self.klienci)
+        poczatki = np.frombuffer(magazyn.poczatki, dtype=np.int64)[:n]
+        z_plikami = np.frombuffer(magazyn.konce, dtype=np.int64)[:n] > poczatki
+        starty = np.frombuffer(magazyn.czasy_startu)[:n]
+        zatrzymania = np.frombuffer(magazyn.czasy_zatrzymania)[:n]
+        odlicza = ~np.isnan(starty)
+        czasy = np.where(odlicza, magazyn.zegar() - starty + zatrzymania, zatrzymania)
+        rozmiary = np.full(2 * self.pojemnosc, INF)
+        klucze = np.full(2 * self.pojemnosc, -INF)
+        stale = np.full(2 * self.pojemnosc, -INF)
+        liscie = slice(self.pojemnosc, self.pojemnosc + n)
+        if z_plikami.any():
+            glowy = np.frombuffer(magazyn.rozmiary, dtype=np.int64)[np.where(z_plikami, poczatki, 0)]
+            rozmiary[liscie] = np.where(z_plikami, glowy, INF)
+        klucze[liscie] = np.where(z_plikami & odlicza, czasy - teraz, -INF)
+        stale[liscie] = np.where(z_plikami & ~odlicza, czasy, -INF)
+        self._przelicz_poziomy(rozmiary, klucze, stale, np.minimum, np.maximum)
+        self.rozmiary, self.klucze, self.stale = rozmiary.tolist(), klucze.tolist(), stale.tolist()
+        self.k = int(np.count_nonzero(z_plikami))
+
+    # Węzły wewnętrzne poziom po poziomie, od liści w górę
+    def _przelicz_poziomy(self, rozmiary, klucze, stale, minimum, maksimum):
+        poziom = self.pojemnosc
+        while poziom > 1:
+            polowa = poziom // 2
+            rozmiary[polowa:poziom] = minimum(rozmiary[poziom:2 * poziom:2], rozmiary[poziom + 1:2 * poziom:2])
+            klucze[polowa:poziom] = maksimum(klucze[poziom:2 * poziom:2], klucze[poziom + 1:2 * poziom:2])
+            stale[polowa:poziom] = maksimum(stale[poziom:2 * poziom:2], stale[poziom + 1:2 * poziom:2])
+            poziom = polowa
+
+    def _przelicz_wezel(self, wezel):
+        lewy, prawy = 2 * wezel, 2 * wezel + 1
+        self.rozmiary[wezel] = min(self.rozmiary[lewy], self.rozmiary[prawy])
+        self.klucze[wezel] = max(self.klucze[lewy], self.klucze[prawy])
+        self.stale[wezel] = max(self.stale[lewy], self.stale[prawy])
+
+    def _zapisz_lisc(self, i, klient, teraz, t):
+        lisc = self.pojemnosc + i
+        self.rozmiary[lisc] = klient.pliki[0]
+        if klient.czy_odlicza():
+            self.klucze[lisc] = t - teraz
+            self.stale[lisc] = -INF
+        else:
+            self.klucze[lisc] = -INF
+            self.stale[lisc] = t
+
+    def _ustaw_lisc(self, i, teraz, t=None):
+        klient = self.klienci[i]
+        lisc = self.pojemnosc + i
+        if klient.pliki:
+            if t is None:
+                t = klient.oblicz_czas_oczekiwania()
+            self._zapisz_lisc(i, klient, teraz, t)
+        else:
+            self.rozmiary[lisc] = INF
+            self.klucze[lisc] = -INF
+            self.stale[lisc] = -INF
+        wezel = lisc // 2
+        while wezel:
+            self._przelicz_wezel(wezel)
+            wezel //= 2
+
+    # Przydziały rozstrzygnięte poza silnikiem (aukcja wsadowa): lista
+    # (indeks klienta, wynik) -> lista (klient, plik). Liście tylko oznaczamy.
+    def zdejmij_pliki(self, zwyciezcy):
+        przydzialy = []
+        if self.jeden_magazyn:
+            # Wiersze magazynu to klienci silnika - zdejmujemy wprost z kolumn,
+            # a opróżnionych klientów liczy magazyn
+            magazyn = self.magazyn
+            z_plikami = magazyn.z_plikami
+            for i, wynik in zwyciezcy:
+                przydzialy.append((self.klienci[i], magazyn.usun_plik(i)))
+                magazyn.wyniki_aukcji[i] = wynik
+            self.k -= z_plikami - magazyn.z_plikami
+            self.brudne.update(i for i, _ in zwyciezcy)
+            return przydzialy
+        for i, wynik in zwyciezcy:
+            klient = self.klienci[i]
+            pliki = klient.pliki
+            przydzialy.append((klient, pliki.pop(0)))
+            klient.ostatni_wynik_aukcji = wynik
+            if not pliki:
+                self.k -= 1
+        self.brudne.update(i for i, _ in zwyciezcy)
+        return przydzialy
+
+    # Przelicza oznaczone liście i - raz, poziom po poziomie - ich przodków;
+    # gdy oznaczonych jest wiele, taniej przebudować całe drzewo
+    def _przelicz_brudne(self):
+        if len(self.brudne) * 8 > len(self.klienci):
+            self.odswiez()
+            return
+        teraz = self.zegar()
+        wezly = set()
+        for i in self.brudne:
+            klient = self.klienci[i]
+            lisc = self.pojemnosc + i
+            if klient.pliki:
+                self._zapisz_lisc(i, klient, teraz, klient.oblicz_czas_oczekiwania())
+            else:
+                self.rozmiary[lisc] = INF
+                self.klucze[lisc] = -INF
+                self.stale[lisc] = -INF
+            wezly.add(lisc // 2)
+        self.brudne = set()
+        while wezly:
+            for wezel in wezly:
+                self._przelicz_wezel(wezel)
+            wezly = {wezel // 2 for wezel in wezly if wezel > 1}
+
+    def _ograniczenie(self, wezel, k, teraz, wspolczynnik):
+        t = max(self.klucze[wezel] + teraz + LUZ_CZASU, self.stale[wezel], 0)
+        return oblicz_wynik(k, self.rozmiary[wezel] * wspolczynnik, t)
+
+    def przeprowadz_aukcje(self, predkosc_przesylania=None):
+        if not self.k:
+            return None, None
+        if self.brudne:
+            self._przelicz_brudne()
+        k = self.k
+        teraz = self.zegar()
+        wspolczynnik = wspolczynnik_predkosci(predkosc_przesylania)
+
+        najlepszy_wynik = -1
+        najlepszy_indeks = None
+        zmierzone = []
+        kolejka = [(-self._ograniczenie(1, k, teraz, wspolczynnik), 1)]
+        while kolejka:
+            ograniczenie, wezel = heapq.heappop(kolejka)
+            if -ograniczenie < najlepszy_wynik:
+                break
+            if wezel >= self.pojemnosc:
+                i = wezel - self.pojemnosc
+                klient = self.klienci[i]
+                t = klient.oblicz_czas_oczekiwania()
+                zmierzone.append((i, t))
+                wynik = oblicz_wynik(k, klient.pliki[0] * wspolczynnik, t)
+                if wynik > najlepszy_wynik or (wynik == najlepszy_wynik and i < najlepszy_indeks):
+                    najlepszy_wynik = wynik
+                    najlepszy_indeks = i
+                continue
+            for dziecko in (2 * wezel, 2 * wezel + 1):
+                if self.rozmiary[dziecko] != INF:
+                    heapq.heappush(kolejka, (-self._ograniczenie(dziecko, k, teraz, wspolczynnik), dziecko))
+
+        wybrany_klient = self.klienci[najlepszy_indeks]
+        wybrany_plik = wybrany_klient.pliki.pop(0)
+        wybrany_klient.ostatni_wynik_aukcji = najlepszy_wynik
+        if not wybrany_klient.pliki:
+            self.k -= 1
+
+        # Zmierzone czasy zawężają klucze odwiedzonych liści
+        for i, t in zmierzone:
+            self._ustaw_lisc(i, teraz, t)
+        return wybrany_klient, wybrany_plik
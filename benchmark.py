@@ -0,0 +1,1355 @@
+import argparse
+import asyncio
+import copy
+import json
+import filecmp
+import logging
+import gc
+import itertools
+import math
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.request
+from collections import Counter
+
+from aukcja import (AukcjaLiniowa, AukcjaTurniejowa, AukcjaZPamieciaWynikow, POLITYKI, aukcja_liniowa,
+                    aukcja_wsadowa)
+from magazyn import MagazynKlientow, ZegarSymulacji, np
+from dziennik import DziennikZdarzen, czytaj_dziennik
+from metryki import Histogram, Licznik, MetrykiSerwera, ZapisMigawek
+from obciazenie import (RozkladJednostajny, RozkladLogNormalny, RozkladPareto, przybycia_impulsowe,
+                        przybycia_poissona, srednia_intensywnosc_impulsowa, strumien_klientow, zasil_serwer)
+from main import Klient, Dysk, Serwer, PROFILE_DYSKOW
+from partycje import AukcjaPartycjonowana
+from przesylanie import KopiaPliku, KopiaZeroKopii
+from serwer_async import SerwerAsync
+from siec import GOTOWE, ODRZUCONO, PRZYJETO, ZAKONCZENIE, PolaczenieProducenta, WatekWejscia
+from slad import Slad, odtworz, percentyl, podsumuj, porownaj_ze_wzorcem, wczytaj_slad
+from stan import ZapisStanu, sciezka_rozmiarow, wczytaj_stan
+from symulacja_zdarzeniowa import SymulacjaZdarzeniowa
+
+
+# Klienci z zamrożonym czasem oczekiwania (odliczanie zatrzymane), dzięki czemu
+# oba silniki aukcji widzą identyczne wartości t
+def generuj_klientow(liczba, pierwszy_id=1):
+    klienci = []
+    for i in range(liczba):
+        klient = Klient(pierwszy_id + i)
+        klient.czas_zatrzymania = random.uniform(0, 3600)
+        klienci.append(klient)
+    return klienci
+
+
+# Silniki porównywane z aukcją liniową: nazwa -> fabryka silnika
+SILNIKI = {
+    "turniejowa": lambda: AukcjaTurniejowa(zegar=lambda: 0.0),
+    "z pamięcią wyników": lambda: AukcjaZPamieciaWynikow(zegar=lambda: 0.0),
+    "z pamięcią wyników, bez numpy": lambda: AukcjaZPamieciaWynikow(zegar=lambda: 0.0, wektorowo=False),
+}
+
+
+def zmierz_aukcje(liczba_klientow, liczba_aukcji, ziarno):
+    random.seed(ziarno)
+    klienci = generuj_klientow(liczba_klientow)
+    dysk = Dysk(0, None)
+    kopie = {nazwa: copy.deepcopy(klienci) for nazwa in SILNIKI}
+
+    start = time.perf_counter()
+    for _ in range(liczba_aukcji):
+        dysk.przeprowadz_aukcje(klienci)
+    czas_liniowy = (time.perf_counter() - start) / liczba_aukcji
+    wyniki = [f"liniowa {czas_liniowy * 1e6:.1f} µs/aukcję"]
+
+    for nazwa, fabryka in SILNIKI.items():
+        silnik = fabryka()
+        for klient in kopie[nazwa]:
+            silnik.dodaj_klienta(klient)
+        silnik.przeprowadz_aukcje()  # pierwsza aukcja wypełnia pamięć wyników
+        start = time.perf_counter()
+        for _ in range(liczba_aukcji):
+            silnik.przeprowadz_aukcje()
+        czas = (time.perf_counter() - start) / liczba_aukcji
+        wyniki.append(f"{nazwa} {czas * 1e6:.1f} µs/aukcję")
+    print(f"{liczba_klientow} klientów: " + ", ".join(wyniki))
+
+
+# Ruch z kilku dni: klienci przybywają losowo, co dobę jedna godzina pauzy
+def przebieg_symulacji(liczba_klientow, dni, ziarno):
+    symulacja = SymulacjaZdarzeniowa(ziarno=ziarno)
+    los = random.Random(ziarno)
+    horyzont = dni * 24 * 3600
+    symulacja.rozpocznij_symulacje(0.0)
+    for _ in range(liczba_klientow):
+        symulacja.dodaj_klienta(los.uniform(0, horyzont))
+    for dzien in range(dni):
+        symulacja.zatrzymaj_symulacje(dzien * 24 * 3600 + 12 * 3600)
+        symulacja.rozpocznij_symulacje(dzien * 24 * 3600 + 13 * 3600)
+    return symulacja.uruchom(), symulacja.czas
+
+
+def zmierz_symulacje(liczba_klientow, dni, ziarno):
+    start = time.perf_counter()
+    zakonczenia, czas_symulacji = przebieg_symulacji(liczba_klientow, dni, ziarno)
+    czas_rzeczywisty = time.perf_counter() - start
+    powtorka, _ = przebieg_symulacji(liczba_klientow, dni, ziarno)
+    if powtorka != zakonczenia:
+        print("Symulacja niedeterministyczna dla tego samego ziarna")
+        return False
+    print(f"{liczba_klientow} klientów, {len(zakonczenia)} plików: {czas_symulacji / 3600:.1f} h symulacji "
+          f"w {czas_rzeczywisty:.2f} s")
+    return True
+
+
+# Silnik aukcji zliczający czas procesora zużyty na aukcje i zapamiętujący
+# chwilę ostatniego przydziału pliku
+class MierzonaAukcja:
+    def __init__(self, silnik):
+        self.silnik = silnik
+        self.liczba_aukcji = 0
+        self.czas_procesora = 0
+        self.ostatni_przydzial = None
+
+    def dodaj_klienta(self, klient):
+        self.silnik.dodaj_klienta(klient)
+
+    def odswiez(self):
+        self.silnik.odswiez()
+
+    def przeprowadz_aukcje(self, predkosc_przesylania=None):
+        start = time.process_time_ns()
+        wynik = self.silnik.przeprowadz_aukcje(predkosc_przesylania)
+        self.czas_procesora += time.process_time_ns() - start
+        self.liczba_aukcji += 1
+        if wynik[0]:
+            self.ostatni_przydzial = time.perf_counter()
+        return wynik
+
+
+# Czas od dodania klienta do podjęcia jego pliku przez bezczynny dysk
+def zmierz_podjecie_pracy(liczba_prob, ziarno):
+    def nowy_serwer():
+        serwer = Serwer(MierzonaAukcja(AukcjaTurniejowa()), ziarno)
+        for dysk in serwer.dyski:
+            dysk.predkosc_przesylania = 10 ** 12  # przesyłanie praktycznie natychmiastowe
+            dysk.rozmiar_porcji = 10 ** 12  # cały plik w jednej porcji
+        serwer.rozpocznij_symulacje()
+        return serwer
+
+    # Chwilę przydziału zapisuje sam wątek dysku, więc pomiar nie zależy od
+    # tego, kiedy wątek główny odzyska GIL
+    def czekaj_na_podjecie(serwer):
+        while serwer.aukcja.ostatni_przydzial is None:
+            time.sleep(0.001)
+        return serwer.aukcja.ostatni_przydzial
+
+    def czekaj_na_bezczynnosc(serwer):
+        while not serwer.czy_zakonczyc() or any(dysk.aktywny_plik for dysk in serwer.dyski):
+            time.sleep(0.001)
+
+    dodanie, wznowienie = [], []
+    serwer = nowy_serwer()
+    for _ in range(liczba_prob):
+        czekaj_na_bezczynnosc(serwer)
+        serwer.aukcja.ostatni_przydzial = None
+        start = time.perf_counter()
+        serwer.dodaj_klienta()
+        dodanie.append(czekaj_na_podjecie(serwer) - start)
+
+    for _ in range(liczba_prob):
+        czekaj_na_bezczynnosc(serwer)
+        serwer.zatrzymaj_symulacje()
+        serwer.dodaj_klienta()
+        serwer.aukcja.ostatni_przydzial = None
+        start = time.perf_counter()
+        serwer.rozpocznij_symulacje()
+        wznowienie.append(czekaj_na_podjecie(serwer) - start)
+
+    for nazwa, pomiary in (("po dodaniu klienta", dodanie), ("po wznowieniu", wznowienie)):
+        pomiary.sort()
+        print(f"Podjęcie pracy {nazwa}: mediana {pomiary[len(pomiary) // 2] * 1e3:.3f} ms, "
+              f"maks. {pomiary[-1] * 1e3:.3f} ms")
+
+
+# Obciążenie jako lista (chwila przybycia, rozmiary plików). "paczka" - wszyscy
+# klienci na starcie, "poisson" - przybycia wykładnicze przy zadanym obciążeniu dysków
+def generuj_obciazenie(ksztalt, liczba_klientow, ziarno, predkosci_dyskow, obciazenie=0.9):
+    los = random.Random(ziarno)
+    sredni_klient = 5.5 * (1 * 10**6 + 512 * 10**6) / 2  # średnia z Klient.generuj_pliki
+    srednia_przerwa = sredni_klient / sum(predkosci_dyskow) / obciazenie
+    czas = 0.0
+    klienci = []
+    for _ in range(liczba_klientow):
+        if ksztalt == "poisson":
+            czas += los.expovariate(1 / srednia_przerwa)
+        klienci.append((czas, Klient(0, los=los).pliki))
+    return klienci
+
+
+# Indeks sprawiedliwości Jaina: 1 - wszyscy równo, 1/n - jeden klient bierze wszystko
+def indeks_jaina(wartosci):
+    suma_kwadratow = sum(x * x for x in wartosci)
+    if not suma_kwadratow:
+        return 1.0
+    return sum(wartosci) ** 2 / (len(wartosci) * suma_kwadratow)
+
+
+def uruchom_polityke(nazwa, obciazenie, predkosci_dyskow):
+    if nazwa == "main":
+        silnik = MierzonaAukcja(None)
+        symulacja = SymulacjaZdarzeniowa(predkosci_dyskow, silnik)
+        silnik.silnik = AukcjaTurniejowa(zegar=symulacja.zegar)
+    else:
+        silnik = MierzonaAukcja(AukcjaLiniowa(POLITYKI[nazwa]))
+        symulacja = SymulacjaZdarzeniowa(predkosci_dyskow, silnik)
+    symulacja.rozpocznij_symulacje(0.0)
+    for czas, pliki in obciazenie:
+        symulacja.dodaj_klienta(czas, pliki)
+
+    start = time.perf_counter()
+    zakonczenia = symulacja.uruchom()
+    czas_rzeczywisty = time.perf_counter() - start
+
+    # Czas oczekiwania pliku: od przybycia klienta do przydziału pliku dyskowi
+    oczekiwania = sorted(z.czas_przydzialu - symulacja.czasy_przybycia[z.id_klienta] for z in zakonczenia)
+    na_klienta = {}
+    for z in zakonczenia:
+        na_klienta.setdefault(z.id_klienta, []).append(z.czas_przydzialu - symulacja.czasy_przybycia[z.id_klienta])
+    czas_trwania = max(z.czas for z in zakonczenia) - min(symulacja.czasy_przybycia.values())
+    return {
+        "polityka": nazwa,
+        "silnik": type(silnik.silnik).__name__,
+        "pliki": len(zakonczenia),
+        "czas_trwania_s": czas_trwania,
+        "przepustowosc_B_s": sum(z.rozmiar for z in zakonczenia) / czas_trwania,
+        "oczekiwanie_srednie_s": sum(oczekiwania) / len(oczekiwania),
+        "oczekiwanie_p50_s": percentyl(oczekiwania, 50),
+        "oczekiwanie_p99_s": percentyl(oczekiwania, 99),
+        "oczekiwanie_max_s": oczekiwania[-1],
+        "sprawiedliwosc_jaina": indeks_jaina([sum(w) / len(w) for w in na_klienta.values()]),
+        "cpu_na_aukcje_us": silnik.czas_procesora / max(silnik.liczba_aukcji, 1) / 1e3,
+        "aukcje": silnik.liczba_aukcji,
+        "czas_rzeczywisty_s": czas_rzeczywisty,
+    }
+
+
+def porownaj_polityki(polityki, ksztalty, liczby_klientow, ziarno, predkosci_dyskow):
+    wyniki = []
+    for ksztalt in ksztalty:
+        for liczba_klientow in liczby_klientow:
+            obciazenie = generuj_obciazenie(ksztalt, liczba_klientow, ziarno, predkosci_dyskow)
+            for nazwa in polityki:
+                wynik = uruchom_polityke(nazwa, obciazenie, predkosci_dyskow)
+                wynik.update(obciazenie=ksztalt, klienci=liczba_klientow)
+                wyniki.append(wynik)
+                print(f"{ksztalt:8} {liczba_klientow:6} {nazwa:10} "
+                      f"{wynik['przepustowosc_B_s'] / 10**6:8.1f} MB/s  "
+                      f"p99 {wynik['oczekiwanie_p99_s']:10.1f} s  "
+                      f"Jain {wynik['sprawiedliwosc_jaina']:.3f}  "
+                      f"{wynik['cpu_na_aukcje_us']:8.1f} µs/aukcję", file=sys.stderr)
+    return {"ziarno": ziarno, "predkosci_dyskow": predkosci_dyskow, "wyniki": wyniki}
+
+
+# Rzeczywiste kopiowanie pliku porcjami przy ograniczonej przepustowości dysku
+def zmierz_przesylanie(rozmiar, predkosc, rozmiar_porcji):
+    with tempfile.TemporaryDirectory() as katalog:
+        zrodlo = os.path.join(katalog, "zrodlo")
+        cel = os.path.join(katalog, "cel")
+        with open(zrodlo, "wb") as plik:
+            plik.write(os.urandom(rozmiar))
+
+        dysk = Dysk(0, None, predkosc, rozmiar_porcji)
+        start = time.perf_counter()
+        dysk.przeslij_plik(rozmiar, KopiaPliku(zrodlo, cel))
+        czas = time.perf_counter() - start
+        zgodny = filecmp.cmp(zrodlo, cel, shallow=False)
+
+    print(f"{rozmiar / 10**6:.0f}MB w porcjach {rozmiar_porcji // 1024}KB przy {predkosc / 10**6:.0f}MB/s: "
+          f"{czas:.3f} s (oczekiwano {rozmiar / predkosc:.3f} s), {rozmiar / czas / 10**6:.1f} MB/s, "
+          f"kopia {'zgodna' if zgodny else 'NIEZGODNA'}")
+    return zgodny
+
+
+# Kopiowanie przez bufor w Pythonie w porównaniu z metodami bez buforów.
+# Prędkość 0 oznacza brak ograniczenia przepustowości dysku.
+def zmierz_kopiowanie(rozmiary, predkosc, rozmiar_porcji, powtorzenia):
+    metody = [("read/write", KopiaPliku)] + [
+        (metoda, lambda zrodlo, cel, rozmiar, metoda=metoda: KopiaZeroKopii(zrodlo, cel, rozmiar, metoda))
+        for metoda in KopiaZeroKopii.METODY if metoda == "mmap" or hasattr(os, metoda)]
+    dysk = Dysk(0, None, predkosc or 10**15, rozmiar_porcji)
+    zgodne = True
+    with tempfile.TemporaryDirectory() as katalog:
+        zrodlo = os.path.join(katalog, "zrodlo")
+        cel = os.path.join(katalog, "cel")
+        for rozmiar in rozmiary:
+            with open(zrodlo, "wb") as plik:
+                plik.write(os.urandom(rozmiar))
+            wiersz = []
+            for nazwa, kopia in metody:
+                czasy = []
+                for _ in range(powtorzenia):
+                    start = time.perf_counter()
+                    dysk.przeslij_plik(rozmiar, kopia(zrodlo, cel, rozmiar))
+                    czasy.append(time.perf_counter() - start)
+                    zgodne &= filecmp.cmp(zrodlo, cel, shallow=False)
+                    os.remove(cel)
+                wiersz.append(f"{nazwa} {rozmiar / min(czasy) / 10**6:.0f} MB/s")
+            print(f"{rozmiar / 10**6:.0f}MB: " + ", ".join(wiersz))
+    print(f"Kopie {'zgodne' if zgodne else 'NIEZGODNE'} ze źródłem")
+    return zgodne
+
+
+# Pamięć zajmowana przez klientów i ich pliki w kolumnowym magazynie
+def zmierz_pamiec(liczba_klientow, ziarno):
+    los = random.Random(ziarno)
+    gc.collect()
+    tracemalloc.start()
+    magazyn = MagazynKlientow()
+    klienci = [Klient(i + 1, los=los, magazyn=magazyn) for i in range(liczba_klientow)]
+    for klient in klienci:
+        klient.rozpocznij_odliczanie()
+    gc.collect()
+    zajete = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    pliki = len(magazyn.rozmiary)
+    print(f"{liczba_klientow} klientów, {pliki} plików: {zajete / liczba_klientow:.0f} B/klienta "
+          f"(tablice magazynu {magazyn.rozmiar_w_pamieci() / liczba_klientow:.0f} B/klienta, "
+          f"{zajete / pliki:.0f} B/plik łącznie)")
+
+    # Pojedyncze zagęszczenie przepisuje całą tablicę rozmiarów pod blokadą
+    # harmonogramu - najdłuższa przerwa, jaką może wywołać zdjęcie pliku
+    start = time.perf_counter()
+    magazyn.zagesc()
+    print(f"Zagęszczenie {pliki} plików: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    # Zdjęcie wszystkich plików - magazyn zagęszcza tablicę rozmiarów
+    start = time.perf_counter()
+    for klient in klienci:
+        while klient.pliki:
+            klient.pliki.pop(0)
+    print(f"Zdjęcie {pliki} plików: {(time.perf_counter() - start) / pliki * 1e6:.2f} µs/plik, "
+          f"pozostało {len(magazyn.rozmiary)} pozycji w tablicy rozmiarów")
+
+
+# Pauza i wznowienie przestawiają tylko zegar symulacji - koszt nie zależy
+# od liczby klientów, a czas oczekiwania to dokładnie czas aktywnej symulacji
+def zmierz_pauze(liczby_klientow, cykle, ziarno):
+    czas = [0.0]
+    zegar = ZegarSymulacji(lambda: czas[0], jednostka=1.0, wstrzymany=True)
+    klient = Klient(1, magazyn=MagazynKlientow(zegar))
+    klient.rozpocznij_odliczanie()
+    aktywny = 0.0
+    for start, koniec in ((10.0, 25.0), (40.0, 41.5), (60.0, 90.0)):
+        czas[0] = start
+        zegar.wznow()
+        czas[0] = koniec
+        zegar.zatrzymaj()
+        aktywny += koniec - start
+    czas[0] = 100.0
+    if klient.oblicz_czas_oczekiwania() != aktywny:
+        print(f"Czas oczekiwania {klient.oblicz_czas_oczekiwania()} s, oczekiwano {aktywny} s")
+        return False
+    print(f"Czas oczekiwania po 3 pauzach: {aktywny} s, zgodny z czasem aktywnej symulacji")
+
+    for liczba in liczby_klientow:
+        serwer = Serwer(ziarno=ziarno)
+        for _ in range(liczba):
+            serwer.dodaj_klienta()
+        serwer.rozpocznij_symulacje()
+        start = time.perf_counter()
+        for _ in range(cykle):
+            serwer.zatrzymaj_symulacje()
+            serwer.rozpocznij_symulacje()
+        cykl = (time.perf_counter() - start) / cykle
+        print(f"{liczba} klientów: pauza i wznowienie {cykl * 1e6:.1f} µs")
+        serwer.zatrzymaj_symulacje()
+    return True
+
+
+# Aukcja partycjonowana między procesy: zgodność z aukcją liniową i skalowanie
+# czasu aukcji z liczbą procesów
+def zmierz_partycje(liczba_klientow, liczby_procesow, aukcje, ziarno):
+    random.seed(ziarno)
+    klienci_wzorcowi = generuj_klientow(300)
+    with AukcjaPartycjonowana(max(liczby_procesow)) as silnik:
+        for klient in copy.deepcopy(klienci_wzorcowi):
+            silnik.dodaj_klienta(klient)
+        for runda in itertools.count():
+            predkosc = list(PROFILE_DYSKOW.values())[runda % len(PROFILE_DYSKOW)]
+            wzorzec_klient, wzorzec_plik = aukcja_liniowa(klienci_wzorcowi, predkosc)
+            klient, plik = silnik.przeprowadz_aukcje(predkosc)
+            wzorzec = (wzorzec_klient.id_klienta, wzorzec_plik) if wzorzec_klient else None
+            wynik = (klient.id_klienta, plik) if klient else None
+            if wzorzec != wynik:
+                print(f"Aukcja partycjonowana, runda {runda}: oczekiwano {wzorzec}, otrzymano {wynik}")
+                return False
+            if wzorzec is None:
+                break
+    print(f"Parytet aukcji partycjonowanej ({max(liczby_procesow)} procesów): {runda} aukcji")
+
+    zegar = ZegarSymulacji()
+    magazyn_klientow = MagazynKlientow(zegar)
+    los = random.Random(ziarno)
+    klienci = [Klient(i + 1, los=los, magazyn=magazyn_klientow) for i in range(liczba_klientow)]
+    for klient in klienci:
+        klient.rozpocznij_odliczanie()
+    # Przyspieszenie ma sens tylko do liczby rdzeni maszyny
+    print(f"Rdzenie procesora: {os.cpu_count()}")
+    pierwszy = None
+    for liczba in liczby_procesow:
+        with AukcjaPartycjonowana(liczba, pojemnosc=liczba_klientow) as silnik:
+            for klient in klienci:
+                silnik.dodaj_klienta(klient)
+            silnik.przeprowadz_aukcje()  # procesy gotowe do pracy
+            start = time.perf_counter()
+            for _ in range(aukcje):
+                silnik.przeprowadz_aukcje(PROFILE_DYSKOW['hdd'])
+            czas = (time.perf_counter() - start) / aukcje
+        pierwszy = pierwszy or czas
+        print(f"{liczba_klientow} klientów, {liczba} procesów: {czas * 1e3:.2f} ms/aukcję, "
+              f"przyspieszenie {pierwszy / czas:.2f}x")
+    return True
+
+
+# Pamięć rezydentna procesu (Linux), do porównania wątków i zadań
+def pamiec_rezydentna():
+    return pamiec_procesu()[0]
+
+
+# Pamięć rezydentna i wirtualna procesu w bajtach (Linux)
+def pamiec_procesu():
+    pamiec = {}
+    with open("/proc/self/status") as plik:
+        for wiersz in plik:
+            if wiersz.startswith(("VmRSS:", "VmSize:")):
+                pamiec[wiersz.split(":")[0]] = int(wiersz.split()[1]) * 1024
+    return pamiec.get("VmRSS", 0), pamiec.get("VmSize", 0)
+
+
+# Pamięć dysków-wątków, mierzona w osobnym, świeżym procesie (zwolniona
+# wcześniej sterta nie zaniża przyrostu). Odczyt następuje dopiero po
+# przesłaniu wszystkich plików, gdy stosy wątków były już w użyciu; VmSize
+# pokazuje przestrzeń adresową zarezerwowaną na stosy.
+def _pamiec_watkow(liczba_watkow, ziarno):
+    rss, wirtualna = pamiec_procesu()
+    serwer = Serwer(ziarno=ziarno, predkosci_dyskow=[10 ** 12] * liczba_watkow)
+    for dysk in serwer.dyski:
+        dysk.rozmiar_porcji = 10 ** 12  # cały plik w jednej porcji
+    for _ in range(liczba_watkow):
+        serwer.dodaj_klienta()
+    serwer.rozpocznij_symulacje()
+    while not serwer.czy_zakonczyc() or any(dysk.aktywny_plik for dysk in serwer.dyski):
+        time.sleep(0.05)
+    po_rss, po_wirtualna = pamiec_procesu()
+    serwer.zatrzymaj_dyski()
+    return (po_rss - rss) / liczba_watkow, (po_wirtualna - wirtualna) / liczba_watkow
+
+
+# Serwer na asyncio z tysiącami dysków-zadań: pamięć na dysk, opóźnienie
+# podjęcia pracy i przepustowość przydziałów, dla porównania pamięć wątków
+async def _zmierz_asyncio(liczba_dyskow, liczba_klientow, liczba_prob, ziarno):
+    pamiec = pamiec_rezydentna()
+    tracemalloc.start()
+    serwer = SerwerAsync(MierzonaAukcja(AukcjaTurniejowa()), ziarno, [10 ** 12] * liczba_dyskow)
+    for dysk in serwer.dyski:
+        dysk.rozmiar_porcji = 10 ** 12  # cały plik w jednej porcji
+    serwer.rozpocznij_symulacje()
+    await asyncio.sleep(0.1)  # wszystkie dyski czekają na pracę
+    zajete = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{liczba_dyskow} dysków-zadań: {zajete / liczba_dyskow:.0f} B/dysk (tracemalloc), "
+          f"{(pamiec_rezydentna() - pamiec) / liczba_dyskow:.0f} B/dysk (RSS)")
+
+    async def czekaj_na_podjecie():
+        while serwer.aukcja.ostatni_przydzial is None:
+            await asyncio.sleep(0)
+        return serwer.aukcja.ostatni_przydzial
+
+    async def czekaj_na_bezczynnosc():
+        while not serwer.czy_zakonczyc() or any(dysk.aktywny_plik for dysk in serwer.dyski):
+            await asyncio.sleep(0.001)
+
+    dodanie, wznowienie = [], []
+    for _ in range(liczba_prob):
+        await czekaj_na_bezczynnosc()
+        serwer.aukcja.ostatni_przydzial = None
+        start = time.perf_counter()
+        serwer.dodaj_klienta()
+        dodanie.append(await czekaj_na_podjecie() - start)
+    for _ in range(liczba_prob):
+        await czekaj_na_bezczynnosc()
+        serwer.zatrzymaj_symulacje()
+        serwer.dodaj_klienta()
+        serwer.aukcja.ostatni_przydzial = None
+        start = time.perf_counter()
+        serwer.rozpocznij_symulacje()
+        wznowienie.append(await czekaj_na_podjecie() - start)
+    for nazwa, pomiary in (("po dodaniu klienta", dodanie), ("po wznowieniu", wznowienie)):
+        pomiary.sort()
+        print(f"Podjęcie pracy {nazwa}: mediana {pomiary[len(pomiary) // 2] * 1e3:.3f} ms, "
+              f"maks. {pomiary[-1] * 1e3:.3f} ms")
+
+    await czekaj_na_bezczynnosc()
+    pliki = 0
+    start = time.perf_counter()
+    for _ in range(liczba_klientow):
+        pliki += len(serwer.dodaj_klienta().pliki)
+    await czekaj_na_bezczynnosc()
+    czas = time.perf_counter() - start
+    print(f"{liczba_klientow} klientów, {pliki} plików na {liczba_dyskow} dyskach: {czas:.2f} s, "
+          f"{pliki / czas:.0f} przydziałów/s")
+    await serwer.zamknij()
+
+
+def zmierz_asyncio(liczba_dyskow, liczba_watkow, liczba_klientow, liczba_prob, ziarno):
+    asyncio.run(_zmierz_asyncio(liczba_dyskow, liczba_klientow, liczba_prob, ziarno))
+
+    with multiprocessing.get_context("spawn").Pool(1) as pula:
+        rss, wirtualna = pula.apply(_pamiec_watkow, (liczba_watkow, ziarno))
+    print(f"{liczba_watkow} dysków-wątków po przesłaniu plików: {rss:.0f} B/dysk (RSS), "
+          f"{wirtualna / 2 ** 20:.1f} MiB/dysk zarezerwowane (VmSize)")
+
+
+# Koszt zapisu zdarzenia w metrykach, narzut metryk na przydział pliku
+# i spójność eksportu (HTTP Prometheusa, migawka JSON)
+def zmierz_metryki(zdarzenia, liczba_klientow, ziarno):
+    los = random.Random(ziarno)
+    wartosci = [los.lognormvariate(-9, 2) for _ in range(1000)] * (zdarzenia // 1000)
+    posortowane = sorted(wartosci)
+    pusta = time.perf_counter()
+    for wartosc in wartosci:
+        pass
+    pusta = time.perf_counter() - pusta
+    ok = True
+    zapisy = [("licznik", Licznik(), "dodaj")]
+    if np is not None:
+        zapisy.append(("histogram (numpy)", Histogram(), "zapisz"))
+    zapisy.append(("histogram (czysty Python)", Histogram(wektorowo=False), "zapisz"))
+    for nazwa, metryka, metoda in zapisy:
+        zapis = getattr(metryka, metoda)
+        start = time.perf_counter()
+        for wartosc in wartosci:
+            zapis(wartosc)
+        if isinstance(metryka, Histogram):
+            migawka = metryka.migawka()  # rozkłada też resztę buforów
+        czas = (time.perf_counter() - start - pusta) / len(wartosci)
+        print(f"{nazwa}: {czas * 1e9:.0f} ns/zdarzenie")
+        ok = ok and czas < 1e-6
+        if not isinstance(metryka, Histogram):
+            continue
+        # Kwantyle histogramu w granicach błędu kubełków
+        for q, klucz in ((0.5, "p50"), (0.99, "p99"), (1.0, "max")):
+            dokladny = posortowane[max(0, math.ceil(q * len(posortowane)) - 1)]
+            if not dokladny <= migawka[klucz] <= dokladny * (1 + 1 / 32):
+                print(f"BŁĄD: {klucz} {migawka[klucz]} zamiast ~{dokladny}")
+                ok = False
+
+    # Przebiegi na przemian, najlepszy z kilku - pojedynczy pomiar jest zbyt zaszumiony
+    czasy = {"bez metryk": math.inf, "z metrykami": math.inf}
+    for _ in range(3):
+        for nazwa in czasy:
+            metryki = MetrykiSerwera() if nazwa == "z metrykami" else None
+            serwer = serwer_z_klientami(liczba_klientow, ziarno, metryki)
+            pliki = serwer.pliki_w_kolejce
+            start = time.perf_counter()
+            while serwer.przydziel_plik()[0]:
+                pass
+            czasy[nazwa] = min(czasy[nazwa], (time.perf_counter() - start) / pliki)
+    for nazwa, czas in czasy.items():
+        print(f"{nazwa}: {czas * 1e6:.2f} µs/przydział ({pliki} plików)")
+    narzut = czasy["z metrykami"] - czasy["bez metryk"]
+    print(f"narzut metryk: {narzut * 1e6:.2f} µs/przydział (4 zdarzenia)")
+    if metryki.przydzialy.wartosc() != pliki or metryki.oczekiwanie.migawka()["liczba"] != pliki \
+            or serwer.pliki_w_kolejce != 0:
+        print("BŁĄD: liczba przydziałów w metrykach niezgodna z liczbą plików")
+        ok = False
+
+    with tempfile.TemporaryDirectory() as katalog:
+        port = metryki.rejestr.uruchom_http()
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as odpowiedz:
+            tekst = odpowiedz.read().decode()
+        metryki.rejestr.zatrzymaj_http()
+        sciezka = os.path.join(katalog, "metryki.json")
+        ZapisMigawek(metryki.rejestr, sciezka).zapisz()
+        with open(sciezka) as plik:
+            migawka = json.load(plik)
+    if f"przydzialy_total {pliki}" not in tekst or "aukcja_czas_sekundy_bucket{le=\"+Inf\"}" not in tekst:
+        print("BŁĄD: niepełny eksport Prometheusa")
+        ok = False
+    czas_aukcji = migawka["metryki"]["aukcja_czas_sekundy"]["serie"][0]
+    print(f"eksport: {len(tekst.splitlines())} linii Prometheusa; aukcja p50 {czas_aukcji['p50'] * 1e6:.1f} µs, "
+          f"p99 {czas_aukcji['p99'] * 1e6:.1f} µs")
+    return ok
+
+
+# Wątki-dyski zgłaszające zdarzenia: synchroniczne logging do pliku (jak
+# dotychczas) kontra dziennik zdarzeń z kolejką i wątkiem zapisującym.
+# Mierzymy czas po stronie zgłaszających; dziennik musi zapisać wszystkie
+# zdarzenia, także po rotacji plików.
+def zmierz_dziennik(liczba_watkow, zdarzenia, maks_rozmiar):
+    ok = True
+    with tempfile.TemporaryDirectory() as katalog:
+        rejestrator = logging.getLogger("pomiar_dziennika")
+        rejestrator.propagate = False
+        rejestrator.setLevel(logging.INFO)
+        obsluga = logging.FileHandler(os.path.join(katalog, "symulacja.log"))
+        obsluga.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
+        rejestrator.addHandler(obsluga)
+
+        def przez_logging(numer):
+            for i in range(zdarzenia):
+                rejestrator.info(f"Dysk {numer}: przesłano porcję {i} klienta {i % 100}")
+
+        sciezka = os.path.join(katalog, "zdarzenia.jsonl")
+        dziennik = DziennikZdarzen(sciezka, maks_rozmiar=maks_rozmiar, kopie=1000)
+
+        def przez_dziennik(numer):
+            zapisz = dziennik.zapisz
+            for i in range(zdarzenia):
+                zapisz('postep', i * 1e-3, dysk=numer, klient=i % 100, przeslano=i)
+
+        with dziennik:
+            for nazwa, praca in (("logging (plik)", przez_logging), ("dziennik zdarzeń", przez_dziennik)):
+                watki = [threading.Thread(target=praca, args=(numer,)) for numer in range(liczba_watkow)]
+                start = time.perf_counter()
+                for watek in watki:
+                    watek.start()
+                for watek in watki:
+                    watek.join()
+                czas = time.perf_counter() - start
+                print(f"{nazwa}: {czas / zdarzenia * 1e6:.2f} µs/zdarzenie na wątek, "
+                      f"{liczba_watkow * zdarzenia / czas:.0f} zdarzeń/s")
+            start = time.perf_counter()
+        print(f"dopisanie reszty kolejki: {time.perf_counter() - start:.2f} s")
+        obsluga.close()
+
+        pliki = [nazwa for nazwa in os.listdir(katalog) if nazwa.startswith("zdarzenia.jsonl")]
+        licznosci = Counter(zdarzenie['dysk'] for zdarzenie in czytaj_dziennik(sciezka))
+        print(f"dziennik: {sum(licznosci.values())} zdarzeń w {len(pliki)} plikach")
+        if any(licznosci[numer] != zdarzenia for numer in range(liczba_watkow)):
+            print("BŁĄD: dziennik zgubił zdarzenia")
+            ok = False
+    return ok
+
+
+# Ślad z obciążenia generuj_obciazenie: pula dysków na starcie, przybycia
+# klientów i co `okres_pauzy` sekund pauza trwająca 1/10 okresu
+def slad_z_obciazenia(obciazenie, predkosci_dyskow, okres_pauzy):
+    slad = Slad()
+    for predkosc in predkosci_dyskow:
+        slad.zapisz('dysk', predkosc, 0.0)
+    slad.zapisz('wznowienie', czas=0.0)
+    zdarzenia = [(czas, 'klient', pliki) for czas, pliki in obciazenie]
+    koniec = max(czas for czas, _ in obciazenie)
+    for numer in range(1, int(koniec / okres_pauzy) + 1):
+        zdarzenia.append((numer * okres_pauzy, 'pauza', None))
+        zdarzenia.append((numer * okres_pauzy * 1.1, 'wznowienie', None))
+    for czas, rodzaj, wartosc in sorted(zdarzenia, key=lambda zdarzenie: zdarzenie[0]):
+        slad.zapisz(rodzaj, wartosc, czas)
+    return slad
+
+
+# Nagrywanie i odtwarzanie śladu: zapis i odczyt (CSV, kolumnowo) bez strat,
+# deterministyczne odtworzenie i porównanie p99 oczekiwania oraz
+# przepustowości z zapisanym wzorcem
+def sprawdz_slad(sciezka, liczba_klientow, liczba_dyskow, ziarno, zapisz, wzorzec, zapisz_wzorzec, tolerancja):
+    if sciezka:
+        slad = wczytaj_slad(sciezka)
+    else:
+        predkosci = [PROFILE_DYSKOW['hdd']] * liczba_dyskow
+        obciazenie = generuj_obciazenie("poisson", liczba_klientow, ziarno, predkosci)
+        slad = slad_z_obciazenia(obciazenie, predkosci, okres_pauzy=3600)
+    if zapisz:
+        slad.zapisz_do_pliku(zapisz)
+    ok = True
+    with tempfile.TemporaryDirectory() as katalog:
+        for nazwa in ("slad.csv", "slad.slad"):
+            plik = os.path.join(katalog, nazwa)
+            start = time.perf_counter()
+            slad.zapisz_do_pliku(plik)
+            wczytany = wczytaj_slad(plik)
+            czas = time.perf_counter() - start
+            zgodny = wczytany == slad
+            ok = ok and zgodny
+            print(f"{nazwa}: {os.path.getsize(plik)} B, zapis i odczyt {czas * 1e3:.0f} ms, "
+                  f"{'zgodny' if zgodny else 'NIEZGODNY'}")
+
+    start = time.perf_counter()
+    symulacja = odtworz(slad)
+    czas = time.perf_counter() - start
+    if odtworz(slad).zakonczenia != symulacja.zakonczenia:
+        print("BŁĄD: odtworzenie niedeterministyczne")
+        ok = False
+    wynik = podsumuj(symulacja)
+    print(f"{len(slad)} zdarzeń, {wynik['pliki']} plików w {czas:.2f} s: p50 oczekiwania "
+          f"{wynik['oczekiwanie_p50_s']:.1f} s, p99 {wynik['oczekiwanie_p99_s']:.1f} s, "
+          f"{wynik['przepustowosc_B_s'] / 10**6:.1f} MB/s")
+
+    # Ślad nagrany z działającego serwera odtwarza się z tymi samymi plikami
+    nagranie = Slad()
+    serwer = Serwer(ziarno=ziarno, predkosci_dyskow=[PROFILE_DYSKOW['nvme'] * 100] * 2, slad=nagranie)
+    for _ in range(3):
+        serwer.dodaj_klienta()
+    serwer.rozpocznij_symulacje()
+    serwer.zatrzymaj_symulacje()
+    serwer.dodaj_klienta()
+    serwer.rozpocznij_symulacje()
+    while not serwer.czy_zakonczyc() or any(dysk.aktywny_plik for dysk in serwer.dyski):
+        time.sleep(0.01)
+    klienci = [wartosc for _, rodzaj, wartosc in nagranie.zdarzenia if rodzaj == 'klient']
+    oczekiwane = Counter((id_klienta, plik) for id_klienta, pliki in enumerate(klienci, 1) for plik in pliki)
+    odtworzone = Counter((z.id_klienta, z.rozmiar) for z in odtworz(nagranie).zakonczenia)
+    rodzaje = Counter(rodzaj for _, rodzaj, _ in nagranie.zdarzenia)
+    print(f"nagranie z serwera: {dict(rodzaje)}, odtworzono {sum(odtworzone.values())} plików")
+    if odtworzone != oczekiwane or len(klienci) != 4:
+        print("BŁĄD: odtworzenie nagrania z serwera niezgodne z przybyciami")
+        ok = False
+
+    if wzorzec:
+        if zapisz_wzorzec:
+            with open(wzorzec, "w") as plik:
+                json.dump(wynik, plik, indent=2)
+            print(f"Zapisano wzorzec {wzorzec}")
+        else:
+            with open(wzorzec) as plik:
+                pogorszenia = porownaj_ze_wzorcem(wynik, json.load(plik), tolerancja)
+            for pogorszenie in pogorszenia:
+                print(f"POGORSZENIE: {pogorszenie}")
+            ok = ok and not pogorszenia
+    return ok
+
+
+# Indeks rozproszenia liczby przybyć w oknach o długości `okno` (wariancja /
+# średnia): około 1 dla procesu Poissona, znacznie więcej dla impulsowego
+def indeks_rozproszenia(chwile, okno):
+    liczby = Counter(int(czas // okno) for czas in chwile)
+    wartosci = [liczby.get(numer, 0) for numer in range(int(chwile[-1] // okno))]
+    srednia = sum(wartosci) / len(wartosci)
+    return sum((x - srednia) ** 2 for x in wartosci) / len(wartosci) / srednia
+
+
+# Generator obciążenia: zgodność średnich z rozkładami teoretycznymi,
+# rozproszenie przybyć, stała pamięć strumienia i symulacja zasilana
+# strumieniem klientów z tysiącami plików o rozmiarach z ciężkim ogonem
+def zmierz_obciazenie(liczba_klientow, mediana_plikow, liczba_dyskow, ziarno):
+    ok = True
+    los = random.Random(ziarno)
+    rozklady = {
+        "jednostajny 1-512 MB": RozkladJednostajny(),
+        "Pareto a=1.5, 1 MB-10 GB": RozkladPareto(1.5, 1 * 10**6, 10 * 10**9),
+        "log-normalny mediana 16 MB, s=1.5": RozkladLogNormalny(16 * 10**6, 1.5),
+    }
+    for nazwa, rozklad in rozklady.items():
+        probki = [rozklad.losuj(los) for _ in range(500000)]
+        srednia = sum(probki) / len(probki)
+        blad = abs(srednia / rozklad.srednia() - 1)
+        probki.sort()
+        print(f"{nazwa}: średnia {srednia / 10**6:.1f} MB (teoretyczna {rozklad.srednia() / 10**6:.1f} MB), "
+              f"p50 {percentyl(probki, 50) / 10**6:.1f} MB, p99.9 {percentyl(probki, 99.9) / 10**6:.0f} MB")
+        if blad > 0.05:
+            print(f"BŁĄD: średnia odbiega o {blad:.1%}")
+            ok = False
+
+    parametry = (1.0, 20.0, 30.0, 5.0)  # spokój 1/s, impuls 20/s, fazy średnio 30 s i 5 s
+    for nazwa, przybycia, intensywnosc in (
+            ("Poisson", przybycia_poissona(3.7, los), 3.7),
+            ("impulsowe", przybycia_impulsowe(*parametry, los), srednia_intensywnosc_impulsowa(*parametry))):
+        chwile = list(itertools.islice(przybycia, 200000))
+        zmierzona = len(chwile) / chwile[-1]
+        rozproszenie = indeks_rozproszenia(chwile, 1.0)
+        print(f"przybycia {nazwa}: {zmierzona:.2f} klientów/s (oczekiwane {intensywnosc:.2f}), "
+              f"indeks rozproszenia {rozproszenie:.2f}")
+        if abs(zmierzona / intensywnosc - 1) > 0.05:
+            print("BŁĄD: intensywność przybyć odbiega od zadanej")
+            ok = False
+
+    # Strumień nie trzyma klientów - pamięć nie rośnie z ich liczbą
+    liczba_plikow = RozkladLogNormalny(mediana_plikow, 1.0)
+    rozmiar = RozkladPareto(1.5, 1 * 10**6, 10 * 10**9)
+    for wariant in ("strumień", "lista"):
+        gc.collect()
+        tracemalloc.start()
+        klienci = strumien_klientow(przybycia_poissona(1.0, random.Random(ziarno)), liczba_plikow, rozmiar,
+                                    random.Random(ziarno), limit=liczba_klientow)
+        if wariant == "lista":
+            klienci = list(klienci)
+        start = time.perf_counter()
+        pliki = sum(len(pliki) for _, pliki in klienci)
+        czas = time.perf_counter() - start
+        szczyt = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del klienci
+        print(f"{wariant}: {liczba_klientow} klientów, {pliki} plików, szczyt pamięci {szczyt / 2**20:.1f} MiB"
+              + (f", {pliki / czas / 10**6:.2f} mln plików/s" if wariant == "strumień" else ""))
+
+    # Symulacja zasilana strumieniem przy obciążeniu dysków 0.9
+    predkosci = [PROFILE_DYSKOW['hdd']] * liczba_dyskow
+    intensywnosc = 0.9 * sum(predkosci) / (liczba_plikow.srednia() * rozmiar.srednia())
+    los = random.Random(ziarno)
+    klienci = strumien_klientow(przybycia_poissona(intensywnosc, los), liczba_plikow, rozmiar, los,
+                                limit=liczba_klientow)
+    symulacja = SymulacjaZdarzeniowa(predkosci, ziarno=ziarno)
+    symulacja.dodaj_strumien_klientow(klienci)
+    symulacja.rozpocznij_symulacje(0.0)
+    najdluzsza_kolejka = 0
+    start = time.perf_counter()
+    while symulacja.zdarzenia:
+        symulacja.uruchom(symulacja.czas + 60)
+        najdluzsza_kolejka = max(najdluzsza_kolejka, len(symulacja.zdarzenia))
+    czas = time.perf_counter() - start
+    wynik = podsumuj(symulacja)
+    print(f"symulacja: {len(symulacja.klienci)} klientów, {wynik['pliki']} plików, {liczba_dyskow} dysków "
+          f"w {czas:.1f} s ({wynik['pliki'] / czas:.0f} aukcji/s), p99 oczekiwania "
+          f"{wynik['oczekiwanie_p99_s']:.1f} s, najwięcej {najdluzsza_kolejka} zdarzeń w kolejce")
+    if len(symulacja.klienci) != liczba_klientow or not symulacja.czy_zakonczyc():
+        print("BŁĄD: nie wszyscy klienci ze strumienia zostali obsłużeni")
+        ok = False
+
+    # Zasilanie działającego serwera w przyspieszonym czasie rzeczywistym
+    serwer = Serwer(ziarno=ziarno, predkosci_dyskow=[PROFILE_DYSKOW['nvme'] * 100] * 4)
+    serwer.rozpocznij_symulacje()
+    los = random.Random(ziarno)
+    dodani = zasil_serwer(serwer, strumien_klientow(przybycia_poissona(100.0, los), RozkladJednostajny(50, 200),
+                                                    rozmiar, los, limit=50), tempo=10.0)
+    while not serwer.czy_zakonczyc() or any(dysk.aktywny_plik for dysk in serwer.dyski):
+        time.sleep(0.01)
+    print(f"serwer: zasilono {dodani} klientami ze strumienia, wszystkie pliki przesłane")
+    return ok
+
+
+# Przebieg symulacji zdarzeniowej z podziałem plików na segmenty (None - bez
+# podziału): zakończenia i chwile przybycia klientów
+def przebieg_z_podzialem(klienci, predkosci_dyskow, rozmiar_segmentu, ziarno):
+    symulacja = SymulacjaZdarzeniowa(predkosci_dyskow, ziarno=ziarno, rozmiar_segmentu=rozmiar_segmentu)
+    for czas, pliki in klienci:
+        symulacja.dodaj_klienta(czas, pliki)
+    symulacja.rozpocznij_symulacje(0.0)
+    start = time.perf_counter()
+    symulacja.uruchom()
+    return symulacja, time.perf_counter() - start
+
+
+# Podział dużych plików i kradzież segmentów: czas do ostatniego
+# zakończenia (makespan) i p99 czasu zakończenia pliku i klienta (od
+# przybycia klienta) przy rozmiarach plików z ciężkim ogonem, z podziałem
+# i bez. Zgodność zakończeń z przebiegiem bez podziału i przebieg Serwer
+# z wątkami dysków: każdy plik zakończony raz, wszystkie bajty przesłane.
+def zmierz_podzial(liczba_klientow, liczba_dyskow, rozmiary_segmentow, ziarno):
+    ok = True
+    predkosci = [PROFILE_DYSKOW['hdd']] * liczba_dyskow
+    liczba_plikow = RozkladLogNormalny(5, 1.0)
+    rozmiar = RozkladPareto(1.1, 1 * 10**6, 20 * 10**9)
+    for obciazenie in (0.5, 0.8, None):
+        los = random.Random(ziarno)
+        intensywnosc = (obciazenie or 1.0) * sum(predkosci) / (liczba_plikow.srednia() * rozmiar.srednia())
+        klienci = list(strumien_klientow(przybycia_poissona(intensywnosc, los), liczba_plikow, rozmiar, los,
+                                         limit=liczba_klientow))
+        if obciazenie is None:
+            klienci = [(0.0, pliki) for _, pliki in klienci]  # wszyscy klienci naraz
+        print(f"obciążenie {obciazenie or 'wszyscy naraz'}: {liczba_klientow} klientów, "
+              f"{sum(len(pliki) for _, pliki in klienci)} plików, największy "
+              f"{max(max(pliki) for _, pliki in klienci) / 10**9:.1f} GB, {liczba_dyskow} dysków")
+        wzorzec = None
+        for rozmiar_segmentu in [None] + rozmiary_segmentow:
+            symulacja, czas = przebieg_z_podzialem(klienci, predkosci, rozmiar_segmentu, ziarno)
+            przybycia = symulacja.czasy_przybycia
+            pliki = sorted(z.czas - przybycia[z.id_klienta] for z in symulacja.zakonczenia)
+            na_klienta = {}
+            for z in symulacja.zakonczenia:
+                na_klienta[z.id_klienta] = max(na_klienta.get(z.id_klienta, 0.0), z.czas - przybycia[z.id_klienta])
+            makespan = max(z.czas for z in symulacja.zakonczenia) - min(przybycia.values())
+            wynik = (makespan, percentyl(pliki, 99), percentyl(sorted(na_klienta.values()), 99))
+            opis = f"segmenty {rozmiar_segmentu // 10**6} MB" if rozmiar_segmentu else "bez podziału"
+            print(f"  {opis:18} makespan {wynik[0]:8.1f} s, p99 pliku {wynik[1]:7.1f} s, "
+                  f"p99 klienta {wynik[2]:7.1f} s" + (
+                      f" (zmiana {wynik[0] / wzorzec[0] - 1:+.0%} / {wynik[1] / wzorzec[1] - 1:+.0%} / "
+                      f"{wynik[2] / wzorzec[2] - 1:+.0%})" if wzorzec else "") + f", {czas:.2f} s")
+            if wzorzec is None:
+                wzorzec, zakonczone = wynik, Counter((z.id_klienta, z.rozmiar) for z in symulacja.zakonczenia)
+            elif Counter((z.id_klienta, z.rozmiar) for z in symulacja.zakonczenia) != zakonczone:
+                print("BŁĄD: zakończone pliki różnią się od przebiegu bez podziału")
+                ok = False
+            if not symulacja.czy_zakonczyc() or any(z.czas < z.czas_przydzialu for z in symulacja.zakonczenia):
+                print("BŁĄD: niespójne zakończenia plików")
+                ok = False
+
+    # Serwer z wątkami dysków: jedno zakończenie na plik, bajty bez strat
+    zdarzenia = ZdarzeniaWPamieci()
+    metryki = MetrykiSerwera()
+    serwer = Serwer(predkosci_dyskow=[PROFILE_DYSKOW['nvme']] * 4, dziennik=zdarzenia, metryki=metryki,
+                    rozmiar_segmentu=64 * 10**6)
+    pliki = [[3 * 10**9, 1 * 10**6], [5 * 10**6], [700 * 10**6, 64 * 10**6 + 1]]
+    for pliki_klienta in pliki:
+        serwer.dodaj_klienta(pliki_klienta)
+    start = time.monotonic()
+    serwer.rozpocznij_symulacje()
+    while not serwer.czy_zakonczyc() or any(dysk.aktywny_plik for dysk in serwer.dyski):
+        time.sleep(0.01)
+    czas = time.monotonic() - start
+    serwer.zatrzymaj_dyski(limit_czasu=5.0)
+    zakonczone = sorted(pola["plik"] for nazwa, pola in zdarzenia.zdarzenia if nazwa == "zakonczenie")
+    kradzieze = sum(nazwa == "kradziez" for nazwa, _ in zdarzenia.zdarzenia)
+    bajty = sum(seria["wartosc"] for seria in
+                metryki.rejestr.migawka()["metryki"]["dysk_bajty_total"]["serie"])
+    print(f"serwer: {len(zakonczone)} plików w {czas:.2f} s, {kradzieze} skradzionych segmentów, "
+          f"{bajty / 10**6:.0f} MB przesłanych")
+    if zakonczone != sorted(sum(pliki, [])) or bajty != sum(sum(pliki, [])):
+        print("BŁĄD: pliki zakończone więcej niż raz albo bajty zgubione")
+        ok = False
+    return ok
+
+
+# Generator obciążenia wejścia sieciowego: `polaczenia` producentów, każdy
+# z najwyżej `okno` zgłoszeniami w toku (wysłane, bez GOTOWE). Zwraca
+# opóźnienia przyjęcia i całego zgłoszenia (s) oraz zliczone odpowiedzi.
+async def _obciaz_wejscie(adres, sciezka_unix, polaczenia, zgloszenia, okno, pliki, los):
+    wyslane, przyjecia, gotowe, odpowiedzi = {}, [], [], Counter()
+    wolne = [asyncio.Semaphore(okno) for _ in range(polaczenia)]
+    koniec = asyncio.Event()
+
+    def odbiorca(numer_polaczenia):
+        def odbierz(rodzaj, numer, *pola):
+            odpowiedzi[rodzaj] += 1
+            if rodzaj == PRZYJETO:
+                przyjecia.append(time.perf_counter() - wyslane[numer])
+            elif rodzaj in (GOTOWE, ODRZUCONO):
+                gotowe.append(time.perf_counter() - wyslane.pop(numer))
+                wolne[numer_polaczenia].release()
+                if len(gotowe) == zgloszenia:
+                    koniec.set()
+        return odbierz
+
+    producenci = [await PolaczenieProducenta.polacz(odbiorca(i), port=adres and adres[1], sciezka_unix=sciezka_unix)
+                  for i in range(polaczenia)]
+
+    async def produkuj(numer_polaczenia):
+        for numer in range(numer_polaczenia, zgloszenia, polaczenia):
+            await wolne[numer_polaczenia].acquire()
+            wyslane[numer] = time.perf_counter()
+            await producenci[numer_polaczenia].zglos(numer, [los.randint(1, 10**6) for _ in range(pliki)])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(produkuj(i) for i in range(polaczenia)))
+    await koniec.wait()
+    czas = time.perf_counter() - start
+    for producent in producenci:
+        await producent.zamknij()
+    return czas, sorted(przyjecia), sorted(gotowe), odpowiedzi
+
+
+# Wejście sieciowe pod obciążeniem: zgłoszenia/s i opóźnienia od wysłania
+# do przyjęcia i do przesłania wszystkich plików, bez potokowania (okno 1)
+# i z potokowaniem, przez TCP i gniazdo Unix. Potem wstrzymanie czytania
+# przy głębokiej kolejce: serwer w pauzie, producent wysyła bez ograniczeń,
+# kolejka nie może przekroczyć limitu, a po wznowieniu wszystko jest przesłane.
+def zmierz_siec(polaczenia, zgloszenia, okna, pliki, ziarno):
+    ok = True
+    sciezka_unix = os.path.join(tempfile.mkdtemp(), 'wejscie.sock')
+    for transport in ("tcp", "unix"):
+        for okno in okna:
+            serwer = Serwer(ziarno=ziarno, predkosci_dyskow=[PROFILE_DYSKOW['nvme'] * 1000] * 4)
+            serwer.rozpocznij_symulacje()
+            wejscie = WatekWejscia(serwer, port=0 if transport == "tcp" else None,
+                                   sciezka_unix=sciezka_unix if transport == "unix" else None)
+            adres = wejscie.uruchom()
+            czas, przyjecia, gotowe, odpowiedzi = asyncio.run(_obciaz_wejscie(
+                adres, sciezka_unix if transport == "unix" else None, polaczenia, zgloszenia, okno, pliki,
+                random.Random(ziarno)))
+            wejscie.zatrzymaj()
+            serwer.zatrzymaj_dyski(limit_czasu=5.0)
+            print(f"{transport:4} okno {okno:4}: {zgloszenia / czas:7.0f} zgłoszeń/s, przyjęcie p50 "
+                  f"{percentyl(przyjecia, 50) * 1e3:6.2f} ms, p99 {percentyl(przyjecia, 99) * 1e3:6.2f} ms; "
+                  f"przesłanie p50 {percentyl(gotowe, 50) * 1e3:6.2f} ms, p99 {percentyl(gotowe, 99) * 1e3:6.2f} ms")
+            if odpowiedzi[PRZYJETO] != zgloszenia or odpowiedzi[GOTOWE] != zgloszenia \
+                    or odpowiedzi[ZAKONCZENIE] != zgloszenia * pliki:
+                print(f"BŁĄD: niekompletne odpowiedzi {dict(odpowiedzi)}")
+                ok = False
+
+    # Wstrzymanie czytania: serwer w pauzie, limit kolejki 1000 plików
+    serwer = Serwer(ziarno=ziarno, predkosci_dyskow=[PROFILE_DYSKOW['nvme'] * 1000] * 4)
+    wejscie = WatekWejscia(serwer, port=0, gorny_limit=1000)
+    adres = wejscie.uruchom()
+
+    async def zalej():
+        zadanie = asyncio.create_task(_obciaz_wejscie(adres, None, 1, zgloszenia, zgloszenia, pliki,
+                                                      random.Random(ziarno)))
+        await asyncio.sleep(1.0)
+        w_kolejce = serwer.pliki_w_kolejce
+        serwer.rozpocznij_symulacje()
+        return w_kolejce, await zadanie
+
+    w_kolejce, (_, _, _, odpowiedzi) = asyncio.run(zalej())
+    wstrzymania = wejscie.wejscie.wstrzymania
+    wejscie.zatrzymaj()
+    serwer.zatrzymaj_dyski(limit_czasu=5.0)
+    print(f"pauza, limit 1000 plików: w kolejce {w_kolejce} plików z {zgloszenia * pliki} wysyłanych, "
+          f"wstrzymania czytania: {wstrzymania}; po wznowieniu {odpowiedzi[GOTOWE]} zgłoszeń przesłanych")
+    if w_kolejce > 1000 or not wstrzymania or odpowiedzi[GOTOWE] != zgloszenia:
+        print("BŁĄD: kolejka przekroczyła limit albo zgłoszenia zginęły")
+        ok = False
+    return ok
+
+
+# Przesyłania w toku: id dysku -> (id klienta, plik, przesłane bajty)
+def przesylania_w_toku(serwer):
+    wynik = {}
+    for dysk in serwer.dyski:
+        if dysk.aktywny_plik is not None:
+            wynik[dysk.id_dysku] = (dysk.aktualny_klient.id_klienta, dysk.aktywny_plik, dysk.przesylanie.przeslano)
+        elif dysk.przydzial:
+            klient, plik = dysk.przydzial
+            wynik[dysk.id_dysku] = (klient.id_klienta, plik, dysk.wznowienie)
+    return wynik
+
+
+# Dziennik zdarzeń trzymany w pamięci (ten sam interfejs co DziennikZdarzen)
+class ZdarzeniaWPamieci:
+    def __init__(self):
+        self.zdarzenia = []
+
+    def zapisz(self, zdarzenie, czas, **pola):
+        self.zdarzenia.append((zdarzenie, pola))
+
+
+# Zapis i wczytanie stanu serwera z milionem plików w kolejce: zatrzymanie
+# dysków w trakcie przesyłania, pełny i przyrostowy zapis, czas wczytania
+# i wznowienie przerwanych przesyłań od zapisanej porcji
+def zmierz_stan(liczba_plikow, liczba_dyskow, ziarno):
+    ok = True
+    serwer = Serwer(ziarno=ziarno, predkosci_dyskow=[PROFILE_DYSKOW['hdd']] * liczba_dyskow)
+    while serwer.pliki_w_kolejce < liczba_plikow:
+        serwer.dodaj_klienta()
+    serwer.rozpocznij_symulacje()
+    # Zatrzymujemy dyski, gdy każdy ma za sobą kilka porcji bieżącego pliku
+    koniec = time.monotonic() + 10
+    while time.monotonic() < koniec and not all(
+            dysk.przesylanie and dysk.przesylanie.przeslano >= 4 * dysk.rozmiar_porcji for dysk in serwer.dyski):
+        time.sleep(0.01)
+    start = time.perf_counter()
+    niezatrzymane = serwer.zatrzymaj_dyski(limit_czasu=5.0)
+    print(f"{len(serwer.klienci)} klientów, {serwer.pliki_w_kolejce} plików w kolejce; zatrzymanie "
+          f"{liczba_dyskow} dysków w trakcie przesyłania: {(time.perf_counter() - start) * 1e3:.1f} ms")
+    if niezatrzymane:
+        print(f"BŁĄD: {len(niezatrzymane)} dysków nie zakończyło wątków")
+        ok = False
+
+    with tempfile.TemporaryDirectory() as katalog:
+        sciezka = os.path.join(katalog, "stan")
+        zapis = ZapisStanu(serwer, sciezka)
+        start = time.perf_counter()
+        zapis.zapisz()
+        czas_pelny = time.perf_counter() - start
+        for _ in range(100):
+            serwer.dodaj_klienta()
+        start = time.perf_counter()
+        zapis.zapisz()
+        czas_przyrostowy = time.perf_counter() - start
+        rozmiar = os.path.getsize(sciezka) + os.path.getsize(sciezka_rozmiarow(sciezka, zapis.numer))
+        print(f"zapis: pełny {czas_pelny * 1e3:.0f} ms, po dodaniu 100 klientów {czas_przyrostowy * 1e3:.0f} ms "
+              f"(dopisano {zapis.dopisane} rozmiarów), {rozmiar / serwer.pliki_w_kolejce:.1f} B/plik")
+
+        zdarzenia = ZdarzeniaWPamieci()
+        start = time.perf_counter()
+        wczytany = wczytaj_stan(sciezka, dziennik=zdarzenia)
+        czas_wczytania = time.perf_counter() - start
+        print(f"wczytanie: {czas_wczytania * 1e3:.0f} ms, {len(wczytany.klienci)} klientów, "
+              f"{wczytany.pliki_w_kolejce} plików w kolejce")
+        if czas_wczytania > 1.0:
+            print("BŁĄD: wczytanie stanu trwa ponad sekundę")
+            ok = False
+
+    zgodny = (wczytany.pliki_w_kolejce == serwer.pliki_w_kolejce
+              and all(list(a.pliki) == list(b.pliki) for a, b in zip(serwer.klienci, wczytany.klienci))
+              and wczytany.magazyn.czasy_startu == serwer.magazyn.czasy_startu
+              and wczytany.magazyn.czasy_zatrzymania == serwer.magazyn.czasy_zatrzymania)
+    w_toku = przesylania_w_toku(serwer)
+    wznawiane = przesylania_w_toku(wczytany)
+    if not zgodny or w_toku != wznawiane:
+        print("BŁĄD: wczytany stan różni się od zapisanego")
+        ok = False
+    print(f"przesyłania w toku: {len(w_toku)}, przesłano średnio "
+          f"{sum(p for _, _, p in w_toku.values()) / max(len(w_toku), 1) / 10**6:.1f} MB")
+
+    # Przerwane przesyłania ruszają od zapisanej porcji, nie od zera:
+    # pierwsza porcja dysku po wznowieniu kończy się za zapisanym postępem
+    wczytany.rozpocznij_symulacje()
+    time.sleep(0.3)
+    wczytany.zatrzymaj_dyski(limit_czasu=5.0)
+    pierwsze = {}
+    for zdarzenie, pola in zdarzenia.zdarzenia:
+        if zdarzenie == 'postep':
+            pierwsze.setdefault(pola['dysk'], (pola['klient'], pola['rozmiar'], pola['przeslano']))
+    for id_dysku, (id_klienta, plik, przeslano) in wznawiane.items():
+        oczekiwane = (id_klienta, plik, min(plik, przeslano + wczytany.dyski[0].rozmiar_porcji))
+        if pierwsze.get(id_dysku) != oczekiwane:
+            print(f"BŁĄD: dysk {id_dysku} nie wznowił przesyłania od {przeslano} B: {pierwsze.get(id_dysku)}")
+            ok = False
+    if ok:
+        print("wznowienie: wszystkie przerwane przesyłania kontynuowane od zapisanej porcji")
+    return ok
+
+
+# Serwer z biegnącym zegarem symulacji, bez uruchomionych wątków dysków
+def serwer_z_klientami(liczba_klientow, ziarno, metryki=None):
+    serwer = Serwer(ziarno=ziarno, metryki=metryki)
+    for _ in range(liczba_klientow):
+        serwer.dodaj_klienta()
+    serwer.zegar.wznow()
+    return serwer
+
+
+# Docelowy czas rundy przydziału wsadowego (100 tys. klientów, 100 dysków)
+CEL_RUNDY_WSADOWEJ = 1e-3
+
+
+# Przydział wsadowy (jedna aukcja na m dysków) w porównaniu z pętlą aukcji
+# na dysk. Przy jednym dysku wynik musi być zgodny z drzewem turniejowym.
+def zmierz_przydzial_wsadowy(liczba_klientow, liczba_dyskow, rundy, ziarno):
+    predkosci = list(PROFILE_DYSKOW.values())
+    dyski = [Dysk(i, None, predkosci[i % len(predkosci)]) for i in range(liczba_dyskow)]
+    tryby = [("wektorowo", True)] if np is not None else []
+    tryby.append(("czysty Python", False))
+
+    for nazwa, wektorowo in tryby:
+        wzorzec, serwer = Serwer(ziarno=ziarno), Serwer(ziarno=ziarno)
+        for _ in range(300):
+            wzorzec.dodaj_klienta()
+            serwer.dodaj_klienta()
+        los = random.Random(ziarno)
+        for klient_wzorca, klient in zip(wzorzec.klienci, serwer.klienci):
+            klient_wzorca.czas_zatrzymania = klient.czas_zatrzymania = los.uniform(0, 3600)
+        wzorzec.aukcja.odswiez()
+        serwer.aukcja.odswiez()
+        for runda in itertools.count():
+            dysk = dyski[runda % len(dyski)]
+            klient, plik = wzorzec.przydziel_plik(dysk.predkosc_przesylania)
+            oczekiwano = (klient.id_klienta, plik) if klient else None
+            with serwer.blokada_aukcji:
+                zwyciezcy = aukcja_wsadowa(serwer.magazyn, 1, dysk.predkosc_przesylania, wektorowo)
+                klient, plik = serwer.aukcja.zdejmij_pliki(zwyciezcy)[0] if zwyciezcy else (None, None)
+            otrzymano = (klient.id_klienta, plik) if klient else None
+            if oczekiwano != otrzymano:
+                print(f"Aukcja wsadowa ({nazwa}), runda {runda}: oczekiwano {oczekiwano}, otrzymano {otrzymano}")
+                return False
+            if otrzymano is None:
+                break
+        print(f"Parytet aukcji wsadowej ({nazwa}) z drzewem przy jednym dysku: {runda} aukcji")
+
+    # Pętla aukcji liniowych jest długa - mierzymy kilka aukcji i skalujemy do rundy
+    klienci = serwer_z_klientami(liczba_klientow, ziarno).klienci
+    start = time.perf_counter()
+    for dysk in dyski[:5]:
+        aukcja_liniowa(klienci, dysk.predkosc_przesylania)
+    liniowa = (time.perf_counter() - start) / len(dyski[:5]) * liczba_dyskow
+    serwer = serwer_z_klientami(liczba_klientow, ziarno)
+    start = time.perf_counter()
+    for _ in range(rundy):
+        for dysk in dyski:
+            serwer.przydziel_plik(dysk.predkosc_przesylania)
+    petla = (time.perf_counter() - start) / rundy
+    print(f"{liczba_klientow} klientów, {liczba_dyskow} dysków: pętla aukcji liniowych {liniowa * 1e3:.2f} ms/rundę, "
+          f"pętla aukcji turniejowych {petla * 1e3:.2f} ms/rundę")
+
+    # Runda wsadowa to aukcja i zdjęcie plików zwycięzców pod blokadą, jak
+    # w Serwer.przydziel_pliki; mediana rund wobec celu CEL_RUNDY_WSADOWEJ
+    for nazwa, wektorowo in tryby:
+        serwer = serwer_z_klientami(liczba_klientow, ziarno)
+        czasy = []
+        for _ in range(rundy):
+            start = time.perf_counter()
+            with serwer.blokada_aukcji:
+                predkosc = sum(dysk.predkosc_przesylania for dysk in dyski) / len(dyski)
+                serwer.aukcja.zdejmij_pliki(aukcja_wsadowa(serwer.magazyn, len(dyski), predkosc, wektorowo))
+            czasy.append(time.perf_counter() - start)
+        czas = statistics.median(czasy)
+        print(f"{liczba_klientow} klientów, {liczba_dyskow} dysków: aukcja wsadowa ({nazwa}) "
+              f"{czas * 1e3:.2f} ms/rundę (mediana, cel < {CEL_RUNDY_WSADOWEJ * 1e3:.0f} ms: "
+              f"{'tak' if czas < CEL_RUNDY_WSADOWEJ else 'nie'}), {czas / liczba_dyskow * 1e6:.1f} µs/przydział, "
+              f"{liniowa / czas:.0f}x względem pętli liniowej, {petla / czas:.1f}x względem turniejowej")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Testy wydajności symulacji serwera")
+    podkomendy = parser.add_subparsers(dest="komenda", required=True)
+
+    aukcja = podkomendy.add_parser("aukcja", help="koszt silników aukcji")
+    aukcja.add_argument("--klienci", type=int, nargs="+", default=[100, 1000, 10000])
+    aukcja.add_argument("--aukcje", type=int, default=200)
+    aukcja.add_argument("--ziarno", type=int, default=0)
+
+    symulacja = podkomendy.add_parser("symulacja", help="symulacja zdarzeniowa kilku dni ruchu")
+    symulacja.add_argument("--klienci", type=int, default=2000)
+    symulacja.add_argument("--dni", type=int, default=3)
+    symulacja.add_argument("--ziarno", type=int, default=0)
+
+    latencja = podkomendy.add_parser("latencja", help="opóźnienie podjęcia pracy przez dyski")
+    latencja.add_argument("--proby", type=int, default=100)
+    latencja.add_argument("--ziarno", type=int, default=0)
+
+    polityki = podkomendy.add_parser("polityki", help="porównanie polityk aukcji, raport JSON")
+    polityki.add_argument("--polityki", nargs="+", choices=list(POLITYKI), default=list(POLITYKI))
+    polityki.add_argument("--obciazenia", nargs="+", choices=["paczka", "poisson"], default=["paczka", "poisson"])
+    polityki.add_argument("--klienci", type=int, nargs="+", default=[100, 500])
+    polityki.add_argument("--dyski", type=int, default=5)
+    polityki.add_argument("--ziarno", type=int, default=0)
+    polityki.add_argument("--wyjscie", help="plik raportu JSON (domyślnie standardowe wyjście)")
+
+    przesylanie = podkomendy.add_parser("przesylanie", help="kopiowanie porcjami z ograniczeniem przepustowości")
+    przesylanie.add_argument("--rozmiar", type=int, nargs="+", default=[1, 64], help="MB")
+    przesylanie.add_argument("--predkosc", type=int, default=100, help="MB/s")
+    przesylanie.add_argument("--porcja", type=int, default=256, help="KB")
+
+    kopiowanie = podkomendy.add_parser("kopiowanie", help="read/write kontra copy_file_range, sendfile i mmap")
+    kopiowanie.add_argument("--rozmiar", type=int, nargs="+", default=[1, 16, 128, 512], help="MB")
+    kopiowanie.add_argument("--predkosc", type=int, default=0, help="MB/s, 0 - bez ograniczenia")
+    kopiowanie.add_argument("--porcja", type=int, default=4096, help="KB")
+    kopiowanie.add_argument("--powtorzenia", type=int, default=3)
+
+    pamiec = podkomendy.add_parser("pamiec", help="pamięć na klienta w kolumnowym magazynie")
+    pamiec.add_argument("--klienci", type=int, nargs="+", default=[10000, 100000, 1000000])
+    pamiec.add_argument("--ziarno", type=int, default=0)
+
+    wsadowa = podkomendy.add_parser("wsadowa", help="aukcja wsadowa dla wielu dysków kontra pętla aukcji")
+    wsadowa.add_argument("--klienci", type=int, default=100000)
+    wsadowa.add_argument("--dyski", type=int, default=100)
+    wsadowa.add_argument("--rundy", type=int, default=30)
+    wsadowa.add_argument("--ziarno", type=int, default=0)
+
+    pauza = podkomendy.add_parser("pauza", help="koszt pauzy i wznowienia przy wielu klientach")
+    pauza.add_argument("--klienci", type=int, nargs="+", default=[1000, 100000])
+    pauza.add_argument("--cykle", type=int, default=1000)
+    pauza.add_argument("--ziarno", type=int, default=0)
+
+    partycje = podkomendy.add_parser("partycje", help="aukcja w procesach roboczych, skalowanie z liczbą procesów")
+    partycje.add_argument("--klienci", type=int, default=1000000)
+    partycje.add_argument("--procesy", type=int, nargs="+", default=[1, 2, 4, 8])
+    partycje.add_argument("--aukcje", type=int, default=20)
+    partycje.add_argument("--ziarno", type=int, default=0)
+
+    asynchroniczny = podkomendy.add_parser("asyncio", help="serwer na asyncio z tysiącami dysków")
+    asynchroniczny.add_argument("--dyski", type=int, default=10000)
+    asynchroniczny.add_argument("--watki", type=int, default=1000, help="dyski-wątki do porównania pamięci")
+    asynchroniczny.add_argument("--klienci", type=int, default=20000)
+    asynchroniczny.add_argument("--proby", type=int, default=100)
+    asynchroniczny.add_argument("--ziarno", type=int, default=0)
+
+    metryki = podkomendy.add_parser("metryki", help="koszt zapisu metryk i eksport Prometheus/JSON")
+    metryki.add_argument("--zdarzenia", type=int, default=1000000)
+    metryki.add_argument("--klienci", type=int, default=2000)
+    metryki.add_argument("--ziarno", type=int, default=0)
+
+    dziennik = podkomendy.add_parser("dziennik", help="logging do pliku kontra dziennik zdarzeń z kolejką")
+    dziennik.add_argument("--watki", type=int, default=64)
+    dziennik.add_argument("--zdarzenia", type=int, default=5000, help="na wątek")
+    dziennik.add_argument("--maks-rozmiar", type=int, default=4 * 1024 * 1024, help="bajty pliku przed rotacją")
+
+    slad = podkomendy.add_parser("slad", help="nagrywanie i deterministyczne odtwarzanie śladu obciążenia")
+    slad.add_argument("--slad", help="ślad do odtworzenia (.csv lub kolumnowy); domyślnie generowany")
+    slad.add_argument("--klienci", type=int, default=2000)
+    slad.add_argument("--dyski", type=int, default=5)
+    slad.add_argument("--ziarno", type=int, default=0)
+    slad.add_argument("--zapisz", help="zapisuje użyty ślad do pliku")
+    slad.add_argument("--wzorzec", help="plik JSON z wynikami odniesienia (p99 oczekiwania, przepustowość)")
+    slad.add_argument("--zapisz-wzorzec", action="store_true", help="zapisuje wyniki jako nowy wzorzec")
+    slad.add_argument("--tolerancja", type=float, default=0.05, help="dopuszczalne względne pogorszenie")
+
+    obciazenie = podkomendy.add_parser("obciazenie", help="generator obciążenia: przybycia i rozkłady rozmiarów")
+    obciazenie.add_argument("--klienci", type=int, default=200)
+    obciazenie.add_argument("--pliki", type=int, default=1000, help="mediana liczby plików klienta")
+    obciazenie.add_argument("--dyski", type=int, default=100)
+    obciazenie.add_argument("--ziarno", type=int, default=0)
+
+    stan = podkomendy.add_parser("stan", help="zapis i wczytanie stanu serwera, wznowienie przesyłań")
+    stan.add_argument("--pliki", type=int, default=1000000, help="pliki w kolejce")
+    stan.add_argument("--dyski", type=int, default=5)
+    stan.add_argument("--ziarno", type=int, default=0)
+
+    podzial = podkomendy.add_parser("podzial", help="podział dużych plików i kradzież segmentów przez dyski")
+    podzial.add_argument("--klienci", type=int, default=1000)
+    podzial.add_argument("--dyski", type=int, default=20)
+    podzial.add_argument("--segmenty", type=int, nargs="+", default=[256, 64], help="rozmiary segmentów (MB)")
+    podzial.add_argument("--ziarno", type=int, default=0)
+
+    siec = podkomendy.add_parser("siec", help="wejście sieciowe: zgłoszenia/s, opóźnienia, wstrzymanie czytania")
+    siec.add_argument("--polaczenia", type=int, default=4)
+    siec.add_argument("--zgloszenia", type=int, default=5000)
+    siec.add_argument("--okna", type=int, nargs="+", default=[1, 64], help="zgłoszenia w toku na połączenie")
+    siec.add_argument("--pliki", type=int, default=2, help="pliki w zgłoszeniu")
+    siec.add_argument("--ziarno", type=int, default=0)
+
+    argumenty = parser.parse_args()
+    if argumenty.komenda == "aukcja":
+        for liczba in argumenty.klienci:
+            zmierz_aukcje(liczba, argumenty.aukcje, argumenty.ziarno)
+    elif argumenty.komenda == "symulacja":
+        if not zmierz_symulacje(argumenty.klienci, argumenty.dni, argumenty.ziarno):
+            sys.exit(1)
+    elif argumenty.komenda == "latencja":
+        zmierz_podjecie_pracy(argumenty.proby, argumenty.ziarno)
+    elif argumenty.komenda == "przesylanie":
+        wyniki = [zmierz_przesylanie(rozmiar * 10**6, argumenty.predkosc * 10**6, argumenty.porcja * 1024)
+                  for rozmiar in argumenty.rozmiar]
+        if not all(wyniki):
+            sys.exit(1)
+    elif argumenty.komenda == "pamiec":
+        for liczba in argumenty.klienci:
+            zmierz_pamiec(liczba, argumenty.ziarno)
+    elif argumenty.komenda == "stan":
+        if not zmierz_stan(argumenty.pliki, argumenty.dyski, argumenty.ziarno):
+            sys.exit(1)
+    elif argumenty.komenda == "siec":
+        if not zmierz_siec(argumenty.polaczenia, argumenty.zgloszenia, argumenty.okna, argumenty.pliki,
+                           argumenty.ziarno):
+            sys.exit(1)
+    elif argumenty.komenda == "podzial":
+        if not zmierz_podzial(argumenty.klienci, argumenty.dyski, [rozmiar * 10**6 for rozmiar in argumenty.segmenty],
+                              argumenty.ziarno):
+            sys.exit(1)
+    elif argumenty.komenda == "obciazenie":
+        if not zmierz_obciazenie(argumenty.klienci, argumenty.pliki, argumenty.dyski, argumenty.ziarno):
+            sys.exit(1)
+    elif argumenty.komenda == "slad":
+        if not sprawdz_slad(argumenty.slad, argumenty.klienci, argumenty.dyski, argumenty.ziarno, argumenty.zapisz,
+                            argumenty.wzorzec, argumenty.zapisz_wzorzec, argumenty.tolerancja):
+            sys.exit(1)
+    elif argumenty.komenda == "dziennik":
+        if not zmierz_dziennik(argumenty.watki, argumenty.zdarzenia, argumenty.maks_rozmiar):
+            sys.exit(1)
+    elif argumenty.komenda == "metryki":
+        if not zmierz_metryki(argumenty.zdarzenia, argumenty.klienci, argumenty.ziarno):
+            sys.exit(1)
+    elif argumenty.komenda == "asyncio":
+        zmierz_asyncio(argumenty.dyski, argumenty.watki, argumenty.klienci, argumenty.proby, argumenty.ziarno)
+    elif argumenty.komenda == "partycje":
+        if not zmierz_partycje(argumenty.klienci, argumenty.procesy, argumenty.aukcje, argumenty.ziarno):
+            sys.exit(1)
+    elif argumenty.komenda == "pauza":
+        if not zmierz_pauze(argumenty.klienci, argumenty.cykle, argumenty.ziarno):
+            sys.exit(1)
+    elif argumenty.komenda == "wsadowa":
+        if not zmierz_przydzial_wsadowy(argumenty.klienci, argumenty.dyski, argumenty.rundy, argumenty.ziarno):
+            sys.exit(1)
+    elif argumenty.komenda == "kopiowanie":
+        if not zmierz_kopiowanie([rozmiar * 10**6 for rozmiar in argumenty.rozmiar], argumenty.predkosc * 10**6,
+                                 argumenty.porcja * 1024, argumenty.powtorzenia):
+            sys.exit(1)
+    elif argumenty.komenda == "polityki":
+        raport = porownaj_polityki(argumenty.polityki, argumenty.obciazenia, argumenty.klienci,
+                                   argumenty.ziarno, [PROFILE_DYSKOW['hdd']] * argumenty.dyski)
+        if argumenty.wyjscie:
+            with open(argumenty.wyjscie, "w") as plik:
+                json.dump(raport, plik, indent=2)
+        else:
+            json.dump(raport, sys.stdout, indent=2)
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import json
+import logging
+import os
+import queue
+import threading
+
+# Dziennik zdarzeń symulacji w formacie JSON lines: jedna linia na zdarzenie,
+# np. {"t": 1.25, "zdarzenie": "przydzial", "dysk": 0, "klient": 3, "plik": 512}.
+# Wątek zgłaszający zdarzenie tylko wkłada krotkę do kolejki - serializacja,
+# zapis do pliku i rotacja odbywają się w wątku zapisującym, paczkami.
+
+# Domyślny rozmiar pliku, po którym następuje rotacja (bajty)
+MAKS_ROZMIAR = 64 * 1024 * 1024
+
+# Najwięcej zdarzeń zapisywanych jednym wywołaniem write
+ROZMIAR_PACZKI = 4096
+
+# Jeden koder dla wszystkich zdarzeń - json.dumps z własnymi opcjami tworzy
+# nowy koder przy każdym wywołaniu
+_KODER = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+# Zdarzenia, które wątek zapisujący przepisuje też do dziennika tekstowego
+# (logging): zdarzenie -> (poziom, szablon wypełniany polami zdarzenia)
+TEKSTY = {
+    'zakonczenie': (logging.INFO, "Dysk {dysk}: Zakończono przesyłanie pliku o rozmiarze {plik}"),
+    'blad': (logging.ERROR, "Dysk {dysk}: Wystąpił błąd podczas przesyłania pliku - {blad}"),
+}
+
+
+# Klasa Dziennika zdarzeń. Rotacja jak w logging.handlers.RotatingFileHandler:
+# bieżący plik `sciezka`, starsze `sciezka.1` ... `sciezka.<kopie>`.
+# Z podanym `log` (logging.Logger) zdarzenia z TEKSTY trafiają także do niego.
+class DziennikZdarzen(threading.Thread):
+    def __init__(self, sciezka, maks_rozmiar=MAKS_ROZMIAR, kopie=5, okres=0.5, rozmiar_paczki=ROZMIAR_PACZKI,
+                 log=None):
+        super().__init__(daemon=True)
+        self.sciezka = sciezka
+        self.maks_rozmiar = maks_rozmiar
+        self.kopie = kopie
+        self.okres = okres  # najdłuższy czas, przez jaki zdarzenie czeka na zapis (s)
+        self.rozmiar_paczki = rozmiar_paczki
+        self.log = log
+        self.kolejka = queue.SimpleQueue()
+        self.plik = None
+        self.rozmiar = 0  # bajty w bieżącym pliku
+        self.zapisane = 0  # zdarzenia zapisane do plików
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *wyjatek):
+        self.zamknij()
+
+    # Zgłoszenie zdarzenia - wywoływane z wątków dysków i serwera.
+    # czas to wskazanie zegara symulacji w chwili zdarzenia.
+    def zapisz(self, zdarzenie, czas, **pola):
+        self.kolejka.put((czas, zdarzenie, pola))
+
+    # Zapisuje zdarzenia zgłoszone do tej pory i kończy wątek zapisujący
+    def zamknij(self):
+        if self.is_alive():
+            self.kolejka.put(None)
+            self.join()
+
+    def _otworz(self):
+        katalog = os.path.dirname(self.sciezka)
+        if katalog:
+            os.makedirs(katalog, exist_ok=True)
+        self.plik = open(self.sciezka, 'ab')
+        self.rozmiar = self.plik.tell()
+
+    def _rotuj(self):
+        self.plik.close()
+        for numer in range(self.kopie - 1, 0, -1):
+            starszy = f"{self.sciezka}.{numer}"
+            if os.path.exists(starszy):
+                os.replace(starszy, f"{self.sciezka}.{numer + 1}")
+        if self.kopie:
+            os.replace(self.sciezka, f"{self.sciezka}.1")
+        else:
+            os.remove(self.sciezka)
+        self._otworz()
+
+    def _zapisz_paczke(self, paczka):
+        koduj = _KODER.encode
+        linie = [koduj({'t': czas, 'zdarzenie': zdarzenie, **pola}) for czas, zdarzenie, pola in paczka]
+        dane = ('\n'.join(linie) + '\n').encode('utf-8')
+        if self.rozmiar and self.rozmiar + len(dane) > self.maks_rozmiar:
+            self._rotuj()
+        self.plik.write(dane)
+        self.plik.flush()
+        self.rozmiar += len(dane)
+        self.zapisane += len(paczka)
+        if self.log is not None:
+            for czas, zdarzenie, pola in paczka:
+                if zdarzenie in TEKSTY:
+                    poziom, szablon = TEKSTY[zdarzenie]
+                    self.log.log(poziom, szablon.format(**pola))
+
+    def run(self):
+        self._otworz()
+        try:
+            koniec = False
+            while not koniec:
+                try:
+                    zdarzenie = self.kolejka.get(timeout=self.okres)
+                except queue.Empty:
+                    continue
+                paczka = []
+                # Zbieramy wszystko, co czeka w kolejce, najwyżej rozmiar_paczki zdarzeń
+                while zdarzenie is not None:
+                    paczka.append(zdarzenie)
+                    if len(paczka) >= self.rozmiar_paczki:
+                        break
+                    try:
+                        zdarzenie = self.kolejka.get_nowait()
+                    except queue.Empty:
+                        break
+                if zdarzenie is None:
+                    koniec = True
+                if paczka:
+                    self._zapisz_paczke(paczka)
+        finally:
+            self.plik.close()
+
+
+# Zdarzenia ze wszystkich plików dziennika, od najstarszego
+def czytaj_dziennik(sciezka):
+    katalog, nazwa = os.path.split(sciezka)
+    numery = []
+    for plik in os.listdir(katalog or '.'):
+        przyrostek = plik[len(nazwa) + 1:]
+        if plik.startswith(nazwa + '.') and przyrostek.isdigit():
+            numery.append(int(przyrostek))
+    for sciezka_pliku in [f"{sciezka}.{numer}" for numer in sorted(numery, reverse=True)] + [sciezka]:
+        if not os.path.exists(sciezka_pliku):
+            continue
+        with open(sciezka_pliku, encoding='utf-8') as plik:
+            for linia in plik:
+                yield json.loads(linia)
@@ -0,0 +1,157 @@
+import heapq
+import math
+import threading
+import time
+
+# Tryb krokowy serwera wątkowego: wirtualny czas i deterministyczna kolejność
+# wątków dysków. W danej chwili działa dokładnie jeden wątek dysku albo
+# sterownik (wątek wywołujący uruchom()). Wątek oddaje kolej tylko w wait()
+# warunku utworzonego przez tryb krokowy - sterownik zdejmuje wtedy
+# z kopca (czas, numer) kolejne wybudzenie i przekazuje kolej temu wątkowi.
+# Powiadomienie budzi czekające wątki w bieżącej chwili w kolejności kluczy
+# (identyfikatorów dysków), a czekanie z limitem budzi wątek po upływie
+# wirtualnego czasu - tak samo porządkuje zdarzenia symulacja zdarzeniowa,
+# więc oba modele można porównać krok po kroku.
+# Blokady użytkownika muszą być zwolnione przed oddaniem kolei, co zapewnia
+# wait(); wątek nie może też czekać na nic poza warunkami trybu krokowego.
+
+
+# Wątek pod kontrolą trybu krokowego
+class _Watek:
+    def __init__(self, klucz):
+        self.klucz = klucz
+        self.wersja = 0  # unieważnia zaplanowane wybudzenia po wybudzeniu innym
+
+
+# Klasa Warunku trybu krokowego - zamiennik threading.Condition
+class WarunekKrokowy:
+    def __init__(self, tryb, blokada):
+        self.tryb = tryb
+        self.blokada = blokada
+        self.czekajace = []
+
+    def __enter__(self):
+        return self.blokada.__enter__()
+
+    def __exit__(self, *wyjatek):
+        return self.blokada.__exit__(*wyjatek)
+
+    def wait(self, timeout=None):
+        tryb = self.tryb
+        if tryb.wolny:
+            self.blokada.release()
+            time.sleep(0.001)
+            self.blokada.acquire()
+            return True
+        watek = tryb.watki[threading.get_ident()]
+        with tryb.stan:
+            self.czekajace.append(watek)
+            if timeout is not None:
+                # Co najmniej o jedną pozycję zmiennoprzecinkową dalej - czekanie
+                # na chwilę bliższą niż dokładność czasu nie może stać w miejscu
+                tryb._zaplanuj(max(tryb.czas + timeout, math.nextafter(tryb.czas, math.inf)), watek)
+            self.blokada.release()
+            tryb._oddaj_i_czekaj(watek)
+            if watek in self.czekajace:
+                self.czekajace.remove(watek)
+        self.blokada.acquire()
+        return True
+
+    def notify(self, n=1):
+        with self.tryb.stan:
+            for watek in sorted(self.czekajace, key=lambda watek: watek.klucz)[:n]:
+                self.czekajace.remove(watek)
+                self.tryb._zaplanuj(self.tryb.czas, watek)
+
+    def notify_all(self):
+        self.notify(len(self.czekajace))
+
+
+# Klasa Trybu krokowego
+class TrybKrokowy:
+    def __init__(self):
+        self.czas = 0.0
+        self.stan = threading.Condition()  # chroni kopiec, kolej i wersje wątków
+        self.kopiec = []  # (czas, numer, _Watek i jego wersja albo akcja sterownika)
+        self.numer = 0
+        self.watki = {}  # identyfikator wątku systemowego -> _Watek
+        self.kolej = None  # _Watek, który teraz działa; None - sterownik
+        self.wolny = False  # po zamknij() wątki działają bez kolejki
+
+    # Wirtualny czas w sekundach - źródło zegarów serwera i dysków
+    def teraz(self):
+        return self.czas
+
+    def warunek(self, blokada):
+        return WarunekKrokowy(self, blokada)
+
+    # Akcja sterownika (np. dodanie klienta) w chwili `czas`
+    def zaplanuj(self, czas, akcja):
+        with self.stan:
+            self._zaplanuj(czas, akcja)
+
+    def _zaplanuj(self, czas, cel):
+        if isinstance(cel, _Watek):
+            cel = (cel, cel.wersja)
+        heapq.heappush(self.kopiec, (czas, self.numer, cel))
+        self.numer += 1
+
+    # Uruchamia wątek (np. Dysk), który dostanie kolej w bieżącej chwili
+    def uruchom_watek(self, watek, klucz):
+        wpis = _Watek(klucz)
+        cel = watek.run
+
+        def run():
+            with self.stan:
+                self.watki[threading.get_ident()] = wpis
+                while not self.wolny and self.kolej is not wpis:
+                    self.stan.wait()
+            try:
+                cel()
+            finally:
+                with self.stan:
+                    if self.kolej is wpis:
+                        self.kolej = None
+                        self.stan.notify_all()
+
+        watek.run = run
+        with self.stan:
+            self._zaplanuj(self.czas, wpis)
+        watek.start()
+
+    # Wywoływane pod self.stan przez wątek, który ma kolej
+    def _oddaj_i_czekaj(self, watek):
+        self.kolej = None
+        self.stan.notify_all()
+        while not self.wolny and self.kolej is not watek:
+            self.stan.wait()
+
+    # Przetwarza wybudzenia i akcje do wyczerpania kopca lub do chwili `do_czasu`
+    def uruchom(self, do_czasu=None):
+        while True:
+            with self.stan:
+                if not self.kopiec or (do_czasu is not None and self.kopiec[0][0] > do_czasu):
+                    if do_czasu is not None:
+                        self.czas = max(self.czas, do_czasu)
+                    return
+                czas, _, cel = heapq.heappop(self.kopiec)
+                if isinstance(cel, tuple):
+                    watek, wersja = cel
+                    if wersja != watek.wersja:
+                        continue  # wątek obudzono wcześniej innym zdarzeniem
+                    self.czas = czas
+                    watek.wersja += 1
+                    self.kolej = watek
+                    self.stan.notify_all()
+                    while self.kolej is not None:
+                        self.stan.wait()
+                    continue
+                self.czas = czas
+            cel()
+
+    # Kończy tryb krokowy: wątki działają dalej bez kolejki, a czekanie na
+    # warunku staje się odpytywaniem (np. przed Serwer.zatrzymaj_dyski)
+    def zamknij(self):
+        with self.stan:
+            self.wolny = True
+            self.stan.notify_all()
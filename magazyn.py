@@ -0,0 +1,250 @@
+import math
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # numpy jest opcjonalny - bez niego działa wersja w czystym Pythonie
+    np = None
+
+# Kolumnowy magazyn klientów i ich plików. Zamiast osobnych obiektów i list
+# Pythona dane wszystkich klientów leżą w tablicach typu array: rozmiary
+# plików jednym ciągiem, dla klienta i - przedział [poczatki[i], konce[i]).
+# Zdjęcie pierwszego pliku przesuwa tylko początek przedziału.
+# Czasy są sekundami zegara magazynu (domyślnie ZegarSymulacji).
+
+# Minimalna długość tablicy rozmiarów, od której usuwamy zużyte pozycje
+MIN_ZAGESZCZANIE = 1024
+
+
+# Zegar symulacji - sekundy aktywnej symulacji od epoki. Wstrzymanie zamraża
+# wskazanie, wznowienie przesuwa epokę o długość pauzy; oba kosztują O(1)
+# niezależnie od liczby klientów, których czasy oczekiwania są liczone
+# względem tego zegara. Domyślne źródło time.monotonic_ns nie cofa się przy
+# zmianach zegara systemowego.
+class ZegarSymulacji:
+    def __init__(self, zrodlo=time.monotonic_ns, jednostka=1e-9, wstrzymany=False):
+        self.zrodlo = zrodlo
+        self.jednostka = jednostka  # sekundy na jednostkę źródła
+        epoka = zrodlo()
+        # (epoka, chwila wstrzymania albo None) - zmieniane jednym przypisaniem,
+        # więc odczyt bez blokady nigdy nie widzi połowy zmiany
+        self.stan = (epoka, epoka if wstrzymany else None)
+
+    def __call__(self):
+        epoka, wstrzymany_od = self.stan
+        return ((self.zrodlo() if wstrzymany_od is None else wstrzymany_od) - epoka) * self.jednostka
+
+    def czy_biegnie(self):
+        return self.stan[1] is None
+
+    def zatrzymaj(self):
+        epoka, wstrzymany_od = self.stan
+        if wstrzymany_od is None:
+            self.stan = (epoka, self.zrodlo())
+
+    def wznow(self):
+        epoka, wstrzymany_od = self.stan
+        if wstrzymany_od is not None:
+            self.stan = (epoka + self.zrodlo() - wstrzymany_od, None)
+
+    # Przestawia wskazanie na `czas` sekund (np. przy wczytaniu zapisanego
+    # stanu), bez zmiany stanu wstrzymania
+    def ustaw(self, czas):
+        teraz = self.zrodlo()
+        wstrzymany_od = self.stan[1]
+        self.stan = (teraz - type(teraz)(czas / self.jednostka), None if wstrzymany_od is None else teraz)
+
+
+# Klasa Magazynu klientów
+class MagazynKlientow:
+    def __init__(self, zegar=None):
+        self.zegar = zegar if zegar is not None else ZegarSymulacji()
+        self.identyfikatory = array('q')
+        self.poczatki = array('q')
+        self.konce = array('q')
+        self.rozmiary = array('q')
+        self.czasy_startu = array('d')  # wskazanie zegara przy starcie odliczania, NaN - zatrzymane
+        self.czasy_zatrzymania = array('d')
+        self.wyniki_aukcji = array('d')
+        # Rozmiar pierwszego pliku klienta (NaN - brak plików), utrzymywany przy
+        # każdej zmianie kolejki - aukcja wsadowa czyta go bez zbierania z rozmiarów
+        self.glowy = array('d')
+        self.z_plikami = 0  # klienci z co najmniej jednym plikiem
+        self.zuzyte = 0  # pozycje rozmiarów nienależące już do żadnego klienta
+        # Rośnie przy każdej zmianie rozmiarów innej niż dopisanie na końcu
+        # (zagęszczenie) - zapis stanu dopisuje tylko nowe pozycje
+        self.pokolenie = 0
+
+    def __len__(self):
+        return len(self.identyfikatory)
+
+    def dodaj(self, id_klienta, pliki):
+        self.identyfikatory.append(id_klienta)
+        self.poczatki.append(len(self.rozmiary))
+        self.rozmiary.extend(pliki)
+        self.konce.append(len(self.rozmiary))
+        self.czasy_startu.append(math.nan)
+        self.czasy_zatrzymania.append(0.0)
+        self.wyniki_aukcji.append(0.0)
+        self.glowy.append(math.nan)
+        self._ustaw_glowe(len(self.identyfikatory) - 1)
+        return len(self.identyfikatory) - 1
+
+    def _ustaw_glowe(self, i):
+        poczatek, koniec = self.poczatki[i], self.konce[i]
+        glowa = self.rozmiary[poczatek] if koniec > poczatek else math.nan
+        if math.isnan(self.glowy[i]) != math.isnan(glowa):
+            self.z_plikami += 1 if koniec > poczatek else -1
+        self.glowy[i] = glowa
+
+    # Kolumna pierwszych plików od nowa, po podmianie kolumn (wczytanie stanu)
+    def przelicz_glowy(self):
+        self.glowy = array('d', (self.rozmiary[poczatek] if koniec > poczatek else math.nan
+                                 for poczatek, koniec in zip(self.poczatki, self.konce)))
+        self.z_plikami = sum(1 for poczatek, koniec in zip(self.poczatki, self.konce) if koniec > poczatek)
+
+    # Nowa lista plików trafia na koniec tablicy, stary przedział staje się zużyty
+    def ustaw_pliki(self, i, pliki):
+        self.zuzyte += self.konce[i] - self.poczatki[i]
+        self.poczatki[i] = len(self.rozmiary)
+        self.rozmiary.extend(pliki)
+        self.konce[i] = len(self.rozmiary)
+        self._ustaw_glowe(i)
+        self._zagesc_jesli_trzeba()
+
+    def liczba_plikow(self, i):
+        return self.konce[i] - self.poczatki[i]
+
+    def usun_plik(self, i, n=0):
+        poczatek, koniec = self.poczatki[i], self.konce[i]
+        if n < 0:
+            n += koniec - poczatek
+        if not 0 <= n < koniec - poczatek:
+            raise IndexError("pop index out of range")
+        rozmiar = self.rozmiary[poczatek + n]
+        if n:
+            # Pozostałe pliki klienta trafiają na koniec tablicy jak w ustaw_pliki,
+            # więc zapisane już pozycje rozmiarów się nie zmieniają
+            pozostale = self.rozmiary[poczatek:koniec]
+            del pozostale[n]
+            self.ustaw_pliki(i, pozostale)
+            return rozmiar
+        self.poczatki[i] = poczatek + 1
+        self.zuzyte += 1
+        if poczatek + 1 < koniec:
+            self.glowy[i] = self.rozmiary[poczatek + 1]
+        else:
+            self.glowy[i] = math.nan
+            self.z_plikami -= 1
+        self._zagesc_jesli_trzeba()
+        return rozmiar
+
+    # Zagęszczenie przegląda wszystkich klientów, więc czekamy, aż zużytych
+    # pozycji będzie więcej niż klientów i połowy tablicy - koszt zamortyzowany O(1)
+    def _zagesc_jesli_trzeba(self):
+        if self.zuzyte >= max(MIN_ZAGESZCZANIE, len(self.poczatki), len(self.rozmiary) // 2):
+            self.zagesc()
+
+    # Przepisuje pliki klientów bez zużytych pozycji. Z numpy bez pętli po
+    # klientach: kolejne pozycje nowej tablicy czytają kolejne stare pozycje,
+    # a na początku pliku każdego klienta następuje skok do jego starego początku.
+    def zagesc(self):
+        if np is not None and len(self):
+            poczatki = np.frombuffer(self.poczatki, dtype=np.int64)
+            stare_konce = np.frombuffer(self.konce, dtype=np.int64)
+            dlugosci = stare_konce - poczatki
+            konce = np.cumsum(dlugosci)
+            nowe_poczatki = konce - dlugosci
+            niepuste = np.flatnonzero(dlugosci)
+            kroki = np.ones(konce[-1], dtype=np.int64)
+            kroki[nowe_poczatki[niepuste]] = poczatki[niepuste]
+            kroki[nowe_poczatki[niepuste[1:]]] -= stare_konce[niepuste[:-1]] - 1
+            zrodla = np.cumsum(kroki, out=kroki)
+            rozmiary = array('q')
+            rozmiary.frombytes(memoryview(np.frombuffer(self.rozmiary, dtype=np.int64)[zrodla]).cast('B'))
+            self.rozmiary = rozmiary
+            self.poczatki = array('q', nowe_poczatki.tobytes())
+            self.konce = array('q', konce.tobytes())
+            self.zuzyte = 0
+            self.pokolenie += 1
+            return
+        rozmiary = array('q')
+        poczatki = array('q')
+        konce = array('q')
+        for poczatek, koniec in zip(self.poczatki, self.konce):
+            poczatki.append(len(rozmiary))
+            rozmiary.extend(self.rozmiary[poczatek:koniec])
+            konce.append(len(rozmiary))
+        self.rozmiary, self.poczatki, self.konce = rozmiary, poczatki, konce
+        self.zuzyte = 0
+        self.pokolenie += 1
+
+    # Klienci z plikami: indeksy, rozmiary pierwszych plików i czasy oczekiwania
+    # zmierzone w jednej chwili. Z numpy - tablice liczone wektorowo na buforach
+    # tablic magazynu, bez numpy - listy.
+    def glowy_kolejek(self, wektorowo=True):
+        teraz = self.zegar()
+        if np is not None and wektorowo and len(self):
+            poczatki = np.frombuffer(self.poczatki, dtype=np.int64)
+            indeksy = np.flatnonzero(np.frombuffer(self.konce, dtype=np.int64) > poczatki)
+            rozmiary = np.frombuffer(self.rozmiary, dtype=np.int64)[poczatki[indeksy]].astype(np.float64)
+            czasy_startu = np.frombuffer(self.czasy_startu)[indeksy]
+            czasy_zatrzymania = np.frombuffer(self.czasy_zatrzymania)[indeksy]
+            czasy = np.where(np.isnan(czasy_startu), czasy_zatrzymania, teraz - czasy_startu + czasy_zatrzymania)
+            return indeksy, rozmiary, czasy
+        indeksy, rozmiary, czasy = [], [], []
+        for i, (poczatek, koniec, czas_start, czas_zatrzymania) in enumerate(
+                zip(self.poczatki, self.konce, self.czasy_startu, self.czasy_zatrzymania)):
+            if koniec > poczatek:
+                indeksy.append(i)
+                rozmiary.append(self.rozmiary[poczatek])
+                czasy.append(czas_zatrzymania if math.isnan(czas_start) else teraz - czas_start + czas_zatrzymania)
+        return indeksy, rozmiary, czasy
+
+    # Bajty zajmowane przez tablice magazynu
+    def rozmiar_w_pamieci(self):
+        tablice = (self.identyfikatory, self.poczatki, self.konce, self.rozmiary,
+                   self.czasy_startu, self.czasy_zatrzymania, self.wyniki_aukcji, self.glowy)
+        return sum(tablica.buffer_info()[1] * tablica.itemsize for tablica in tablice)
+
+
+# Widok listy plików klienta - zachowuje się jak posortowana lista rozmiarów
+class PlikiKlienta:
+    __slots__ = ('magazyn', 'indeks')
+
+    def __init__(self, magazyn, indeks):
+        self.magazyn = magazyn
+        self.indeks = indeks
+
+    def __len__(self):
+        return self.magazyn.liczba_plikow(self.indeks)
+
+    def __bool__(self):
+        return self.magazyn.konce[self.indeks] > self.magazyn.poczatki[self.indeks]
+
+    def __getitem__(self, n):
+        magazyn = self.magazyn
+        poczatek, koniec = magazyn.poczatki[self.indeks], magazyn.konce[self.indeks]
+        if n == 0 and koniec > poczatek:  # najczęstszy przypadek - najmniejszy plik
+            return magazyn.rozmiary[poczatek]
+        if isinstance(n, slice):
+            return magazyn.rozmiary[poczatek:koniec][n].tolist()
+        if n < 0:
+            n += koniec - poczatek
+        if not 0 <= n < koniec - poczatek:
+            raise IndexError("list index out of range")
+        return magazyn.rozmiary[poczatek + n]
+
+    def __iter__(self):
+        magazyn = self.magazyn
+        return iter(magazyn.rozmiary[magazyn.poczatki[self.indeks]:magazyn.konce[self.indeks]].tolist())
+
+    def __eq__(self, inne):
+        return list(self) == list(inne)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def pop(self, n=0):
+        return self.magazyn.usun_plik(self.indeks, n)
@@ -1,242 +1,845 @@
 import random
 import math
+import os
 import time
 import threading
 import tkinter as tk
+from tkinter import ttk
+import atexit
 import logging
-from datetime import datetime, timedelta
-
-# Konfiguracja logowania
-logging.basicConfig(filename='symulacja.log', level=logging.INFO, format='%(asctime)s - %(message)s')
-
-# Klasa Klienta
+import logging.handlers
+import queue
+
+from aukcja import AukcjaTurniejowa, aukcja_liniowa, aukcja_wsadowa, wynik_main
+from dziennik import DziennikZdarzen
+from magazyn import MagazynKlientow, PlikiKlienta, ZegarSymulacji
+from metryki import MetrykiSerwera, ZapisMigawek
+from podzial import KopiaWspolna, PodzialyPlikow
+from przesylanie import ROZMIAR_PORCJI, BezKopii, KubelekZetonow, Przesylanie
+from siec import WatekWejscia
+from slad import Slad
+from stan import ZapisStanu, wczytaj_stan
+
+# Konfiguracja logowania - rekordy trafiają do kolejki, a do pliku zapisuje je
+# wątek w tle, więc wątki dysków nie czekają na blokadę i zapis pliku
+_kolejka_logow = queue.SimpleQueue()
+_plik_logow = logging.FileHandler('symulacja.log')
+_plik_logow.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[logging.handlers.QueueHandler(_kolejka_logow)])
+_sluchacz_logow = logging.handlers.QueueListener(_kolejka_logow, _plik_logow)
+_sluchacz_logow.start()
+atexit.register(_sluchacz_logow.stop)
+
+# Port lokalnego punktu metryk Prometheusa
+PORT_METRYK = 9464
+
+# Port wejścia sieciowego, przez które producenci zgłaszają pliki (siec.py)
+PORT_WEJSCIA = 9465
+
+# Zapis stanu serwera - wczytywany przy starcie, uaktualniany w tle i przy zamknięciu
+PLIK_STANU = 'stan_serwera'
+
+# Przepustowości typowych klas dysków (bajty/s)
+PROFILE_DYSKOW = {
+    'nvme': 2000 * 10 ** 6,
+    'ssd': 500 * 10 ** 6,
+    'hdd': 25 * 10 ** 6,
+}
+
+# Klasa Klienta - widok na wiersz kolumnowego magazynu klientów.
+# Klient utworzony bez magazynu dostaje własny, z podanym zegarem.
+# Bez podanych plików klient losuje je z generatora `los`.
 class Klient:
-    def __init__(self, id_klienta):
-        self.id_klienta = id_klienta
-        self.pliki = self.generuj_pliki()
-        self.czas_start = None
-        self.ostatni_wynik_aukcji = 0
-        self.czas_start = None
-        self.ogolny_czas_zatrzymania = 0
-        self.czas_zatrzymania = 0
-        self.czas_ostatniego_zatrzymania = None
-
-    def generuj_pliki(self):
-        liczba_plikow = random.randint(1, 10)  # Maksymalnie 10 plików
-        return sorted([random.randint(1*10**6, 512*10**6) for _ in range(liczba_plikow)])  # Rozmiar od 1MB do 512MB
-
+    __slots__ = ('magazyn', 'indeks', 'widok_plikow')
+
+    def __init__(self, id_klienta, zegar=None, los=random, magazyn=None, pliki=None):
+        self.magazyn = magazyn if magazyn is not None else MagazynKlientow(zegar)
+        pliki = sorted(pliki) if pliki is not None else self.generuj_pliki(los)
+        self.indeks = self.magazyn.dodaj(id_klienta, pliki)
+        self.widok_plikow = PlikiKlienta(self.magazyn, self.indeks)  # aukcje sięgają po pliki bardzo często
+
+    # Widok na istniejący wiersz magazynu (np. wczytanego z zapisanego stanu)
+    @classmethod
+    def z_magazynu(cls, magazyn, indeks):
+        klient = cls.__new__(cls)
+        klient.magazyn = magazyn
+        klient.indeks = indeks
+        klient.widok_plikow = PlikiKlienta(magazyn, indeks)
+        return klient
+
+    def generuj_pliki(self, los=random):
+        liczba_plikow = los.randint(1, 10)  # Maksymalnie 10 plików
+        return sorted([los.randint(1*10**6, 512*10**6) for _ in range(liczba_plikow)])  # Rozmiar od 1MB do 512MB
+
+    @property
+    def id_klienta(self):
+        return self.magazyn.identyfikatory[self.indeks]
+
+    @property
+    def zegar(self):
+        return self.magazyn.zegar
+
+    @property
+    def pliki(self):
+        return self.widok_plikow
+
+    @pliki.setter
+    def pliki(self, pliki):
+        self.magazyn.ustaw_pliki(self.indeks, pliki)
+
+    @property
+    def czas_start(self):
+        czas_start = self.magazyn.czasy_startu[self.indeks]
+        return None if math.isnan(czas_start) else czas_start
+
+    @property
+    def czas_zatrzymania(self):
+        return self.magazyn.czasy_zatrzymania[self.indeks]
+
+    @czas_zatrzymania.setter
+    def czas_zatrzymania(self, czas):
+        self.magazyn.czasy_zatrzymania[self.indeks] = czas
+
+    @property
+    def ostatni_wynik_aukcji(self):
+        return self.magazyn.wyniki_aukcji[self.indeks]
+
+    @ostatni_wynik_aukcji.setter
+    def ostatni_wynik_aukcji(self, wynik):
+        self.magazyn.wyniki_aukcji[self.indeks] = wynik
+
+    # Czas oczekiwania = czas zebrany przed ostatnim zatrzymaniem + wskazanie
+    # zegara od startu odliczania
     def rozpocznij_odliczanie(self):
-        if self.czas_start is None:
-            self.czas_start = datetime.now() - timedelta(seconds=self.czas_zatrzymania)
+        magazyn = self.magazyn
+        if math.isnan(magazyn.czasy_startu[self.indeks]):
+            magazyn.czasy_startu[self.indeks] = magazyn.zegar()
 
     def zatrzymaj_odliczanie(self):
-        if self.czas_start is not None:
-            self.czas_zatrzymania += (datetime.now() - self.czas_start).total_seconds()
-            self.czas_start = None
+        magazyn = self.magazyn
+        czas_start = magazyn.czasy_startu[self.indeks]
+        if not math.isnan(czas_start):
+            magazyn.czasy_zatrzymania[self.indeks] += magazyn.zegar() - czas_start
+            magazyn.czasy_startu[self.indeks] = math.nan
 
+    def czy_odlicza(self):
+        return not math.isnan(self.magazyn.czasy_startu[self.indeks])
 
     def oblicz_czas_oczekiwania(self):
-        if self.czas_start:
-            return (datetime.now() - self.czas_start).total_seconds() + self.czas_zatrzymania
-        return self.czas_zatrzymania
+        magazyn = self.magazyn
+        czas_start = magazyn.czasy_startu[self.indeks]
+        if math.isnan(czas_start):
+            return magazyn.czasy_zatrzymania[self.indeks]
+        return magazyn.zegar() - czas_start + magazyn.czasy_zatrzymania[self.indeks]
+
+# Przerwanie przesyłania przy zamykaniu serwera (Serwer.zatrzymaj_dyski)
+class PrzerwanePrzesylanie(Exception):
+    pass
 
 # Klasa Dysku
 class Dysk(threading.Thread):
-    def __init__(self, id_dysku, serwer):
-        super().__init__()
+    def __init__(self, id_dysku, serwer, predkosc_przesylania=PROFILE_DYSKOW['hdd'], rozmiar_porcji=ROZMIAR_PORCJI):
+        super().__init__(daemon=True)  # wątki dysków nie blokują zamknięcia programu
         self.id_dysku = id_dysku
         self.serwer = serwer
-        self.predkosc_przesylania = 25 * 10 ** 6  # 10MB/s
+        # Zegar symulacji serwera; dysk bez serwera (pomiary przesyłania) mierzy czas monotoniczny
+        self.zegar = serwer.zegar if serwer is not None else time.monotonic
+        # Czas odmierzania przesyłania - w trybie krokowym serwera czas wirtualny
+        self.krokowy = getattr(serwer, 'krokowy', None)
+        self.monotoniczny = self.krokowy.teraz if self.krokowy else time.monotonic
+        self.predkosc_przesylania = predkosc_przesylania  # bajty/s
+        self.rozmiar_porcji = rozmiar_porcji  # bajty
         self.zatrzymaj = False
+        self.wycofany = False  # dysk kończy bieżący plik i opuszcza pulę
+        self.koniec = False  # zamykanie serwera - dysk przerywa przesyłanie i kończy wątek
         self.aktywny_plik = None
         self.aktualny_klient = None  # Dodajemy nową właściwość
-        self.postep_przesylania = 0
+        self.przesylanie = None  # stan bieżącego przesyłania
+        self.przydzial = None  # (klient, plik) przydzielony wsadowo, czekający na odbiór
+        self.wznowienie = 0  # bajty przesłane przed zapisem stanu - od nich rusza przydzielony plik
+        self.podzial = None  # podzielony plik (podzial.PodzialPliku), którego segment przesyła dysk
+        self.segment = None  # (przesunięcie, długość) bieżącego segmentu
+        metryki = getattr(serwer, 'metryki', None)
+        self.metryki = metryki.dysk(id_dysku) if metryki else None
+        self.dziennik = getattr(serwer, 'dziennik', None)
         self.blokada = threading.Lock()
+        # Budzi dysk wstrzymany w trakcie przesyłania
+        self.warunek = self.krokowy.warunek(self.blokada) if self.krokowy else threading.Condition(self.blokada)
+
+    # Postęp bieżącego przesyłania w procentach
+    @property
+    def postep_przesylania(self):
+        przesylanie = self.przesylanie
+        return przesylanie.stan()[1] if przesylanie else 0
 
+    def wstrzymaj(self):
+        with self.warunek:
+            self.zatrzymaj = True
+            self.warunek.notify_all()
 
+    def wznow(self):
+        with self.warunek:
+            self.zatrzymaj = False
+            self.warunek.notify_all()
 
     def run(self):
-        # while not self.zatrzymaj:
         while True:
-            with self.blokada:
-                while self.zatrzymaj:
-                    time.sleep(1)
-                if not self.aktywny_plik:
-                    klient, plik = self.przeprowadz_aukcje(self.serwer.klienci)
-                    if klient:
-                        self.aktywny_plik = plik
-                        self.aktualny_klient = klient  # Przypisujemy klienta do przesyłania pliku
-                        self.przeslij_plik(plik)
-                        self.aktywny_plik = None
-                        self.aktualny_klient = None  # Po przesłaniu resetujemy klienta
-            time.sleep(1)
-
-    def przeslij_plik(self, rozmiar_pliku):
-        try:
-            i = 0
-            czas_przesylania = rozmiar_pliku / self.predkosc_przesylania
-            # for _ in range(10):  # Symulacja przesyłania podzielona na 10 kroków
+            # Dysk czeka na pracę bez odpytywania - serwer budzi go po dodaniu
+            # klienta lub wznowieniu symulacji. Przydział pliku jest atomowy po
+            # stronie serwera, samo przesyłanie odbywa się już poza sekcją krytyczną
+            poczatek = self.zegar()
+            klient, plik = self.serwer.czekaj_na_plik(self)
+            if self.metryki:
+                self.metryki.bezczynnosc.dodaj(self.zegar() - poczatek)
+            if self.koniec:
+                return
+            if not klient:
+                self.serwer.usun_z_puli(self)
+                return
+            # Skradziony segment ma już w dzienniku zdarzenie 'kradziez'
+            if self.dziennik and self.podzial is None:
+                self.dziennik.zapisz('przydzial', self.zegar(), dysk=self.id_dysku, klient=klient.id_klienta,
+                                     plik=plik, oczekiwanie=klient.oblicz_czas_oczekiwania())
+            # Segment skradziony w czekaj_na_plik korzysta z kopii dysku, który wygrał plik
+            skradziony = self.podzial is not None
+            kopia = self.serwer.fabryka_kopii(self, klient, plik) \
+                if self.serwer.fabryka_kopii and not skradziony else None
+            if skradziony:
+                # Segment odtworzony z zapisu stanu może należeć do właściciela pliku
+                self.przeslij_segmenty(wlasciciel=self.podzial.wlasciciel is self)
+            elif self.serwer.czy_podzielic(plik) and not self.wznowienie:
+                self.serwer.podziel_plik(self, klient, plik, kopia)
+                self.przeslij_segmenty(wlasciciel=True)
+            else:
+                self.przeslij_plik(plik, kopia)
+            # Przerwane przesyłanie zostaje na dysku do zapisu stanu serwera
+            if self.koniec:
+                return
+            self.serwer.zwolnij_dysk(self)
+
+    # Odczekuje podany czas pracy dysku; pauza zamraża pozostały czas.
+    # Zwraca łączny czas spędzony we wstrzymaniu.
+    def odczekaj(self, czas):
+        teraz = self.monotoniczny
+        koniec = teraz() + czas
+        wstrzymano = 0.0
+        with self.warunek:
             while True:
-                while self.zatrzymaj:
-                    time.sleep(1)
-                time.sleep(czas_przesylania / 10)
-                self.postep_przesylania += 10  # Aktualizacja postępu
-                i = i + 1
-                if i == 10:
-                    break
-            logging.info(f"Dysk {self.id_dysku}: Zakończono przesyłanie pliku o rozmiarze {rozmiar_pliku}")
-            self.postep_przesylania = 0  # Reset postępu po przesłaniu pliku
+                if self.koniec:
+                    raise PrzerwanePrzesylanie()
+                if self.zatrzymaj:
+                    poczatek_pauzy = teraz()
+                    pozostalo = koniec - poczatek_pauzy
+                    while self.zatrzymaj and not self.koniec:
+                        self.warunek.wait()
+                    if self.koniec:
+                        raise PrzerwanePrzesylanie()
+                    wstrzymano += teraz() - poczatek_pauzy
+                    koniec = teraz() + pozostalo
+                pozostalo = koniec - teraz()
+                if pozostalo <= 0:
+                    return wstrzymano
+                self.warunek.wait(pozostalo)
+
+    # Przesyła plik porcjami; przepustowość ogranicza kubełek żetonów, a pauza
+    # i wznowienie działają między porcjami. Plik wznowiony z zapisanego stanu
+    # rusza od pierwszej nieprzesłanej porcji; rzeczywista kopia (np.
+    # z FabrykaKopii) tworzy plik docelowy od nowa, więc wtedy od początku.
+    def przeslij_plik(self, rozmiar_pliku, kopia=None):
+        kopia = kopia or BezKopii()
+        poczatek = self.zegar()
+        id_klienta = self.aktualny_klient.id_klienta if self.aktualny_klient else None
+        try:
+            # Zapis stanu widzi wznowienie albo przesyłanie od niego ruszające, nigdy żadnego
+            with self.blokada:
+                przeslano = self.wznowienie if isinstance(kopia, BezKopii) else 0
+                przesylanie = Przesylanie(rozmiar_pliku, self.rozmiar_porcji, self.monotoniczny, przeslano)
+                self.przesylanie, self.wznowienie = przesylanie, 0
+            self._przeslij_porcje(przesylanie, kopia, 0, rozmiar_pliku, id_klienta)
+            self._zakoncz_przesylanie(id_klienta, rozmiar_pliku, rozmiar_pliku, self.zegar() - poczatek)
+        except PrzerwanePrzesylanie:
+            logging.info(f"Dysk {self.id_dysku}: Przerwano przesyłanie pliku o rozmiarze {rozmiar_pliku} "
+                         f"po {self.przesylanie.przeslano} B")
         except Exception as e:
-            logging.error(f"Dysk {self.id_dysku}: Wystąpił błąd podczas przesyłania pliku - {e}")
+            self._zapisz_blad(id_klienta, rozmiar_pliku, e)
+        finally:
+            kopia.zamknij()
+            if self.metryki:
+                self.metryki.praca.dodaj(self.zegar() - poczatek)
+
+    # Przesyła segmenty podzielonego pliku: dysk, który wygrał plik, bierze
+    # kolejne segmenty od początku, dysk z kradzieży przesyła tylko swój.
+    # Zakończenie pliku albo jego błąd odnotowuje dysk, który skończył ostatni segment.
+    def przeslij_segmenty(self, wlasciciel):
+        podzial = self.podzial
+        id_klienta = podzial.klient.id_klienta
+        kopia = podzial.kopia or BezKopii()
+        while self.segment is not None:
+            przesuniecie, dlugosc = self.segment
+            poczatek = self.zegar()
+            try:
+                przesylanie = Przesylanie(dlugosc, self.rozmiar_porcji, self.monotoniczny)
+                self._przeslij_porcje(przesylanie, kopia, przesuniecie, podzial.rozmiar, id_klienta)
+                if self.metryki:
+                    czas = self.zegar() - poczatek
+                    if czas > 0:
+                        self.serwer.metryki.przepustowosc.zapisz(dlugosc / czas)
+            except PrzerwanePrzesylanie:
+                logging.info(f"Dysk {self.id_dysku}: Przerwano przesyłanie segmentu {przesuniecie} pliku "
+                             f"o rozmiarze {podzial.rozmiar} po {self.przesylanie.przeslano} B")
+                return
+            except Exception as e:
+                # Do dziennika błąd trafia raz na plik, po jego ostatnim segmencie
+                podzial.blad = podzial.blad or e
+            finally:
+                if self.metryki:
+                    self.metryki.praca.dodaj(self.zegar() - poczatek)
+            if self.serwer.zakoncz_segment(self, wlasciciel):
+                if podzial.kopia:
+                    podzial.kopia.zakoncz()
+                if podzial.blad is None:
+                    self._zakoncz_przesylanie(id_klienta, podzial.rozmiar, None,
+                                              self.zegar() - podzial.czas_przydzialu)
+                else:
+                    self._zapisz_blad(id_klienta, podzial.rozmiar, podzial.blad)
+
+    # Przesyła porcje przesyłania pod przesunięciem `przesuniecie` pliku
+    def _przeslij_porcje(self, przesylanie, kopia, przesuniecie, rozmiar_pliku, id_klienta):
+        kubelek = KubelekZetonow(self.predkosc_przesylania, self.rozmiar_porcji, self.monotoniczny)
+        self.przesylanie = przesylanie
+        for poczatek, ile in przesylanie.porcje():
+            kopia.przeslij(przesuniecie + poczatek, ile)
+            kubelek.pomin(self.odczekaj(kubelek.pobierz(ile)))
+            przesylanie.zapisz_porcje(ile)  # Aktualizacja postępu
+            if self.metryki:
+                self.metryki.bajty.dodaj(ile)
+            if self.dziennik:
+                self.dziennik.zapisz('postep', self.zegar(), dysk=self.id_dysku, klient=id_klienta,
+                                     przeslano=przesuniecie + poczatek + ile, rozmiar=rozmiar_pliku)
+
+    # Zakończenie pliku; `przeslane` - bajty przesłane przez ten dysk (dla
+    # przepustowości), None gdy plik przesłało kilka dysków
+    def _zakoncz_przesylanie(self, id_klienta, rozmiar_pliku, przeslane, czas):
+        if self.metryki:
+            self.metryki.pliki.dodaj()
+            if przeslane is not None and czas > 0:
+                self.serwer.metryki.przepustowosc.zapisz(przeslane / czas)
+        if self.dziennik:
+            self.dziennik.zapisz('zakonczenie', self.zegar(), dysk=self.id_dysku, klient=id_klienta,
+                                 plik=rozmiar_pliku, trwanie=czas)
+
+    def _zapisz_blad(self, id_klienta, rozmiar_pliku, blad):
+        if self.dziennik:
+            self.dziennik.zapisz('blad', self.zegar(), dysk=self.id_dysku, klient=id_klienta,
+                                 plik=rozmiar_pliku, blad=str(blad))
 
 
     def przeprowadz_aukcje(self, klienci):
-        najlepszy_wynik = -1
-        wybrany_klient = None
-        wybrany_plik = None
-
-        # Lista klientów z plikami do przesłania
-        klienci_z_plikami = [klient for klient in klienci if klient.pliki]
-
-        # Liczba klientów biorących udział w aukcji
-        k = len(klienci_z_plikami)
-
-        for klient in klienci_z_plikami:
-            rozmiar_pliku = klient.pliki[0]  # najmniejszy plik
-            t = klient.oblicz_czas_oczekiwania()
-            wynik = (k / (rozmiar_pliku + 1)) + math.log(t + 1) / k
-            if wynik > najlepszy_wynik:
-                najlepszy_wynik = wynik
-                wybrany_klient = klient
-                wybrany_plik = rozmiar_pliku
-
-        # Aktualizujemy wynik aukcji dla klienta, który wygrał aukcję
-        if wybrany_klient:
-            wybrany_klient.ostatni_wynik_aukcji = najlepszy_wynik
-            wybrany_klient.pliki.pop(0)  # Usunięcie pliku z listy klienta
-            return wybrany_klient, wybrany_plik
-        else:
-            return None, None
+        return aukcja_liniowa(klienci, self.predkosc_przesylania)
+
+# Tekst etykiety dysku w GUI (Dysk albo serwer_async.DyskAsync)
+def opis_dysku(dysk):
+    with dysk.blokada:
+        aktywny_plik, aktualny_klient = dysk.aktywny_plik, dysk.aktualny_klient
+    przesylanie = dysk.przesylanie
+    if aktywny_plik and przesylanie:
+        _, procent, przepustowosc = przesylanie.stan()
+        postep = f"{procent:.1f}% ({przepustowosc / 10**6:.1f}MB/s)"
+    else:
+        postep = "Wolny"
+    klient_info = f", Klient {aktualny_klient.id_klienta}, {aktywny_plik//10**6}MB" if aktualny_klient else ""
+    wycofany = " (wycofywany)" if dysk.wycofany else ""
+    return f"Dysk {dysk.id_dysku} [{dysk.predkosc_przesylania//10**6}MB/s]{wycofany}: {postep}{klient_info}"
 
 # Klasa Serwera
 class Serwer:
-    def __init__(self):
+    def __init__(self, aukcja=None, ziarno=None, predkosci_dyskow=None, fabryka_kopii=None,
+                 przydzial_wsadowy=False, dopasuj_predkosc=False, metryki=None, dziennik=None, slad=None,
+                 rozmiar_segmentu=None, krokowy=None):
         self.klienci = []
-        self.dyski = [Dysk(i, self) for i in range(5)]
+        # Opcjonalny krokowy.TrybKrokowy - wirtualny czas i deterministyczna
+        # kolejność wątków dysków (porównanie z symulacją zdarzeniową)
+        self.krokowy = krokowy
+        # Czas oczekiwania klientów płynie tylko w trakcie symulacji; pauza
+        # i wznowienie zatrzymują ten jeden zegar zamiast odliczań klientów
+        self.zegar = ZegarSymulacji(krokowy.teraz, jednostka=1.0, wstrzymany=True) if krokowy \
+            else ZegarSymulacji(wstrzymany=True)
+        # Kolumnowe dane wszystkich klientów; Klient jest tylko widokiem
+        self.magazyn = MagazynKlientow(self.zegar)
+        # Tworzy kopię pliku klienta na dysku (np. przesylanie.FabrykaKopii);
+        # bez niej przesyłanie jest tylko modelem czasu
+        self.fabryka_kopii = fabryka_kopii
+        self.zmienieni_klienci = set()  # klienci zmienieni od ostatniego odczytu przez GUI
+        self.los = random.Random(ziarno)  # generator rozmiarów plików klientów
+        self.pliki_w_kolejce = 0  # pliki klientów czekające na przydział
+        # Opcjonalne metryki.MetrykiSerwera; bez nich harmonogram i dyski nic nie mierzą
+        self.metryki = metryki
+        # Opcjonalny dziennik.DziennikZdarzen - ślad przydziałów, postępu i pauz
+        self.dziennik = dziennik
+        # Opcjonalny slad.Slad - nagranie obciążenia do odtworzenia
+        self.slad = slad
+        # Silnik aukcji wybierający zwycięzcę spośród klientów
+        self.aukcja = aukcja if aukcja is not None else AukcjaTurniejowa(zegar=self.zegar)
+        # Globalna blokada harmonogramu - wybór zwycięzcy i zdjęcie pliku z kolejki
+        # klienta odbywają się w jednej, krótkiej sekcji krytycznej
+        self.blokada_aukcji = threading.Lock()
+        # Budzi dyski czekające na pracę
+        self.warunek = krokowy.warunek(self.blokada_aukcji) if krokowy else threading.Condition(self.blokada_aukcji)
+        if predkosci_dyskow is None:
+            predkosci_dyskow = [PROFILE_DYSKOW['hdd']] * 5
+        self.dyski = [Dysk(i, self, predkosc) for i, predkosc in enumerate(predkosci_dyskow)]
+        for dysk in self.dyski:
+            self.zdarzenie('dysk', dysk.predkosc_przesylania, dysk=dysk.id_dysku, predkosc=dysk.predkosc_przesylania)
+        self.nastepny_id_dysku = len(self.dyski)
         self.czy_aktywna = False
         self.czy_aktywowana = False
+        # Dysk, który pierwszy dostanie blokadę, przydziela pliki wszystkim
+        # czekającym dyskom w jednej aukcji wsadowej
+        self.przydzial_wsadowy = przydzial_wsadowy
+        self.dopasuj_predkosc = dopasuj_predkosc
+        self.czekajace_dyski = set()
+        # Pliki większe niż rozmiar segmentu przesyła kilka dysków naraz -
+        # bezczynne dyski kradną ich segmenty (bez rozmiaru - podział wyłączony)
+        self.podzialy = PodzialyPlikow(rozmiar_segmentu) if rozmiar_segmentu else None
+        if metryki:
+            metryki.obserwuj_serwer(self)
+
+    # Podmienia dziennik serwera i jego dysków (np. na dziennik z powiadomieniami
+    # wejścia sieciowego)
+    def podlacz_dziennik(self, dziennik):
+        with self.blokada_aukcji:
+            self.dziennik = dziennik
+            for dysk in self.dyski:
+                dysk.dziennik = dziennik
+
+    # Zapis zdarzenia w dzienniku (z bieżącym czasem symulacji) i w nagrywanym
+    # śladzie (wartosc - jak w slad.Slad)
+    def zdarzenie(self, nazwa, wartosc=None, **pola):
+        if self.dziennik:
+            self.dziennik.zapisz(nazwa, self.zegar(), **pola)
+        if self.slad is not None:
+            self.slad.zapisz(nazwa, wartosc)
 
     def czy_symulacja_aktywna(self):
         # Sprawdza, czy jakikolwiek dysk jest aktywny
         return any(dysk.is_alive() for dysk in self.dyski)
 
-    def dodaj_klienta(self):
-        nowy_klient = Klient(len(self.klienci) + 1)
-        self.klienci.append(nowy_klient)
-
-        # Rozpocznij odliczanie czasu dla nowego klienta tylko jeśli symulacja jest aktywna
-        if self.czy_symulacja_aktywna():
+    # Klient z losowymi plikami albo z podanymi (np. z odtwarzanego śladu)
+    def dodaj_klienta(self, pliki=None):
+        with self.blokada_aukcji:
+            nowy_klient = Klient(len(self.klienci) + 1, los=self.los, magazyn=self.magazyn, pliki=pliki)
+            self.klienci.append(nowy_klient)
+            # Odliczanie biegnie razem z zegarem symulacji - stoi do jej rozpoczęcia i w pauzie
             nowy_klient.rozpocznij_odliczanie()
+            self.aukcja.dodaj_klienta(nowy_klient)
+            self.pliki_w_kolejce += len(nowy_klient.pliki)
+            self.zmienieni_klienci.add(nowy_klient)
+            self.warunek.notify_all()
+        pliki = list(nowy_klient.pliki)
+        self.zdarzenie('klient', pliki, klient=nowy_klient.id_klienta, pliki=pliki)
+        return nowy_klient
+
+    # Aukcja uwzględnia czas przesyłania na dysku, który o plik licytuje
+    def przydziel_plik(self, predkosc_przesylania=None):
+        with self.blokada_aukcji:
+            return self._licytuj(predkosc_przesylania)
+
+    # Wywoływane pod blokadą harmonogramu
+    def _licytuj(self, predkosc_przesylania):
+        if not self.metryki:
+            klient, plik = self.aukcja.przeprowadz_aukcje(predkosc_przesylania)
+        else:
+            k = getattr(self.aukcja, 'k', None)
+            poczatek = time.perf_counter()
+            klient, plik = self.aukcja.przeprowadz_aukcje(predkosc_przesylania)
+            self.metryki.czas_aukcji.zapisz(time.perf_counter() - poczatek)
+            if k is not None:
+                self.metryki.kandydaci.zapisz(k)
+            if klient:
+                self.metryki.przydzialy.dodaj()
+                self.metryki.oczekiwanie.zapisz(klient.oblicz_czas_oczekiwania())
+        if klient:
+            self.pliki_w_kolejce -= 1
+            self.zmienieni_klienci.add(klient)
+        return klient, plik
+
+    # Jedna aukcja dla wielu dysków: m najlepszych klientów dostaje po pliku.
+    # Przy dopasowaniu prędkości największe pliki trafiają na najszybsze dyski.
+    # Zwraca listę (dysk, klient, plik); dyski bez pliku są pominięte.
+    def przydziel_pliki(self, dyski, dopasuj_predkosc=False):
+        with self.blokada_aukcji:
+            return self._licytuj_wsadowo(dyski, dopasuj_predkosc)
+
+    # Wywoływane pod blokadą harmonogramu. Wyniki liczone są dla średniej
+    # prędkości dysków rundy i polityki silnika aukcji - przy równych dyskach
+    # to ta sama aukcja co _licytuj.
+    def _licytuj_wsadowo(self, dyski, dopasuj_predkosc):
+        if not dyski:
+            return []
+        predkosc = sum(dysk.predkosc_przesylania for dysk in dyski) / len(dyski)
+        k = getattr(self.aukcja, 'k', None)
+        poczatek = time.perf_counter()
+        zwyciezcy = aukcja_wsadowa(self.magazyn, len(dyski), predkosc,
+                                   polityka=getattr(self.aukcja, 'polityka', wynik_main))
+        przydzialy = self.aukcja.zdejmij_pliki(zwyciezcy)
+        self.pliki_w_kolejce -= len(przydzialy)
+        if self.metryki:
+            self.metryki.czas_aukcji.zapisz(time.perf_counter() - poczatek)
+            if k is not None:
+                self.metryki.kandydaci.zapisz(k)
+            self.metryki.przydzialy.dodaj(len(przydzialy))
+            for klient, _ in przydzialy:
+                self.metryki.oczekiwanie.zapisz(klient.oblicz_czas_oczekiwania())
+        if dopasuj_predkosc:
+            dyski = sorted(dyski, key=lambda dysk: dysk.predkosc_przesylania, reverse=True)
+            przydzialy.sort(key=lambda przydzial: przydzial[1], reverse=True)
+        for klient, _ in przydzialy:
+            self.zmienieni_klienci.add(klient)
+        return [(dysk, klient, plik) for dysk, (klient, plik) in zip(dyski, przydzialy)]
+
+    # Przydziela pliki dyskowi i wszystkim dyskom czekającym na pracę
+    def _przydziel_czekajacym(self, dysk):
+        dyski = [dysk] + sorted((czekajacy for czekajacy in self.czekajace_dyski
+                                 if not (czekajacy.zatrzymaj or czekajacy.wycofany or czekajacy.przydzial)),
+                                key=lambda czekajacy: czekajacy.id_dysku)
+        for wybrany, klient, plik in self._licytuj_wsadowo(dyski, self.dopasuj_predkosc):
+            wybrany.przydzial = (klient, plik)
+        if len(dyski) > 1:
+            self.warunek.notify_all()
+
+    def pobierz_zmienionych_klientow(self):
+        with self.blokada_aukcji:
+            zmienieni, self.zmienieni_klienci = self.zmienieni_klienci, set()
+        return zmienieni
+
+    # Blokuje dysk do chwili, gdy nie jest wstrzymany i jest dla niego plik;
+    # wycofany dysk dostaje (None, None)
+    def czekaj_na_plik(self, dysk):
+        with self.warunek:
+            while True:
+                # Zamykany dysk zostawia przydzielony plik do zapisu stanu
+                if dysk.koniec:
+                    return None, None
+                if not (dysk.przydzial or dysk.wycofany or dysk.zatrzymaj):
+                    if self.przydzial_wsadowy:
+                        self._przydziel_czekajacym(dysk)
+                    else:
+                        klient, plik = self._licytuj(dysk.predkosc_przesylania)
+                        if klient:
+                            dysk.przydzial = (klient, plik)
+                    # Bez plików w aukcji dysk bierze segment cudzego pliku
+                    if not dysk.przydzial and self.podzialy and self.podzialy.czy_do_kradziezy():
+                        self._ukradnij_segment(dysk)
+                # Plik przydzielony przez inny dysk jest odbierany także po wycofaniu.
+                # Przydział staje się plikiem dysku w tej samej sekcji krytycznej,
+                # więc zapis stanu serwera widzi go zawsze w jednym z tych miejsc.
+                if dysk.przydzial:
+                    przydzial, dysk.przydzial = dysk.przydzial, None
+                    with dysk.blokada:
+                        dysk.aktualny_klient, dysk.aktywny_plik = przydzial
+                    return przydzial
+                if dysk.wycofany:
+                    return None, None
+                self.czekajace_dyski.add(dysk)
+                self.warunek.wait()
+                self.czekajace_dyski.discard(dysk)
+
+    def czy_podzielic(self, rozmiar_pliku):
+        return self.podzialy is not None and self.podzialy.czy_podzielic(rozmiar_pliku)
+
+    # Dzieli plik wygrany przez dysk na segmenty; dysk dostaje pierwszy,
+    # a czekające dyski są budzone, żeby wzięły pozostałe
+    def podziel_plik(self, dysk, klient, rozmiar_pliku, kopia=None):
+        with self.warunek:
+            podzial = self.podzialy.podziel(klient, rozmiar_pliku, self.zegar(),
+                                            KopiaWspolna(kopia) if kopia else None)
+            podzial.wlasciciel = dysk
+            self._przypisz_segment(dysk, podzial, self.podzialy.pobierz(podzial))
+            self.warunek.notify_all()
+        return podzial
+
+    # Wywoływane pod blokadą harmonogramu
+    def _ukradnij_segment(self, dysk):
+        podzial, segment = self.podzialy.ukradnij()
+        self._przypisz_segment(dysk, podzial, segment)
+        dysk.przydzial = (podzial.klient, podzial.rozmiar)
+        if self.metryki:
+            self.metryki.kradzieze.dodaj()
+        if self.dziennik:
+            self.dziennik.zapisz('kradziez', self.zegar(), dysk=dysk.id_dysku, klient=podzial.klient.id_klienta,
+                                 plik=podzial.rozmiar, przesuniecie=segment[0], dlugosc=segment[1])
+
+    # Wywoływane pod blokadą harmonogramu - zapis stanu widzi segment dysku
+    # razem z segmentami czekającymi w podziale. Dysk bez kolejnego segmentu
+    # skończył swoją część pliku i nie ma już czego zapisywać.
+    def _przypisz_segment(self, dysk, podzial, segment):
+        with dysk.blokada:
+            dysk.podzial = podzial if segment else None
+            dysk.segment = segment
+            dysk.przesylanie = None
+            if not segment:
+                dysk.aktywny_plik = None
+                dysk.aktualny_klient = None
+
+    # Koniec pracy dysku nad plikiem, pod blokadą harmonogramu - zapis stanu
+    # widzi plik na dysku aż do chwili, gdy przestaje on być potrzebny
+    def zwolnij_dysk(self, dysk):
+        with self.blokada_aukcji, dysk.blokada:
+            dysk.aktywny_plik = None
+            dysk.aktualny_klient = None
+            dysk.przesylanie = None
+            dysk.podzial = None
+            dysk.segment = None
+
+    # Odnotowuje koniec segmentu dysku i daje dyskowi, który wygrał plik,
+    # kolejny segment. Zwraca True, gdy był to ostatni segment pliku.
+    def zakoncz_segment(self, dysk, wlasciciel):
+        with self.blokada_aukcji:
+            podzial = dysk.podzial
+            koniec_pliku = podzial.zakoncz_segment()
+            self._przypisz_segment(dysk, podzial, self.podzialy.pobierz(podzial) if wlasciciel else None)
+        return koniec_pliku
+
+    # Dodaje dysk do działającej puli
+    def dodaj_dysk(self, predkosc_przesylania=PROFILE_DYSKOW['hdd']):
+        with self.blokada_aukcji:
+            dysk = Dysk(self.nastepny_id_dysku, self, predkosc_przesylania)
+            self.nastepny_id_dysku += 1
+            self.dyski.append(dysk)
+        self.zdarzenie('dysk', predkosc_przesylania, dysk=dysk.id_dysku, predkosc=predkosc_przesylania)
+        if not self.czy_aktywna:
+            dysk.wstrzymaj()
+        if self.czy_aktywowana:
+            self._uruchom_dysk(dysk)
+        return dysk
+
+    # Wycofuje dysk z puli; dysk w trakcie przesyłania najpierw kończy plik
+    def usun_dysk(self, id_dysku):
+        with self.warunek:
+            dysk = next((dysk for dysk in self.dyski if dysk.id_dysku == id_dysku), None)
+            if dysk is None:
+                return None
+            dysk.wycofany = True
+            if not dysk.is_alive():
+                self.dyski.remove(dysk)
+            self.warunek.notify_all()
+        self.zdarzenie('wycofanie', id_dysku, dysk=id_dysku)
+        return dysk
+
+    def usun_z_puli(self, dysk):
+        with self.blokada_aukcji:
+            if dysk in self.dyski:
+                self.dyski.remove(dysk)
+
+    def _powiadom_dyski(self):
+        with self.warunek:
+            self.warunek.notify_all()
 
 
     def uruchom(self):
         # self.zatrzymaj_dyski()  # Upewniamy się, że poprzednie dyski są zatrzymane
         # self.dyski = [Dysk(i, self) for i in range(5)]  # Tworzymy nowe wątki dysków
-        for dysk in self.dyski:
-            dysk.start()
-            dysk.zatrzymaj = False
+        for dysk in list(self.dyski):
+            self._uruchom_dysk(dysk)
+            dysk.wznow()
         self.czy_aktywowana = True
 
-    def zatrzymaj_dyski(self):
-        for dysk in self.dyski:
-            dysk.zatrzymaj = True
+    def _uruchom_dysk(self, dysk):
+        if self.krokowy:
+            self.krokowy.uruchom_watek(dysk, dysk.id_dysku)
+        else:
+            dysk.start()
+
+    # Kończy wątki dysków (np. przed zapisem stanu przy zamykaniu programu).
+    # Dysk w trakcie przesyłania przerywa je po bieżącej porcji i zachowuje
+    # postęp, czekający na pracę lub wstrzymany kończy od razu. Zwraca
+    # dyski, których wątki nie skończyły się w czasie `limit_czasu` (s).
+    def zatrzymaj_dyski(self, limit_czasu=None):
+        dyski = list(self.dyski)
+        for dysk in dyski:
+            with dysk.warunek:
+                dysk.koniec = True
+                dysk.warunek.notify_all()
+        self._powiadom_dyski()
+        koniec = None if limit_czasu is None else time.monotonic() + limit_czasu
+        for dysk in dyski:
             if dysk.is_alive():  # Sprawdzenie, czy wątek został uruchomiony
-                dysk.join()      # Oczekujemy na zakończenie wątku tylko jeśli był uruchomiony
+                dysk.join(None if koniec is None else max(0.0, koniec - time.monotonic()))
+        return [dysk for dysk in dyski if dysk.is_alive()]
 
 
     def rozpocznij_symulacje(self):
-        for klient in self.klienci:
-            klient.rozpocznij_odliczanie()
+        with self.blokada_aukcji:
+            self.zegar.wznow()
         if not self.czy_aktywowana:
             self.uruchom()
         else:
-            for dysk in self.dyski:
-                dysk.zatrzymaj = False
+            for dysk in list(self.dyski):
+                dysk.wznow()
+        self._powiadom_dyski()
         self.czy_aktywna = True
+        self.zdarzenie('wznowienie')
 
 
     def zatrzymaj_symulacje(self):
-        for dysk in self.dyski:
-            dysk.zatrzymaj = True
-        for klient in self.klienci:
-            klient.zatrzymaj_odliczanie()
+        for dysk in list(self.dyski):
+            dysk.wstrzymaj()
+        with self.blokada_aukcji:
+            self.zegar.zatrzymaj()
         self.czy_aktywna = False
+        self.zdarzenie('pauza')
 
     def czy_zakonczyc(self):
         return all(not klient.pliki for klient in self.klienci)
 
 # Klasa Interfejsu Graficznego
 class GUI:
-    def __init__(self, serwer):
+    def __init__(self, serwer, okres_odswiezania=1000):
         self.serwer = serwer
+        self.okres_odswiezania = okres_odswiezania  # ms między cyklicznymi odświeżeniami
+        self.odswiezenie_oczekuje = False
         self.root = tk.Tk()
         self.root.title("Symulacja Serwera")
         self.root.geometry("800x600")  # Ustawienie stałego rozmiaru okna
         self.stworz_widgety()
-        self.labels_dyski = [tk.Label(self.root) for _ in range(5)]
-        self.labels_klienci = []
-        self.aktualizuj_interfejs()
+        self.labels_dyski = []
+        self.teksty_dyskow = []  # ostatnio wyświetlone teksty etykiet dysków
+        self.petla_odswiezania()
 
     def stworz_widgety(self):
         self.przycisk_start = tk.Button(self.root, text="Rozpocznij", command=self.rozpocznij_symulacje)
         self.przycisk_stop = tk.Button(self.root, text="Zatrzymaj", command=self.zatrzymaj_symulacje)
         self.przycisk_dodaj_klienta = tk.Button(self.root, text="Dodaj Klienta", command=self.dodaj_klienta)
+        self.przycisk_dodaj_dysk = tk.Button(self.root, text="Dodaj Dysk", command=self.dodaj_dysk)
+        self.przycisk_usun_dysk = tk.Button(self.root, text="Usuń Dysk", command=self.usun_dysk)
         self.przycisk_start.pack()
         self.przycisk_stop.pack()
         self.przycisk_dodaj_klienta.pack()
+        self.przycisk_dodaj_dysk.pack()
+        self.przycisk_usun_dysk.pack()
+
+        # Tabela klientów - Treeview rysuje tylko widoczne wiersze, a wiersze są
+        # aktualizowane wyłącznie dla klientów zmienionych od poprzedniego odświeżenia
+        self.label_odswiezania = tk.Label(self.root)
+        self.label_odswiezania.pack(side=tk.BOTTOM)
+        ramka = tk.Frame(self.root)
+        ramka.pack(fill=tk.BOTH, expand=True)
+        self.tabela_klienci = ttk.Treeview(ramka, columns=("klient", "pliki", "rozmiary"), show="headings")
+        self.tabela_klienci.heading("klient", text="Klient")
+        self.tabela_klienci.heading("pliki", text="Plików")
+        self.tabela_klienci.heading("rozmiary", text="Rozmiary")
+        self.tabela_klienci.column("klient", width=80, stretch=False)
+        self.tabela_klienci.column("pliki", width=80, stretch=False)
+        pasek = ttk.Scrollbar(ramka, orient=tk.VERTICAL, command=self.tabela_klienci.yview)
+        self.tabela_klienci.configure(yscrollcommand=pasek.set)
+        pasek.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tabela_klienci.pack(fill=tk.BOTH, expand=True)
 
     def aktualizuj_interfejs(self):
-        for i, dysk in enumerate(self.serwer.dyski):
-            postep = f"{dysk.postep_przesylania}%" if dysk.aktywny_plik else "Wolny"
-            klient_info = f", Klient {dysk.aktualny_klient.id_klienta}, {dysk.aktywny_plik//10**6}MB" if dysk.aktualny_klient else ""
-            self.labels_dyski[i].config(text=f"Dysk {i}: {postep}{klient_info}")
-            self.labels_dyski[i].pack()
-
-        for label in self.labels_klienci:
-            label.destroy()
-        self.labels_klienci.clear()
-
-        for i, klient in enumerate(self.serwer.klienci):
-            czas_oczekiwania = klient.oblicz_czas_oczekiwania()
-            wynik_aukcji = f", Wynik aukcji: {klient.ostatni_wynik_aukcji:.2f}"
-            rozmiary_plikow = ', '.join([f"{rozmiar//10**6}MB" for rozmiar in klient.pliki])
-            label_text = f"Klient {klient.id_klienta}: {len(klient.pliki)} plików [{rozmiary_plikow}]"
-            label = tk.Label(self.root, text=label_text)
-            label.pack()
-            self.labels_klienci.append(label)
-
-        self.root.after(1000, self.aktualizuj_interfejs)
+        start = time.perf_counter()
+        dyski = list(self.serwer.dyski)
+        # Liczba etykiet nadąża za pulą dysków zmienianą w trakcie działania
+        while len(self.labels_dyski) < len(dyski):
+            label = tk.Label(self.root)
+            label.pack(after=self.labels_dyski[-1] if self.labels_dyski else self.przycisk_usun_dysk)
+            self.labels_dyski.append(label)
+            self.teksty_dyskow.append(None)
+        while len(self.labels_dyski) > len(dyski):
+            self.labels_dyski.pop().destroy()
+            self.teksty_dyskow.pop()
+
+        for i, dysk in enumerate(dyski):
+            tekst = opis_dysku(dysk)
+            if tekst != self.teksty_dyskow[i]:
+                self.labels_dyski[i].config(text=tekst)
+                self.teksty_dyskow[i] = tekst
+
+        for klient in sorted(self.serwer.pobierz_zmienionych_klientow(), key=lambda klient: klient.id_klienta):
+            pliki = list(klient.pliki)
+            rozmiary_plikow = ', '.join([f"{rozmiar//10**6}MB" for rozmiar in pliki])
+            wiersz = (klient.id_klienta, len(pliki), rozmiary_plikow)
+            iid = str(klient.id_klienta)
+            if self.tabela_klienci.exists(iid):
+                self.tabela_klienci.item(iid, values=wiersz)
+            else:
+                self.tabela_klienci.insert("", tk.END, iid=iid, values=wiersz)
+
+        self.label_odswiezania.config(text=f"Odświeżenie: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    # Jedyna cykliczna pętla odświeżania, uruchamiana raz w konstruktorze
+    def petla_odswiezania(self):
+        self.aktualizuj_interfejs()
+        self.root.after(self.okres_odswiezania, self.petla_odswiezania)
+
+    # Natychmiastowe przerysowanie po akcji użytkownika; wiele unieważnień przed
+    # najbliższą bezczynnością pętli Tk skleja się w jedno odświeżenie
+    def uniewaznij(self):
+        if not self.odswiezenie_oczekuje:
+            self.odswiezenie_oczekuje = True
+            self.root.after_idle(self._odswiez_po_uniewaznieniu)
+
+    def _odswiez_po_uniewaznieniu(self):
+        self.odswiezenie_oczekuje = False
+        self.aktualizuj_interfejs()
 
     def rozpocznij_symulacje(self):
         self.serwer.rozpocznij_symulacje()
-        self.aktualizuj_interfejs()
+        self.uniewaznij()
 
     def zatrzymaj_symulacje(self):
         self.serwer.zatrzymaj_symulacje()
-        self.aktualizuj_interfejs()
+        self.uniewaznij()
 
     def dodaj_klienta(self):
         self.serwer.dodaj_klienta()
-        self.aktualizuj_interfejs()
+        self.uniewaznij()
+
+    def dodaj_dysk(self):
+        self.serwer.dodaj_dysk()
+        self.uniewaznij()
+
+    def usun_dysk(self):
+        if self.serwer.dyski:
+            self.serwer.usun_dysk(self.serwer.dyski[-1].id_dysku)
+        self.uniewaznij()
 
     def uruchom(self):
         self.root.mainloop()
 
 # Główna funkcja uruchamiająca symulację
 def main():
-    serwer = Serwer()
-    gui = GUI(serwer)
-    gui.uruchom()
+    metryki = MetrykiSerwera()
+    try:
+        port = metryki.rejestr.uruchom_http(PORT_METRYK)
+        logging.info(f"Metryki Prometheusa: http://127.0.0.1:{port}/metrics")
+    except OSError as e:
+        logging.error(f"Nie udało się uruchomić punktu metryk - {e}")
+    migawki = ZapisMigawek(metryki.rejestr, 'metryki.json')
+    migawki.start()
+    slad = Slad()
+    # Tekstowe wpisy o plikach do symulacja.log dopisuje wątek zapisujący dziennika
+    with DziennikZdarzen('zdarzenia.jsonl', log=logging.getLogger()) as dziennik:
+        if os.path.exists(PLIK_STANU):
+            serwer = wczytaj_stan(PLIK_STANU, metryki=metryki, dziennik=dziennik, slad=slad)
+            logging.info(f"Wczytano stan: {len(serwer.klienci)} klientów, {serwer.pliki_w_kolejce} plików w kolejce")
+        else:
+            serwer = Serwer(metryki=metryki, dziennik=dziennik, slad=slad)
+        zapis_stanu = ZapisStanu(serwer, PLIK_STANU)
+        zapis_stanu.start()
+        wejscie = WatekWejscia(serwer, port=PORT_WEJSCIA)
+        try:
+            host, port = wejscie.uruchom()
+            logging.info(f"Wejście sieciowe: tcp://{host}:{port}")
+        except OSError as e:
+            logging.error(f"Nie udało się uruchomić wejścia sieciowego - {e}")
+        gui = GUI(serwer)
+        gui.uruchom()
+        wejscie.zatrzymaj()
+        serwer.zatrzymaj_dyski(limit_czasu=5.0)
+        zapis_stanu.zatrzymaj()
+    slad.zapisz_do_pliku('slad.csv')
+    migawki.zatrzymaj()
+    metryki.rejestr.zatrzymaj_http()
 
 if __name__ == "__main__":
     main()
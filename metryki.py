@@ -0,0 +1,376 @@
+import http.server
+import json
+import math
+import os
+import threading
+import time
+from collections import Counter
+from itertools import repeat
+from operator import add, mul
+
+try:
+    import numpy as np
+except ImportError:  # numpy jest opcjonalny - histogram działa też w czystym Pythonie
+    np = None
+
+# Metryki harmonogramu i dysków: liczniki, wskaźniki i histogramy o stałym
+# błędzie względnym (jak HdrHistogram). Zapis zdarzenia nie bierze blokady -
+# licznik ma osobną komórkę w każdym wątku (threading.local), a histogram
+# dopisuje wartość do bufora (list.append jest atomowe). Eksport: tekst Prometheusa przez lokalny
+# serwer HTTP i okresowa migawka JSON.
+
+# Kubełki na oktawę - granice kolejnych kubełków różnią się o czynnik
+# 2^(1/64), więc względny błąd wartości z histogramu to najwyżej ~1.1%
+PODKUBELKI = 64
+# Zakres wartości: [2^MIN_WYKLADNIK, 2^MAX_WYKLADNIK), czyli od ~1e-9 do
+# ~1.8e19; wartości spoza zakresu trafiają do skrajnych kubełków
+MIN_WYKLADNIK = -30
+MAX_WYKLADNIK = 64
+LICZBA_KUBELKOW = 1 + (MAX_WYKLADNIK - MIN_WYKLADNIK) * PODKUBELKI
+
+# Indeks kubełka wartości v > 0 to int(log2(v) * PODKUBELKI + PRZESUNIECIE)
+PRZESUNIECIE = 1.0 - MIN_WYKLADNIK * PODKUBELKI
+
+# Zapisy histogramu buforowane w wątku przed rozłożeniem na kubełki
+ROZMIAR_BUFORA = 1024
+
+KWANTYLE = (0.5, 0.9, 0.99, 0.999)
+
+
+def _etykiety_prometheus(etykiety, dodatkowe=()):
+    pary = list(etykiety) + list(dodatkowe)
+    if not pary:
+        return ""
+    return "{" + ",".join(f'{nazwa}="{wartosc}"' for nazwa, wartosc in pary) + "}"
+
+
+def _liczba_prometheus(wartosc):
+    if wartosc == math.inf:
+        return "+Inf"
+    if isinstance(wartosc, float) and wartosc.is_integer():
+        return str(int(wartosc))
+    return repr(wartosc)
+
+
+# Górna granica kubełka histogramu
+def granica_kubelka(indeks):
+    if indeks == 0:
+        return 0.0
+    return 2.0 ** (indeks / PODKUBELKI + MIN_WYKLADNIK)
+
+
+# Licznik rosnący (np. bajty, sekundy pracy)
+class Licznik:
+    typ = "counter"
+
+    def __init__(self):
+        self.lokalne = threading.local()
+        self.fragmenty = []
+        self.blokada = threading.Lock()  # tylko przy rejestracji nowego wątku
+
+    def _nowy_fragment(self):
+        komorka = [0]
+        with self.blokada:
+            self.fragmenty.append(komorka)
+        self.lokalne.komorka = komorka
+        return komorka
+
+    def dodaj(self, wartosc=1):
+        try:
+            komorka = self.lokalne.komorka
+        except AttributeError:
+            komorka = self._nowy_fragment()
+        komorka[0] += wartosc
+
+    def wartosc(self):
+        return sum(komorka[0] for komorka in list(self.fragmenty))
+
+    def migawka(self):
+        return {"wartosc": self.wartosc()}
+
+    def prometheus(self, nazwa, etykiety):
+        return [f"{nazwa}{_etykiety_prometheus(etykiety)} {_liczba_prometheus(self.wartosc())}"]
+
+
+# Wskaźnik - wartość ustawiana albo odczytywana z funkcji w chwili eksportu
+class Wskaznik:
+    typ = "gauge"
+
+    def __init__(self, funkcja=None):
+        self.funkcja = funkcja
+        self.biezaca = 0
+
+    def ustaw(self, wartosc):
+        self.biezaca = wartosc
+
+    def wartosc(self):
+        return self.funkcja() if self.funkcja is not None else self.biezaca
+
+    def migawka(self):
+        return {"wartosc": self.wartosc()}
+
+    def prometheus(self, nazwa, etykiety):
+        return [f"{nazwa}{_etykiety_prometheus(etykiety)} {_liczba_prometheus(self.wartosc())}"]
+
+
+# Histogram: kubełek 0 zbiera wartości <= 0, pozostałe dzielą każdą oktawę
+# na PODKUBELKI części o stałym stosunku granic. Zapis tylko dopisuje wartość
+# do bufora; co ROZMIAR_BUFORA zapisów (i przy eksporcie) bufor jest
+# rozkładany na kubełki jednym przebiegiem - z numpy wektorowo.
+class Histogram:
+    typ = "histogram"
+
+    def __init__(self, wektorowo=True):
+        self.wektorowo = wektorowo and np is not None
+        self.bufor = []
+        self.kubelki = np.zeros(LICZBA_KUBELKOW, dtype=np.int64) if self.wektorowo else [0] * LICZBA_KUBELKOW
+        self.suma = 0.0
+        self.blokada = threading.Lock()  # chroni kubełki i rozkładanie buforów
+
+    def zapisz(self, wartosc):
+        bufor = self.bufor
+        bufor.append(wartosc)
+        if len(bufor) >= ROZMIAR_BUFORA:
+            self._rozloz()
+
+    # Zdejmujemy tylko skopiowany początek bufora - wartości dopisane w tym
+    # czasie przez inne wątki zostają na następny raz
+    def _rozloz(self):
+        with self.blokada:
+            wartosci = self.bufor[:]
+            del self.bufor[:len(wartosci)]
+            if wartosci:
+                self._dodaj(wartosci)
+
+    # Wywoływane pod blokadą
+    def _dodaj(self, wartosci):
+        if self.wektorowo:
+            tablica = np.asarray(wartosci, dtype=np.float64)
+            dodatnie = tablica[tablica > 0]
+            indeksy = (np.log2(dodatnie) * PODKUBELKI + PRZESUNIECIE).astype(np.int64)
+            np.clip(indeksy, 1, LICZBA_KUBELKOW - 1, out=indeksy)
+            self.kubelki += np.bincount(indeksy, minlength=LICZBA_KUBELKOW)
+            self.kubelki[0] += len(wartosci) - len(dodatnie)
+            self.suma += float(dodatnie.sum())
+            return
+        # Same funkcje wbudowane w map - bez pętli interpretowanej na wartość
+        dodatnie = [wartosc for wartosc in wartosci if wartosc > 0]
+        liczby = Counter(map(int, map(add, map(mul, map(math.log2, dodatnie), repeat(PODKUBELKI)),
+                                      repeat(PRZESUNIECIE))))
+        for indeks, ile in liczby.items():
+            self.kubelki[min(max(indeks, 1), LICZBA_KUBELKOW - 1)] += ile
+        self.kubelki[0] += len(wartosci) - len(dodatnie)
+        self.suma += math.fsum(dodatnie)
+
+    # Liczności kubełków i suma wartości, łącznie z wartościami z bufora
+    def zbierz(self):
+        self._rozloz()
+        with self.blokada:
+            return (self.kubelki.tolist() if self.wektorowo else list(self.kubelki)), self.suma
+
+    @staticmethod
+    def kwantyl(kubelki, liczba, q):
+        if not liczba:
+            return 0.0
+        cel = max(1, math.ceil(q * liczba))
+        narastajaco = 0
+        for indeks, ile in enumerate(kubelki):
+            narastajaco += ile
+            if narastajaco >= cel:
+                return granica_kubelka(indeks)
+        return granica_kubelka(len(kubelki) - 1)
+
+    def migawka(self):
+        kubelki, suma = self.zbierz()
+        liczba = sum(kubelki)
+        wynik = {"liczba": liczba, "suma": suma, "srednia": suma / liczba if liczba else 0.0}
+        for q in KWANTYLE:
+            wynik[f"p{q * 100:g}"] = self.kwantyl(kubelki, liczba, q)
+        wynik["max"] = self.kwantyl(kubelki, liczba, 1.0)
+        return wynik
+
+    # Eksportujemy tylko niepuste kubełki - przy tysiącach kubełków pełna
+    # lista byłaby ogromna, a granice skumulowanego histogramu mogą być rzadkie
+    def prometheus(self, nazwa, etykiety):
+        kubelki, suma = self.zbierz()
+        linie = []
+        narastajaco = 0
+        for indeks, ile in enumerate(kubelki):
+            if ile:
+                narastajaco += ile
+                granica = _liczba_prometheus(granica_kubelka(indeks))
+                linie.append(f"{nazwa}_bucket{_etykiety_prometheus(etykiety, [('le', granica)])} {narastajaco}")
+        linie.append(f"{nazwa}_bucket{_etykiety_prometheus(etykiety, [('le', '+Inf')])} {narastajaco}")
+        linie.append(f"{nazwa}_sum{_etykiety_prometheus(etykiety)} {_liczba_prometheus(suma)}")
+        linie.append(f"{nazwa}_count{_etykiety_prometheus(etykiety)} {narastajaco}")
+        return linie
+
+
+# Rejestr metryk. Metryka to nazwa, opis i seria dla każdego zestawu etykiet;
+# kolejne wywołania z tą samą nazwą i etykietami zwracają tę samą serię.
+class Metryki:
+    def __init__(self):
+        self.rodziny = {}  # nazwa -> (klasa, opis, {etykiety: seria})
+        self.blokada = threading.Lock()
+        self.serwer_http = None
+
+    def _seria(self, klasa, nazwa, opis, etykiety, *argumenty):
+        etykiety = tuple(sorted(etykiety.items())) if etykiety else ()
+        with self.blokada:
+            rodzina = self.rodziny.setdefault(nazwa, (klasa, opis, {}))
+            if rodzina[0] is not klasa:
+                raise ValueError(f"Metryka {nazwa} jest już zarejestrowana jako {rodzina[0].typ}")
+            serie = rodzina[2]
+            if etykiety not in serie:
+                serie[etykiety] = klasa(*argumenty)
+            return serie[etykiety]
+
+    def licznik(self, nazwa, opis, etykiety=None):
+        return self._seria(Licznik, nazwa, opis, etykiety)
+
+    def wskaznik(self, nazwa, opis, etykiety=None, funkcja=None):
+        return self._seria(Wskaznik, nazwa, opis, etykiety, funkcja)
+
+    def histogram(self, nazwa, opis, etykiety=None):
+        return self._seria(Histogram, nazwa, opis, etykiety)
+
+    def _rodziny(self):
+        with self.blokada:
+            return [(nazwa, klasa, opis, list(serie.items()))
+                    for nazwa, (klasa, opis, serie) in sorted(self.rodziny.items())]
+
+    # Format tekstowy Prometheusa (wersja 0.0.4)
+    def prometheus(self):
+        linie = []
+        for nazwa, klasa, opis, serie in self._rodziny():
+            linie.append(f"# HELP {nazwa} {opis}")
+            linie.append(f"# TYPE {nazwa} {klasa.typ}")
+            for etykiety, seria in serie:
+                linie.extend(seria.prometheus(nazwa, etykiety))
+        return "\n".join(linie) + "\n"
+
+    def migawka(self):
+        return {
+            "czas": time.time(),
+            "metryki": {
+                nazwa: {"typ": klasa.typ, "opis": opis,
+                        "serie": [dict(etykiety=dict(etykiety), **seria.migawka()) for etykiety, seria in serie]}
+                for nazwa, klasa, opis, serie in self._rodziny()
+            },
+        }
+
+    # Lokalny punkt końcowy /metrics w wątku w tle; port 0 - dowolny wolny
+    def uruchom_http(self, port=0, host="127.0.0.1"):
+        metryki = self
+
+        class Obsluga(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                tresc = metryki.prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(tresc)))
+                self.end_headers()
+                self.wfile.write(tresc)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.serwer_http = http.server.ThreadingHTTPServer((host, port), Obsluga)
+        self.serwer_http.daemon_threads = True
+        threading.Thread(target=self.serwer_http.serve_forever, daemon=True).start()
+        return self.serwer_http.server_address[1]
+
+    def zatrzymaj_http(self):
+        if self.serwer_http is not None:
+            self.serwer_http.shutdown()
+            self.serwer_http.server_close()
+            self.serwer_http = None
+
+
+# Okresowy zapis migawki JSON. Plik jest podmieniany atomowo, więc czytelnik
+# nigdy nie widzi połowy zapisu. Do liczników dopisywane jest tempo przyrostu
+# od poprzedniej migawki (np. bajty/s).
+class ZapisMigawek(threading.Thread):
+    def __init__(self, metryki, sciezka, okres=5.0):
+        super().__init__(daemon=True)
+        self.metryki = metryki
+        self.sciezka = sciezka
+        self.okres = okres
+        self.koniec = threading.Event()
+        self.poprzednia = None
+
+    def zapisz(self):
+        migawka = self.metryki.migawka()
+        if self.poprzednia is not None:
+            odstep = migawka["czas"] - self.poprzednia["czas"]
+            for nazwa, rodzina in migawka["metryki"].items():
+                poprzednia_rodzina = self.poprzednia["metryki"].get(nazwa)
+                if rodzina["typ"] != "counter" or poprzednia_rodzina is None or odstep <= 0:
+                    continue
+                poprzednie = {json.dumps(seria["etykiety"], sort_keys=True): seria["wartosc"]
+                              for seria in poprzednia_rodzina["serie"]}
+                for seria in rodzina["serie"]:
+                    przed = poprzednie.get(json.dumps(seria["etykiety"], sort_keys=True), 0)
+                    seria["na_sekunde"] = (seria["wartosc"] - przed) / odstep
+        self.poprzednia = migawka
+        tymczasowy = self.sciezka + ".tmp"
+        with open(tymczasowy, "w") as plik:
+            json.dump(migawka, plik, indent=2)
+        os.replace(tymczasowy, self.sciezka)
+
+    def run(self):
+        while not self.koniec.wait(self.okres):
+            self.zapisz()
+
+    def zatrzymaj(self):
+        self.koniec.set()
+        self.join()
+        self.zapisz()
+
+
+# Zestaw metryk serwera symulacji. Czasy dysków liczone są zegarem symulacji,
+# więc pauza nie zawyża ani bezczynności, ani pracy.
+class MetrykiSerwera:
+    def __init__(self, metryki=None):
+        self.rejestr = metryki if metryki is not None else Metryki()
+        self.czas_aukcji = self.rejestr.histogram(
+            "aukcja_czas_sekundy", "Czas jednej aukcji (lub rundy aukcji wsadowej)")
+        self.kandydaci = self.rejestr.histogram(
+            "aukcja_kandydaci", "Liczba klientów z plikami (k) w chwili aukcji")
+        self.oczekiwanie = self.rejestr.histogram(
+            "klient_oczekiwanie_sekundy", "Czas oczekiwania klienta w chwili przydziału pliku")
+        self.przepustowosc = self.rejestr.histogram(
+            "dysk_przepustowosc_bajty_na_sekunde", "Średnia przepustowość przesłania jednego pliku")
+        self.przydzialy = self.rejestr.licznik("przydzialy_total", "Przydzielone pliki")
+        self.kradzieze = self.rejestr.licznik(
+            "segmenty_skradzione_total", "Segmenty podzielonych plików wzięte przez bezczynne dyski")
+
+    # Głębokość kolejki i liczba czekających dysków odczytywane przy eksporcie
+    def obserwuj_serwer(self, serwer):
+        self.rejestr.wskaznik("kolejka_pliki", "Pliki czekające na przydział",
+                              funkcja=lambda: serwer.pliki_w_kolejce)
+        self.rejestr.wskaznik("kolejka_klienci", "Klienci z plikami",
+                              funkcja=lambda: getattr(serwer.aukcja, "k", 0))
+
+    def dysk(self, id_dysku):
+        return MetrykiDysku(self.rejestr, id_dysku)
+
+
+# Liczniki jednego dysku; wykorzystanie = praca / (praca + bezczynność)
+class MetrykiDysku:
+    def __init__(self, rejestr, id_dysku):
+        etykiety = {"dysk": id_dysku}
+        self.praca = rejestr.licznik("dysk_praca_sekundy_total", "Czas przesyłania plików", etykiety)
+        self.bezczynnosc = rejestr.licznik("dysk_bezczynnosc_sekundy_total", "Czas oczekiwania na plik", etykiety)
+        self.bajty = rejestr.licznik("dysk_bajty_total", "Przesłane bajty", etykiety)
+        self.pliki = rejestr.licznik("dysk_pliki_total", "Przesłane pliki", etykiety)
+        rejestr.wskaznik("dysk_wykorzystanie", "Udział pracy w czasie symulacji dysku", etykiety,
+                         funkcja=self.wykorzystanie)
+
+    def wykorzystanie(self):
+        praca = self.praca.wartosc()
+        razem = praca + self.bezczynnosc.wartosc()
+        return praca / razem if razem else 0.0
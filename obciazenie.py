@@ -0,0 +1,120 @@
+import math
+import time
+
+# Generator obciążenia: proces przybyć klientów, rozkład liczby plików
+# klienta i rozkład rozmiarów plików. Klienci powstają leniwie - strumień
+# jest generatorem par (chwila przybycia, rozmiary plików), więc ani lista
+# klientów, ani wszystkie pliki nie są budowane z góry. Losowanie zawsze
+# przez przekazany random.Random, więc to samo ziarno daje to samo obciążenie.
+
+
+# Klasa Rozkładu jednostajnego liczb całkowitych [minimum, maksimum];
+# domyślnie rozmiary plików z Klient.generuj_pliki
+class RozkladJednostajny:
+    def __init__(self, minimum=1 * 10**6, maksimum=512 * 10**6):
+        self.minimum = minimum
+        self.maksimum = maksimum
+
+    def losuj(self, los):
+        return los.randint(self.minimum, self.maksimum)
+
+    def srednia(self):
+        return (self.minimum + self.maksimum) / 2
+
+
+# Klasa Rozkładu Pareto obciętego do [minimum, maksimum] (losowanie przez
+# odwrotną dystrybuantę). Bez maksimum - zwykły Pareto, dla alfa <= 1
+# o nieskończonej średniej.
+class RozkladPareto:
+    def __init__(self, alfa, minimum, maksimum=None):
+        self.alfa = alfa
+        self.minimum = minimum
+        self.maksimum = maksimum
+        # Udział masy rozkładu nieobciętego poniżej maksimum
+        self.masa = 1 - (minimum / maksimum) ** alfa if maksimum else 1.0
+
+    def losuj(self, los):
+        u = los.random()
+        return max(self.minimum, int(self.minimum / (1 - u * self.masa) ** (1 / self.alfa)))
+
+    def srednia(self):
+        a, l, h = self.alfa, self.minimum, self.maksimum
+        if h is None:
+            return a * l / (a - 1) if a > 1 else math.inf
+        if a == 1:
+            return l * h / (h - l) * math.log(h / l)
+        return l ** a / self.masa * a / (a - 1) * (1 / l ** (a - 1) - 1 / h ** (a - 1))
+
+
+# Klasa Rozkładu log-normalnego o zadanej medianie i parametrze kształtu
+# sigma (odchylenie standardowe logarytmu); wartości co najmniej 1
+class RozkladLogNormalny:
+    def __init__(self, mediana, sigma):
+        self.mu = math.log(mediana)
+        self.sigma = sigma
+
+    def losuj(self, los):
+        return max(1, int(los.lognormvariate(self.mu, self.sigma)))
+
+    def srednia(self):
+        return math.exp(self.mu + self.sigma ** 2 / 2)
+
+
+# Przybycia Poissona: odstępy wykładnicze o średniej 1/intensywnosc (s)
+def przybycia_poissona(intensywnosc, los, poczatek=0.0):
+    czas = poczatek
+    while True:
+        czas += los.expovariate(intensywnosc)
+        yield czas
+
+
+# Przybycia impulsowe - proces Poissona modulowany dwustanowym łańcuchem
+# Markowa: fazy spokoju i impulsu o wykładniczych długościach (średnie
+# w sekundach), w każdej fazie inna intensywność. Odstępy bez pamięci
+# pozwalają zacząć losowanie od nowa na granicy faz.
+def przybycia_impulsowe(intensywnosc_spokoju, intensywnosc_impulsu, dlugosc_spokoju, dlugosc_impulsu, los,
+                        poczatek=0.0):
+    czas = poczatek
+    impuls = False
+    koniec_fazy = czas + los.expovariate(1 / dlugosc_spokoju)
+    while True:
+        intensywnosc = intensywnosc_impulsu if impuls else intensywnosc_spokoju
+        odstep = los.expovariate(intensywnosc) if intensywnosc > 0 else math.inf
+        if czas + odstep < koniec_fazy:
+            czas += odstep
+            yield czas
+        else:
+            czas = koniec_fazy
+            impuls = not impuls
+            koniec_fazy = czas + los.expovariate(1 / (dlugosc_impulsu if impuls else dlugosc_spokoju))
+
+
+# Średnia intensywność przybyć impulsowych (klienci/s)
+def srednia_intensywnosc_impulsowa(intensywnosc_spokoju, intensywnosc_impulsu, dlugosc_spokoju, dlugosc_impulsu):
+    return ((intensywnosc_spokoju * dlugosc_spokoju + intensywnosc_impulsu * dlugosc_impulsu)
+            / (dlugosc_spokoju + dlugosc_impulsu))
+
+
+# Strumień klientów (chwila przybycia, posortowane rozmiary plików), do
+# `limit` klientów albo do chwili `horyzont`; bez obu - nieskończony
+def strumien_klientow(przybycia, liczba_plikow, rozmiar, los, limit=None, horyzont=None):
+    losuj = rozmiar.losuj
+    for numer, czas in enumerate(przybycia):
+        if limit is not None and numer >= limit or horyzont is not None and czas > horyzont:
+            return
+        yield czas, sorted(losuj(los) for _ in range(max(1, liczba_plikow.losuj(los))))
+
+
+# Zasila działający serwer klientami ze strumienia w czasie rzeczywistym
+# (przyspieszonym `tempo` razy), licząc chwile od wywołania. Zwraca liczbę
+# dodanych klientów.
+def zasil_serwer(serwer, klienci, tempo=1.0):
+    poczatek = time.monotonic()
+    liczba = 0
+    for czas, pliki in klienci:
+        opoznienie = poczatek + czas / tempo - time.monotonic()
+        if opoznienie > 0:
+            time.sleep(opoznienie)
+        serwer.dodaj_klienta(pliki)
+        liczba += 1
+    return liczba
@@ -0,0 +1,187 @@
+import math
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+from aukcja import oblicz_wynik, wspolczynnik_predkosci
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Silnik aukcji dzielący klientów między procesy robocze. Każdy proces dostaje
+# ciągły blok indeksów klientów (przy n klientach proces p przegląda
+# n * p // liczba_procesow .. n * (p + 1) // liczba_procesow - 1), więc czyta
+# kolumny sekwencyjnie, bez przeskoków; zgłasza najlepszą lokalną ofertę,
+# a koordynator wybiera zwycięzcę spośród ofert.
+# Dane potrzebne do wyniku leżą w pamięci współdzielonej, więc na jedną
+# aukcję przez łącza idą tylko parametry aukcji i oferty.
+
+# Kolumny pamięci współdzielonej, każda po `pojemnosc` liczb float64:
+# rozmiar pierwszego pliku (NaN - brak plików), czas startu odliczania
+# (NaN - zatrzymane) i czas zebrany przed zatrzymaniem
+KOLUMNY = 3
+
+BRAK = math.nan
+
+
+# Granice [początek, koniec) bloku klientów procesu `numer`
+def granice_bloku(numer, liczba, n):
+    return n * numer // liczba, n * (numer + 1) // liczba
+
+
+def _najlepsza_oferta(pamiec, pojemnosc, numer, liczba, n, k, wspolczynnik, teraz):
+    poczatek, koniec = granice_bloku(numer, liczba, n)
+    if np is not None:
+        dane = np.ndarray((KOLUMNY, pojemnosc), dtype=np.float64, buffer=pamiec.buf)[:, poczatek:koniec]
+        rozmiary, czasy_startu, czasy_zatrzymania = dane
+        czasy = np.where(np.isnan(czasy_startu), czasy_zatrzymania, teraz - czasy_startu + czasy_zatrzymania)
+        wyniki = k / (rozmiary * wspolczynnik + 1) + np.log(czasy + 1) / k
+        wyniki[np.isnan(rozmiary)] = -np.inf
+        if not len(wyniki):
+            return None
+        j = int(np.argmax(wyniki))  # pierwsze maksimum - najniższy indeks
+        if wyniki[j] == -np.inf:
+            return None
+        return float(wyniki[j]), poczatek + j
+
+    najlepsza = None
+    with memoryview(pamiec.buf) as bufor, bufor.cast('d') as kolumny:
+        for i in range(poczatek, koniec):
+            rozmiar = kolumny[i]
+            if math.isnan(rozmiar):
+                continue
+            czas_start = kolumny[pojemnosc + i]
+            czas_zatrzymania = kolumny[2 * pojemnosc + i]
+            t = czas_zatrzymania if math.isnan(czas_start) else teraz - czas_start + czas_zatrzymania
+            wynik = oblicz_wynik(k, rozmiar * wspolczynnik, t)
+            if najlepsza is None or wynik > najlepsza[0]:
+                najlepsza = (wynik, i)
+    return najlepsza
+
+
+# Pętla procesu roboczego: ('aukcja', n, k, wspolczynnik, teraz) -> oferta
+# albo None, ('pamiec', nazwa, pojemnosc) -> przełączenie na nowy blok, None - koniec
+def _pracownik(lacze, numer, liczba, nazwa, pojemnosc):
+    pamiec = shared_memory.SharedMemory(name=nazwa)
+    try:
+        while True:
+            polecenie = lacze.recv()
+            if polecenie is None:
+                break
+            if polecenie[0] == 'aukcja':
+                _, n, k, wspolczynnik, teraz = polecenie
+                lacze.send(_najlepsza_oferta(pamiec, pojemnosc, numer, liczba, n, k, wspolczynnik, teraz))
+            elif polecenie[0] == 'pamiec':
+                pamiec.close()
+                _, nazwa, pojemnosc = polecenie
+                pamiec = shared_memory.SharedMemory(name=nazwa)
+                lacze.send(True)
+    finally:
+        pamiec.close()
+
+
+# Klasa Aukcji partycjonowanej. Zakłada wspólny zegar odliczania wszystkich
+# klientów (jak w Serwer i SymulacjaZdarzeniowa); tak jak drzewo turniejowe
+# wymaga odswiez() po ręcznej zmianie czasów klientów.
+class AukcjaPartycjonowana:
+    def __init__(self, liczba_procesow=None, pojemnosc=1024):
+        self.liczba_procesow = liczba_procesow or os.cpu_count()
+        self.klienci = []
+        self.k = 0  # liczba klientów z plikami
+        self.zegar = None  # zegar odliczania klientów, przejmowany od pierwszego klienta
+        self.pojemnosc = pojemnosc
+        self.pamiec = shared_memory.SharedMemory(create=True, size=KOLUMNY * pojemnosc * 8)
+        self.kolumny = self.pamiec.buf.cast('d')
+        kontekst = multiprocessing.get_context('spawn')
+        self.lacza = []
+        self.procesy = []
+        for numer in range(self.liczba_procesow):
+            lacze, lacze_procesu = kontekst.Pipe()
+            proces = kontekst.Process(target=_pracownik, daemon=True,
+                                      args=(lacze_procesu, numer, self.liczba_procesow, self.pamiec.name, pojemnosc))
+            proces.start()
+            self.lacza.append(lacze)
+            self.procesy.append(proces)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *wyjatek):
+        self.zamknij()
+
+    def zamknij(self):
+        for lacze, proces in zip(self.lacza, self.procesy):
+            lacze.send(None)
+            proces.join()
+            lacze.close()
+        self.lacza, self.procesy = [], []
+        self.kolumny.release()
+        self.pamiec.close()
+        self.pamiec.unlink()
+
+    # Dwukrotnie większy blok pamięci; procesy przełączają się przed zwolnieniem starego
+    def _powieksz(self):
+        pojemnosc = 2 * self.pojemnosc
+        pamiec = shared_memory.SharedMemory(create=True, size=KOLUMNY * pojemnosc * 8)
+        kolumny = pamiec.buf.cast('d')
+        for kolumna in range(KOLUMNY):
+            kolumny[kolumna * pojemnosc:kolumna * pojemnosc + self.pojemnosc] = \
+                self.kolumny[kolumna * self.pojemnosc:(kolumna + 1) * self.pojemnosc]
+        for lacze in self.lacza:
+            lacze.send(('pamiec', pamiec.name, pojemnosc))
+        for lacze in self.lacza:
+            lacze.recv()
+        self.kolumny.release()
+        self.pamiec.close()
+        self.pamiec.unlink()
+        self.pamiec, self.kolumny, self.pojemnosc = pamiec, kolumny, pojemnosc
+
+    def _zapisz(self, i):
+        klient = self.klienci[i]
+        czas_start = klient.czas_start
+        self.kolumny[i] = klient.pliki[0] if klient.pliki else BRAK
+        self.kolumny[self.pojemnosc + i] = BRAK if czas_start is None else czas_start
+        self.kolumny[2 * self.pojemnosc + i] = klient.czas_zatrzymania
+
+    def dodaj_klienta(self, klient):
+        if self.zegar is None:
+            self.zegar = klient.zegar
+        self.klienci.append(klient)
+        if len(self.klienci) > self.pojemnosc:
+            self._powieksz()
+        if klient.pliki:
+            self.k += 1
+        self._zapisz(len(self.klienci) - 1)
+
+    def odswiez(self):
+        self.k = 0
+        for i, klient in enumerate(self.klienci):
+            if klient.pliki:
+                self.k += 1
+            self._zapisz(i)
+
+    def _zdejmij(self, i, wynik):
+        klient = self.klienci[i]
+        plik = klient.pliki.pop(0)
+        klient.ostatni_wynik_aukcji = wynik
+        if not klient.pliki:
+            self.k -= 1
+        self.kolumny[i] = klient.pliki[0] if klient.pliki else BRAK
+        return klient, plik
+
+    # Przydziały rozstrzygnięte poza silnikiem (aukcja wsadowa)
+    def zdejmij_pliki(self, zwyciezcy):
+        return [self._zdejmij(i, wynik) for i, wynik in zwyciezcy]
+
+    def przeprowadz_aukcje(self, predkosc_przesylania=None):
+        if not self.k:
+            return None, None
+        polecenie = ('aukcja', len(self.klienci), self.k, wspolczynnik_predkosci(predkosc_przesylania), self.zegar())
+        for lacze in self.lacza:
+            lacze.send(polecenie)
+        oferty = [oferta for oferta in (lacze.recv() for lacze in self.lacza) if oferta]
+        # Remis rozstrzyga niższy indeks klienta, jak w aukcji liniowej
+        wynik, i = max(oferty, key=lambda oferta: (oferta[0], -oferta[1]))
+        return self._zdejmij(i, wynik)
@@ -0,0 +1,113 @@
+import threading
+from collections import deque
+
+# Podział dużych plików na segmenty przesyłane równolegle przez kilka dysków.
+# Dysk, który wygrał plik większy niż rozmiar segmentu, przesyła jego
+# segmenty od początku, a bezczynne dyski (aukcja nie ma dla nich pliku)
+# kradną nierozpoczęte segmenty od końca pliku z największą pozostałą pracą.
+# Plik jest zakończony, gdy skończy się jego ostatni segment - zakończenie
+# odnotowuje dysk, który przesłał ten segment.
+# Struktury nie mają własnych blokad: Serwer używa ich pod blokadą
+# harmonogramu, symulacja zdarzeniowa jest jednowątkowa.
+
+
+# Granice równych segmentów pliku: lista (przesunięcie, długość)
+def podziel(rozmiar, rozmiar_segmentu):
+    liczba = max(1, -(-rozmiar // rozmiar_segmentu))
+    granice = [rozmiar * i // liczba for i in range(liczba + 1)]
+    return [(poczatek, koniec - poczatek) for poczatek, koniec in zip(granice, granice[1:])]
+
+
+# Klasa Kopii współdzielonej przez dyski przesyłające segmenty jednego pliku -
+# zapisy porcji są szeregowane, a kopia zamykana dopiero po ostatnim segmencie
+class KopiaWspolna:
+    def __init__(self, kopia):
+        self.kopia = kopia
+        self.blokada = threading.Lock()
+
+    def przeslij(self, przesuniecie, ile):
+        with self.blokada:
+            self.kopia.przeslij(przesuniecie, ile)
+
+    def zamknij(self):
+        pass
+
+    # Zamyka kopię po ostatnim segmencie pliku
+    def zakoncz(self):
+        self.kopia.zamknij()
+
+
+# Klasa Podziału pliku - segmenty czekające na dysk i liczba nieukończonych
+class PodzialPliku:
+    def __init__(self, klient, rozmiar, rozmiar_segmentu, czas_przydzialu, kopia=None, segmenty=None):
+        self.klient = klient
+        self.rozmiar = rozmiar
+        self.czas_przydzialu = czas_przydzialu
+        self.segmenty = deque(podziel(rozmiar, rozmiar_segmentu) if segmenty is None else segmenty)
+        self.oczekujace = sum(dlugosc for _, dlugosc in self.segmenty)  # bajty w segmentach czekających na dysk
+        self.nieukonczone = len(self.segmenty)
+        self.kopia = kopia
+        self.blad = None  # pierwszy błąd przesyłania któregoś segmentu
+        self.wlasciciel = None  # dysk, który bierze kolejne segmenty od początku (Serwer)
+
+    # Kolejny segment dla dysku, który wygrał plik
+    def pobierz(self):
+        if not self.segmenty:
+            return None
+        segment = self.segmenty.popleft()
+        self.oczekujace -= segment[1]
+        return segment
+
+    # Segment z końca pliku dla dysku bezczynnego
+    def ukradnij(self):
+        segment = self.segmenty.pop()
+        self.oczekujace -= segment[1]
+        return segment
+
+    # Zwraca True, gdy był to ostatni nieukończony segment pliku
+    def zakoncz_segment(self):
+        self.nieukonczone -= 1
+        return self.nieukonczone == 0
+
+
+# Klasa Podziałów plików - pliki z segmentami do wzięcia przez inne dyski
+class PodzialyPlikow:
+    def __init__(self, rozmiar_segmentu):
+        self.rozmiar_segmentu = rozmiar_segmentu
+        self.podzialy = []
+
+    def czy_podzielic(self, rozmiar):
+        return rozmiar > self.rozmiar_segmentu
+
+    def podziel(self, klient, rozmiar, czas_przydzialu, kopia=None):
+        podzial = PodzialPliku(klient, rozmiar, self.rozmiar_segmentu, czas_przydzialu, kopia)
+        self.podzialy.append(podzial)
+        return podzial
+
+    # Podział odtworzony z zapisu stanu: `segmenty` czekają na dysk,
+    # a `nieukonczone` liczy także segmenty przesyłane już przez dyski
+    def odtworz(self, klient, rozmiar, segmenty, nieukonczone, czas_przydzialu):
+        podzial = PodzialPliku(klient, rozmiar, self.rozmiar_segmentu, czas_przydzialu, segmenty=segmenty)
+        podzial.nieukonczone = nieukonczone
+        if podzial.segmenty:
+            self.podzialy.append(podzial)
+        return podzial
+
+    def pobierz(self, podzial):
+        segment = podzial.pobierz()
+        if not podzial.segmenty and podzial in self.podzialy:
+            self.podzialy.remove(podzial)
+        return segment
+
+    def czy_do_kradziezy(self):
+        return bool(self.podzialy)
+
+    # (podział, segment) z pliku o największej pozostałej pracy albo None
+    def ukradnij(self):
+        if not self.podzialy:
+            return None
+        podzial = max(self.podzialy, key=lambda p: p.oczekujace)
+        segment = podzial.ukradnij()
+        if not podzial.segmenty:
+            self.podzialy.remove(podzial)
+        return podzial, segment
@@ -0,0 +1,199 @@
+import errno
+import itertools
+import mmap
+import os
+import threading
+import time
+
+# Domyślny rozmiar porcji przesyłania (bajty)
+ROZMIAR_PORCJI = 256 * 1024
+
+# Waga najnowszego pomiaru w średniej kroczącej przepustowości
+WAGA_POMIARU = 0.3
+
+
+# Kubełek żetonów ograniczający przepustowość dysku. Żetony to bajty, przybywa
+# ich z szybkością predkosc do pojemności kubełka. Pobranie porcji może
+# zadłużyć kubełek - zwracany jest czas, po którym dług zostanie spłacony.
+class KubelekZetonow:
+    def __init__(self, predkosc, pojemnosc, zegar=time.monotonic):
+        self.predkosc = predkosc
+        self.pojemnosc = pojemnosc
+        self.zegar = zegar
+        self.zetony = 0.0  # pusty kubełek - pierwsza porcja też czeka na przepustowość
+        self.ostatnio = zegar()
+
+    def _uzupelnij(self):
+        teraz = self.zegar()
+        self.zetony = min(self.pojemnosc, self.zetony + (teraz - self.ostatnio) * self.predkosc)
+        self.ostatnio = teraz
+
+    def pobierz(self, ile):
+        self._uzupelnij()
+        self.zetony -= ile
+        if self.zetony >= 0:
+            return 0.0
+        return -self.zetony / self.predkosc
+
+    # Czas wstrzymania dysku nie napełnia kubełka
+    def pomin(self, czas):
+        self.ostatnio += czas
+
+
+# Przesyłanie bez rzeczywistych operacji wejścia-wyjścia (sam model czasu)
+class BezKopii:
+    def przeslij(self, przesuniecie, ile):
+        pass
+
+    def zamknij(self):
+        pass
+
+
+# Rzeczywiste kopiowanie danych porcjami z pliku źródłowego do docelowego
+# przez bufor w Pythonie (punkt odniesienia dla kopiowania bez buforów)
+class KopiaPliku:
+    def __init__(self, sciezka_zrodla, sciezka_celu, rozmiar=None):
+        self.zrodlo = open(sciezka_zrodla, 'rb')
+        self.cel = open(sciezka_celu, 'wb')
+
+    # Porcja trafia pod to samo przesunięcie w celu - segmenty pliku
+    # przychodzą z kilku dysków w dowolnej kolejności
+    def przeslij(self, przesuniecie, ile):
+        self.zrodlo.seek(przesuniecie)
+        self.cel.seek(przesuniecie)
+        self.cel.write(self.zrodlo.read(ile))
+
+    def zamknij(self):
+        self.zrodlo.close()
+        self.cel.close()
+
+
+# Błędy, po których przechodzimy na następną metodę kopiowania
+_BLEDY_NIEOBSLUGIWANE = {errno.EXDEV, errno.ENOSYS, errno.EOPNOTSUPP, errno.EINVAL, errno.EBADF}
+
+
+def prealokuj(fd, rozmiar):
+    if rozmiar <= 0:
+        return
+    if hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(fd, 0, rozmiar)
+            return
+        except OSError as e:
+            if e.errno not in _BLEDY_NIEOBSLUGIWANE:
+                raise
+    os.ftruncate(fd, rozmiar)
+
+
+# Kopiowanie bez buforów w Pythonie: copy_file_range, potem sendfile, a gdy
+# jądro żadnego nie obsługuje dla tej pary plików - zapis z odwzorowania mmap
+class KopiaZeroKopii:
+    METODY = ('copy_file_range', 'sendfile', 'mmap')
+
+    def __init__(self, sciezka_zrodla, sciezka_celu, rozmiar=None, metoda=None):
+        self.fd_zrodla = os.open(sciezka_zrodla, os.O_RDONLY)
+        self.fd_celu = os.open(sciezka_celu, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        self.rozmiar = os.fstat(self.fd_zrodla).st_size if rozmiar is None else rozmiar
+        self.odwzorowanie = None
+        prealokuj(self.fd_celu, self.rozmiar)
+        dostepne = [m for m in self.METODY if m == 'mmap' or hasattr(os, m)]
+        self.metody = dostepne[dostepne.index(metoda):] if metoda else dostepne
+
+    @property
+    def metoda(self):
+        return self.metody[0]
+
+    def _kopiuj(self, przesuniecie, ile):
+        if self.metoda == 'copy_file_range':
+            return os.copy_file_range(self.fd_zrodla, self.fd_celu, ile, przesuniecie, przesuniecie)
+        if self.metoda == 'sendfile':
+            os.lseek(self.fd_celu, przesuniecie, os.SEEK_SET)
+            return os.sendfile(self.fd_celu, self.fd_zrodla, przesuniecie, ile)
+        if self.odwzorowanie is None:
+            self.odwzorowanie = mmap.mmap(self.fd_zrodla, 0, access=mmap.ACCESS_READ)
+        with memoryview(self.odwzorowanie)[przesuniecie:przesuniecie + ile] as fragment:
+            return os.pwrite(self.fd_celu, fragment, przesuniecie)
+
+    def przeslij(self, przesuniecie, ile):
+        while ile > 0:
+            try:
+                skopiowano = self._kopiuj(przesuniecie, ile)
+            except OSError as e:
+                if e.errno not in _BLEDY_NIEOBSLUGIWANE or len(self.metody) == 1:
+                    raise
+                self.metody = self.metody[1:]
+                continue
+            if not skopiowano:
+                raise EOFError(f"Plik źródłowy krótszy niż {przesuniecie + ile} bajtów")
+            przesuniecie += skopiowano
+            ile -= skopiowano
+
+    def zamknij(self):
+        if self.odwzorowanie is not None:
+            self.odwzorowanie.close()
+        os.close(self.fd_zrodla)
+        os.close(self.fd_celu)
+
+
+# Tworzy kopie plików klientów w katalogu docelowym każdego dysku:
+# <katalog_docelowy>/dysk_<id>/klient_<id>_<rozmiar>_<nr>. Źródłem pliku
+# klienta jest <katalog_zrodel>/klient_<id>/<rozmiar>.
+class FabrykaKopii:
+    def __init__(self, katalog_zrodel, katalog_docelowy, kopia=KopiaZeroKopii):
+        self.katalog_zrodel = katalog_zrodel
+        self.katalog_docelowy = katalog_docelowy
+        self.kopia = kopia
+        self.licznik = itertools.count()
+
+    def sciezka_zrodla(self, klient, rozmiar):
+        return os.path.join(self.katalog_zrodel, f"klient_{klient.id_klienta}", str(rozmiar))
+
+    # Zapisuje losowe dane jako pliki źródłowe klienta (testy, pomiary)
+    def przygotuj_zrodla(self, klient):
+        for rozmiar in set(klient.pliki):
+            sciezka = self.sciezka_zrodla(klient, rozmiar)
+            os.makedirs(os.path.dirname(sciezka), exist_ok=True)
+            with open(sciezka, 'wb') as plik:
+                plik.write(os.urandom(rozmiar))
+
+    def __call__(self, dysk, klient, rozmiar):
+        katalog = os.path.join(self.katalog_docelowy, f"dysk_{dysk.id_dysku}")
+        os.makedirs(katalog, exist_ok=True)
+        cel = os.path.join(katalog, f"klient_{klient.id_klienta}_{rozmiar}_{next(self.licznik)}")
+        return self.kopia(self.sciezka_zrodla(klient, rozmiar), cel, rozmiar)
+
+
+# Stan pojedynczego przesyłania: bajty przesłane i bieżąca przepustowość
+class Przesylanie:
+    def __init__(self, rozmiar, rozmiar_porcji=ROZMIAR_PORCJI, zegar=time.monotonic, przeslano=0):
+        self.rozmiar = rozmiar
+        self.rozmiar_porcji = rozmiar_porcji
+        self.zegar = zegar
+        self.przeslano = przeslano  # niezerowe przy wznowieniu przerwanego przesyłania
+        self.przepustowosc = 0.0  # bajty/s, średnia krocząca
+        self.ostatnia_porcja = zegar()
+        self.blokada = threading.Lock()
+
+    def porcje(self):
+        przesuniecie = self.przeslano
+        while przesuniecie < self.rozmiar:
+            ile = min(self.rozmiar_porcji, self.rozmiar - przesuniecie)
+            yield przesuniecie, ile
+            przesuniecie += ile
+
+    def zapisz_porcje(self, ile):
+        teraz = self.zegar()
+        with self.blokada:
+            odstep = teraz - self.ostatnia_porcja
+            if odstep > 0:
+                pomiar = ile / odstep
+                self.przepustowosc = pomiar if not self.przepustowosc else \
+                    WAGA_POMIARU * pomiar + (1 - WAGA_POMIARU) * self.przepustowosc
+            self.przeslano += ile
+            self.ostatnia_porcja = teraz
+
+    # Spójna migawka (przesłane bajty, procent, przepustowość) dla GUI
+    def stan(self):
+        with self.blokada:
+            procent = 100 * self.przeslano / self.rozmiar if self.rozmiar else 100.0
+            return self.przeslano, procent, self.przepustowosc
@@ -0,0 +1,256 @@
+import asyncio
+import contextlib
+import logging
+import random
+import tkinter as tk
+from collections import deque
+
+from aukcja import AukcjaTurniejowa
+from magazyn import MagazynKlientow, ZegarSymulacji
+from main import GUI, Klient, PROFILE_DYSKOW
+from przesylanie import ROZMIAR_PORCJI, BezKopii, KubelekZetonow, Przesylanie
+
+# Serwer na asyncio: każdy dysk jest zadaniem pętli zdarzeń, a nie wątkiem
+# systemowym, więc w jednym procesie mieszczą się dziesiątki tysięcy dysków.
+# Aukcje i zmiany stanu wykonują się między punktami await, więc nie
+# potrzebują blokad. Pauza i wznowienie to zdarzenie asyncio.Event.
+
+
+def _zadzwon(budzik):
+    if not budzik.done():
+        budzik.set_result(None)
+
+
+# Klasa Dysku asynchronicznego
+class DyskAsync:
+    def __init__(self, id_dysku, serwer, predkosc_przesylania=PROFILE_DYSKOW['hdd'], rozmiar_porcji=ROZMIAR_PORCJI):
+        self.id_dysku = id_dysku
+        self.serwer = serwer
+        self.predkosc_przesylania = predkosc_przesylania  # bajty/s
+        self.rozmiar_porcji = rozmiar_porcji  # bajty
+        self.wycofany = False  # dysk kończy bieżący plik i opuszcza pulę
+        self.aktywny_plik = None
+        self.aktualny_klient = None
+        self.przesylanie = None  # stan bieżącego przesyłania
+        self.zadanie = None
+        self.budzik = None  # przyszłość, na którą dysk czeka (praca lub koniec porcji)
+        # GUI czyta stan dysku pod blokadą; GUI i zadania dysków działają
+        # w jednym wątku pętli zdarzeń, więc blokada niczego nie blokuje
+        self.blokada = contextlib.nullcontext()
+
+    # Postęp bieżącego przesyłania w procentach
+    @property
+    def postep_przesylania(self):
+        przesylanie = self.przesylanie
+        return przesylanie.stan()[1] if przesylanie else 0
+
+    def uruchom(self):
+        self.zadanie = asyncio.get_running_loop().create_task(self.pracuj())
+
+    def obudz(self):
+        if self.budzik is not None:
+            _zadzwon(self.budzik)
+
+    async def czekaj(self, czas=None):
+        petla = asyncio.get_running_loop()
+        self.budzik = petla.create_future()
+        uchwyt = petla.call_later(czas, _zadzwon, self.budzik) if czas is not None else None
+        try:
+            await self.budzik
+        finally:
+            if uchwyt is not None:
+                uchwyt.cancel()
+            self.budzik = None
+
+    async def pracuj(self):
+        while True:
+            klient, plik = await self.serwer.czekaj_na_plik(self)
+            if not klient:
+                self.serwer.usun_z_puli(self)
+                return
+            self.aktywny_plik = plik
+            self.aktualny_klient = klient
+            kopia = self.serwer.fabryka_kopii(self, klient, plik) if self.serwer.fabryka_kopii else None
+            await self.przeslij_plik(plik, kopia)
+            self.aktywny_plik = None
+            self.aktualny_klient = None
+
+    # Odczekuje podany czas pracy dysku; pauza (budząca dysk przed czasem)
+    # zamraża pozostały czas. Zwraca łączny czas spędzony we wstrzymaniu.
+    async def odczekaj(self, czas):
+        petla = asyncio.get_running_loop()
+        koniec = petla.time() + czas
+        wstrzymano = 0.0
+        while True:
+            if not self.serwer.dziala.is_set():
+                poczatek_pauzy = petla.time()
+                pozostalo = koniec - poczatek_pauzy
+                await self.serwer.dziala.wait()
+                wstrzymano += petla.time() - poczatek_pauzy
+                koniec = petla.time() + pozostalo
+            pozostalo = koniec - petla.time()
+            if pozostalo <= 0:
+                return wstrzymano
+            await self.czekaj(pozostalo)
+
+    # Jak Dysk.przeslij_plik; blokujące kopiowanie porcji odbywa się w puli wątków
+    async def przeslij_plik(self, rozmiar_pliku, kopia=None):
+        kopia = kopia or BezKopii()
+        try:
+            przesylanie = Przesylanie(rozmiar_pliku, self.rozmiar_porcji)
+            kubelek = KubelekZetonow(self.predkosc_przesylania, self.rozmiar_porcji)
+            self.przesylanie = przesylanie
+            for przesuniecie, ile in przesylanie.porcje():
+                if not isinstance(kopia, BezKopii):
+                    await asyncio.to_thread(kopia.przeslij, przesuniecie, ile)
+                kubelek.pomin(await self.odczekaj(kubelek.pobierz(ile)))
+                przesylanie.zapisz_porcje(ile)
+            logging.info(f"Dysk {self.id_dysku}: Zakończono przesyłanie pliku o rozmiarze {rozmiar_pliku}")
+        except Exception as e:
+            logging.error(f"Dysk {self.id_dysku}: Wystąpił błąd podczas przesyłania pliku - {e}")
+        finally:
+            kopia.zamknij()
+            self.przesylanie = None
+
+
+# Klasa Serwera asynchronicznego - ten sam interfejs co Serwer, wywoływany
+# z wątku pętli zdarzeń (np. z procedur obsługi GUI podpiętego do pętli)
+class SerwerAsync:
+    def __init__(self, aukcja=None, ziarno=None, predkosci_dyskow=None, fabryka_kopii=None):
+        self.klienci = []
+        self.zegar = ZegarSymulacji(wstrzymany=True)
+        self.magazyn = MagazynKlientow(self.zegar)
+        self.fabryka_kopii = fabryka_kopii
+        self.zmienieni_klienci = set()  # klienci zmienieni od ostatniego odczytu przez GUI
+        self.los = random.Random(ziarno)
+        self.aukcja = aukcja if aukcja is not None else AukcjaTurniejowa(zegar=self.zegar)
+        if predkosci_dyskow is None:
+            predkosci_dyskow = [PROFILE_DYSKOW['hdd']] * 5
+        self.dyski = [DyskAsync(i, self, predkosc) for i, predkosc in enumerate(predkosci_dyskow)]
+        self.nastepny_id_dysku = len(self.dyski)
+        self.czekajace = deque()  # dyski czekające na pracę, w kolejności zaśnięcia
+        self.pliki_w_kolejce = 0
+        self.dziala = asyncio.Event()  # ustawione, gdy symulacja nie jest wstrzymana
+        self.czy_aktywna = False
+        self.czy_aktywowana = False
+
+    def dodaj_klienta(self):
+        nowy_klient = Klient(len(self.klienci) + 1, los=self.los, magazyn=self.magazyn)
+        self.klienci.append(nowy_klient)
+        nowy_klient.rozpocznij_odliczanie()
+        self.aukcja.dodaj_klienta(nowy_klient)
+        self.zmienieni_klienci.add(nowy_klient)
+        self.pliki_w_kolejce += len(nowy_klient.pliki)
+        self._obudz_czekajace(1)
+        return nowy_klient
+
+    def przydziel_plik(self, predkosc_przesylania=None):
+        klient, plik = self.aukcja.przeprowadz_aukcje(predkosc_przesylania)
+        if klient:
+            self.pliki_w_kolejce -= 1
+            self.zmienieni_klienci.add(klient)
+        return klient, plik
+
+    def pobierz_zmienionych_klientow(self):
+        zmienieni, self.zmienieni_klienci = self.zmienieni_klienci, set()
+        return zmienieni
+
+    def _obudz_czekajace(self, ile):
+        while self.czekajace and ile > 0:
+            dysk = self.czekajace.popleft()
+            if dysk.budzik is not None and not dysk.budzik.done():
+                dysk.obudz()
+                ile -= 1
+
+    # Czeka, aż symulacja będzie aktywna i znajdzie się plik; wycofany dysk
+    # dostaje (None, None). Budzenie odbywa się łańcuchowo: dysk, który
+    # dostał plik, budzi kolejny czekający, dopóki w kolejce są pliki - koszt
+    # wznowienia nie rośnie z liczbą bezczynnych dysków.
+    async def czekaj_na_plik(self, dysk):
+        while not dysk.wycofany:
+            if self.dziala.is_set():
+                klient, plik = self.przydziel_plik(dysk.predkosc_przesylania)
+                if klient:
+                    if self.pliki_w_kolejce:
+                        self._obudz_czekajace(1)
+                    return klient, plik
+            self.czekajace.append(dysk)
+            await dysk.czekaj()
+        return None, None
+
+    def dodaj_dysk(self, predkosc_przesylania=PROFILE_DYSKOW['hdd']):
+        dysk = DyskAsync(self.nastepny_id_dysku, self, predkosc_przesylania)
+        self.nastepny_id_dysku += 1
+        self.dyski.append(dysk)
+        if self.czy_aktywowana:
+            dysk.uruchom()
+        return dysk
+
+    # Wycofuje dysk z puli; dysk w trakcie przesyłania najpierw kończy plik
+    def usun_dysk(self, id_dysku):
+        dysk = next((dysk for dysk in self.dyski if dysk.id_dysku == id_dysku), None)
+        if dysk is None:
+            return None
+        dysk.wycofany = True
+        if dysk.zadanie is None:
+            self.dyski.remove(dysk)
+        elif dysk.aktywny_plik is None:
+            dysk.obudz()
+        return dysk
+
+    def usun_z_puli(self, dysk):
+        if dysk in self.dyski:
+            self.dyski.remove(dysk)
+
+    def rozpocznij_symulacje(self):
+        self.zegar.wznow()
+        self.dziala.set()
+        if not self.czy_aktywowana:
+            self.czy_aktywowana = True
+            for dysk in list(self.dyski):
+                dysk.uruchom()
+        self._obudz_czekajace(1)
+        self.czy_aktywna = True
+
+    # Budzi dyski w trakcie porcji, żeby zamroziły pozostały czas
+    def zatrzymaj_symulacje(self):
+        self.dziala.clear()
+        self.zegar.zatrzymaj()
+        for dysk in self.dyski:
+            if dysk.aktywny_plik is not None:
+                dysk.obudz()
+        self.czy_aktywna = False
+
+    # Kończy zadania wszystkich dysków (np. przy zamykaniu programu)
+    async def zamknij(self):
+        zadania = [dysk.zadanie for dysk in self.dyski if dysk.zadanie is not None]
+        for zadanie in zadania:
+            zadanie.cancel()
+        await asyncio.gather(*zadania, return_exceptions=True)
+
+    def czy_zakonczyc(self):
+        return all(not klient.pliki for klient in self.klienci)
+
+
+# GUI podpięte do pętli asyncio: zdarzenia okna obsługuje zadanie pętli,
+# w której pracują też dyski, zamiast blokującego mainloop
+async def uruchom_gui(gui, okres=1 / 60):
+    try:
+        while True:
+            gui.root.update()
+            await asyncio.sleep(okres)
+    except tk.TclError:  # okno zostało zamknięte
+        pass
+
+
+def main():
+    async def uruchom():
+        serwer = SerwerAsync()
+        await uruchom_gui(GUI(serwer))
+        await serwer.zamknij()
+
+    asyncio.run(uruchom())
+
+
+if __name__ == "__main__":
+    main()
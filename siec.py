@@ -0,0 +1,326 @@
+import asyncio
+import struct
+import threading
+import time
+
+# Wejście sieciowe serwera: producenci zgłaszają pliki do przesłania przez
+# TCP albo gniazdo Unix, a zgłoszenia trafiają prosto do harmonogramu
+# (Serwer.dodaj_klienta - jedno zgłoszenie to jeden klient). Połączenie
+# obsługuje dowolnie wiele zgłoszeń, także wysłanych jedno za drugim bez
+# czekania na odpowiedź; odpowiedzi i powiadomienia niosą numer zgłoszenia
+# nadany przez producenta.
+#
+# Ramka: 4-bajtowa długość treści (big-endian), treść zaczyna rodzaj (1 bajt).
+#   producent -> serwer
+#     ZGLOSZENIE   numer (Q), liczba plików (I), rozmiary plików (Q...)
+#   serwer -> producent
+#     PRZYJETO     numer (Q), id klienta (Q), pliki w kolejce (Q)
+#     ODRZUCONO    numer (Q), powód (UTF-8)
+#     PRZYDZIAL    numer (Q), rozmiar (Q), czas oczekiwania klienta (d, s)
+#     ZAKONCZENIE  numer (Q), rozmiar (Q), czas przesyłania (d, s)
+#     BLAD         numer (Q), rozmiar (Q), opis błędu (UTF-8)
+#     GOTOWE       numer (Q), liczba plików (I), czas od przyjęcia (d, s)
+# Zgłoszenie trafia do harmonogramu tylko wtedy, gdy jego pliki mieszczą się
+# w kolejce pod `gorny_limit`; inaczej serwer wstrzymuje połączenie (i czytanie
+# kolejnych zgłoszeń), aż kolejka spadnie do `dolny_limit` - bufory gniazd się
+# zapełniają i producenci zwalniają (TCP robi resztę). Zgłoszenie większe niż
+# cały limit czeka na pustą kolejkę. Każdy plik kończy dokładnie jedno
+# powiadomienie ZAKONCZENIE albo BLAD, także plik przesyłany w segmentach.
+
+ZGLOSZENIE = 1
+PRZYJETO = 2
+ODRZUCONO = 3
+PRZYDZIAL = 4
+ZAKONCZENIE = 5
+BLAD = 6
+GOTOWE = 7
+
+DLUGOSC = struct.Struct('!I')
+RODZAJ = struct.Struct('!B')
+RAMKA_ZGLOSZENIA = struct.Struct('!BQI')
+RAMKA_PRZYJECIA = struct.Struct('!BQQQ')
+RAMKA_NUMERU = struct.Struct('!BQ')
+RAMKA_PLIKU = struct.Struct('!BQQd')
+RAMKA_BLEDU = struct.Struct('!BQQ')
+RAMKA_GOTOWE = struct.Struct('!BQId')
+
+# Największa dopuszczalna treść ramki (bajty) - ok. 130 tys. plików w zgłoszeniu
+MAKS_RAMKA = 1024 * 1024
+
+# Domyślne progi wstrzymania czytania zgłoszeń (pliki w kolejce)
+GORNY_LIMIT = 100000
+
+# Co ile sekund wstrzymane połączenia sprawdzają kolejkę, niezależnie od powiadomień
+OKRES_SPRAWDZANIA = 0.1
+
+# Zdarzenia dysków przekazywane do pętli wejścia
+ZDARZENIA_PLIKOW = frozenset(('przydzial', 'zakonczenie', 'blad'))
+
+
+class BladProtokolu(Exception):
+    pass
+
+
+def ramka(struktura, *pola, ogon=b''):
+    tresc = struktura.pack(*pola) + ogon
+    return DLUGOSC.pack(len(tresc)) + tresc
+
+
+def ramka_zgloszenia(numer, pliki):
+    return ramka(RAMKA_ZGLOSZENIA, ZGLOSZENIE, numer, len(pliki), ogon=struct.pack(f'!{len(pliki)}Q', *pliki))
+
+
+async def czytaj_ramke(czytnik):
+    naglowek = await czytnik.readexactly(DLUGOSC.size)
+    dlugosc, = DLUGOSC.unpack(naglowek)
+    if not RODZAJ.size <= dlugosc <= MAKS_RAMKA:
+        raise BladProtokolu(f"Niedozwolona długość ramki: {dlugosc}")
+    return await czytnik.readexactly(dlugosc)
+
+
+# Rozkłada treść ramki serwera na (rodzaj, numer, pola...)
+def rozloz_odpowiedz(tresc):
+    rodzaj = tresc[0]
+    if rodzaj == PRZYJETO:
+        return RAMKA_PRZYJECIA.unpack(tresc)
+    if rodzaj in (PRZYDZIAL, ZAKONCZENIE):
+        return RAMKA_PLIKU.unpack(tresc)
+    if rodzaj == GOTOWE:
+        return RAMKA_GOTOWE.unpack(tresc)
+    if rodzaj == ODRZUCONO:
+        return RAMKA_NUMERU.unpack_from(tresc) + (tresc[RAMKA_NUMERU.size:].decode('utf-8'),)
+    if rodzaj == BLAD:
+        return RAMKA_BLEDU.unpack_from(tresc) + (tresc[RAMKA_BLEDU.size:].decode('utf-8'),)
+    raise BladProtokolu(f"Nieznany rodzaj ramki: {rodzaj}")
+
+
+# Dziennik przekazujący zdarzenia plików (z wątków dysków) do pętli wejścia;
+# wszystkie zdarzenia trafiają też do dziennika serwera, jeśli był
+class DziennikPowiadomien:
+    def __init__(self, dziennik, petla, odbiorca):
+        self.dziennik = dziennik
+        self.petla = petla
+        self.odbiorca = odbiorca
+
+    def zapisz(self, zdarzenie, czas, **pola):
+        if self.dziennik:
+            self.dziennik.zapisz(zdarzenie, czas, **pola)
+        if zdarzenie in ZDARZENIA_PLIKOW:
+            try:
+                self.petla.call_soon_threadsafe(self.odbiorca, zdarzenie, pola)
+            except RuntimeError:
+                pass  # pętla wejścia już zamknięta
+
+
+# Zgłoszenie przyjęte przez wejście, czekające na przesłanie plików
+class Zgloszenie:
+    __slots__ = ('numer', 'pisarz', 'pliki', 'pozostalo', 'przyjeto')
+
+    def __init__(self, numer, pisarz, pliki):
+        self.numer = numer
+        self.pisarz = pisarz
+        self.pliki = pliki
+        self.pozostalo = pliki
+        self.przyjeto = time.monotonic()
+
+
+# Klasa Wejścia sieciowego - serwer asyncio przyjmujący zgłoszenia
+class WejscieSieciowe:
+    def __init__(self, serwer, gorny_limit=GORNY_LIMIT, dolny_limit=None):
+        self.serwer = serwer
+        self.gorny_limit = gorny_limit
+        self.dolny_limit = gorny_limit // 2 if dolny_limit is None else dolny_limit
+        self.zgloszenia = {}  # id klienta -> Zgloszenie
+        self.serwery = []
+        self.polaczenia = set()  # zadania obsługi połączeń
+        self.adres = None  # (host, port) gniazda TCP
+        self.swobodnie = None  # asyncio.Event - kolejka spadła do dolnego limitu
+        self.dziennik_serwera = None
+        self.przyjete = 0
+        self.wstrzymania = 0  # ile razy czytanie zgłoszeń wstrzymano przez głęboką kolejkę
+
+    async def uruchom(self, host='127.0.0.1', port=None, sciezka_unix=None):
+        self.swobodnie = asyncio.Event()
+        self.dziennik_serwera = self.serwer.dziennik
+        self.serwer.podlacz_dziennik(DziennikPowiadomien(self.dziennik_serwera, asyncio.get_running_loop(),
+                                                         self._zdarzenie))
+        try:
+            if port is not None:
+                serwer_tcp = await asyncio.start_server(self._obsluz, host, port)
+                self.serwery.append(serwer_tcp)
+                self.adres = serwer_tcp.sockets[0].getsockname()[:2]
+            if sciezka_unix is not None:
+                self.serwery.append(await asyncio.start_unix_server(self._obsluz, sciezka_unix))
+        except OSError:
+            await self.zamknij()
+            raise
+
+    async def zamknij(self):
+        for serwer in self.serwery:
+            serwer.close()
+        for zadanie in self.polaczenia:
+            zadanie.cancel()
+        await asyncio.gather(*self.polaczenia, return_exceptions=True)
+        for serwer in self.serwery:
+            await serwer.wait_closed()
+        self.serwery = []
+        self.serwer.podlacz_dziennik(self.dziennik_serwera)
+
+    async def _obsluz(self, czytnik, pisarz):
+        zadanie = asyncio.current_task()
+        self.polaczenia.add(zadanie)
+        zadanie.add_done_callback(self.polaczenia.discard)
+        try:
+            while True:
+                try:
+                    tresc = await czytaj_ramke(czytnik)
+                except asyncio.IncompleteReadError:
+                    return  # producent zamknął połączenie
+                numer, pliki = self._rozloz_zgloszenie(tresc)
+                if not pliki or min(pliki) < 1:
+                    pisarz.write(ramka(RAMKA_NUMERU, ODRZUCONO, numer,
+                                       ogon="Zgłoszenie bez plików albo pusty plik".encode()))
+                else:
+                    await self._czekaj_na_miejsce(len(pliki))
+                    self._przyjmij(numer, pliki, pisarz)
+                await pisarz.drain()
+        except BladProtokolu as e:
+            pisarz.write(ramka(RAMKA_NUMERU, ODRZUCONO, 0, ogon=str(e).encode('utf-8')))
+        except ConnectionError:
+            pass
+        finally:
+            pisarz.close()
+
+    # Wstrzymuje zgłoszenie `liczba` plików, dopóki nie zmieści się ono
+    # w kolejce harmonogramu pod górnym limitem
+    async def _czekaj_na_miejsce(self, liczba):
+        if self.serwer.pliki_w_kolejce + liczba <= self.gorny_limit:
+            return
+        self.wstrzymania += 1
+        prog = max(0, min(self.dolny_limit, self.gorny_limit - liczba))
+        while self.serwer.pliki_w_kolejce > prog:
+            self.swobodnie.clear()
+            try:
+                await asyncio.wait_for(self.swobodnie.wait(), OKRES_SPRAWDZANIA)
+            except asyncio.TimeoutError:
+                pass
+
+    # (numer, rozmiary plików) z ramki zgłoszenia
+    def _rozloz_zgloszenie(self, tresc):
+        if tresc[0] != ZGLOSZENIE or len(tresc) < RAMKA_ZGLOSZENIA.size:
+            raise BladProtokolu(f"Oczekiwano zgłoszenia, otrzymano ramkę rodzaju {tresc[0]}")
+        _, numer, liczba = RAMKA_ZGLOSZENIA.unpack_from(tresc)
+        if len(tresc) != RAMKA_ZGLOSZENIA.size + 8 * liczba:
+            raise BladProtokolu(f"Zgłoszenie {numer}: długość ramki nie zgadza się z liczbą plików")
+        return numer, struct.unpack_from(f'!{liczba}Q', tresc, RAMKA_ZGLOSZENIA.size)
+
+    def _przyjmij(self, numer, pliki, pisarz):
+        klient = self.serwer.dodaj_klienta(pliki)
+        # Powiadomienia z dysków wykonują się w pętli dopiero po tym kroku, więc
+        # zgłoszenie jest zarejestrowane przed pierwszym przydziałem jego pliku
+        self.zgloszenia[klient.id_klienta] = Zgloszenie(numer, pisarz, len(pliki))
+        self.przyjete += 1
+        pisarz.write(ramka(RAMKA_PRZYJECIA, PRZYJETO, numer, klient.id_klienta, self.serwer.pliki_w_kolejce))
+
+    # Zdarzenie pliku z dysku, wykonywane w pętli wejścia
+    def _zdarzenie(self, zdarzenie, pola):
+        if zdarzenie == 'przydzial' and not self.swobodnie.is_set() \
+                and self.serwer.pliki_w_kolejce <= self.dolny_limit:
+            self.swobodnie.set()
+        zgloszenie = self.zgloszenia.get(pola['klient'])
+        if zgloszenie is None:
+            return
+        pisarz = zgloszenie.pisarz
+        if zdarzenie == 'przydzial':
+            odpowiedz = ramka(RAMKA_PLIKU, PRZYDZIAL, zgloszenie.numer, pola['plik'], pola['oczekiwanie'])
+        elif zdarzenie == 'zakonczenie':
+            odpowiedz = ramka(RAMKA_PLIKU, ZAKONCZENIE, zgloszenie.numer, pola['plik'], pola['trwanie'])
+        else:
+            odpowiedz = ramka(RAMKA_BLEDU, BLAD, zgloszenie.numer, pola['plik'], ogon=pola['blad'].encode('utf-8'))
+        if zdarzenie != 'przydzial':
+            zgloszenie.pozostalo -= 1
+            if zgloszenie.pozostalo <= 0:
+                del self.zgloszenia[pola['klient']]
+                odpowiedz += ramka(RAMKA_GOTOWE, GOTOWE, zgloszenie.numer, zgloszenie.pliki,
+                                   time.monotonic() - zgloszenie.przyjeto)
+        # Producent, który się rozłączył, nie dostaje powiadomień; jego pliki są przesyłane dalej
+        if not pisarz.is_closing():
+            pisarz.write(odpowiedz)
+
+
+# Klasa Wątku wejścia - pętla asyncio wejścia sieciowego obok wątków dysków
+# i GUI. uruchom() zwraca adres TCP albo zgłasza błąd otwarcia gniazda.
+class WatekWejscia(threading.Thread):
+    def __init__(self, serwer, host='127.0.0.1', port=None, sciezka_unix=None, **opcje):
+        super().__init__(daemon=True)
+        self.wejscie = WejscieSieciowe(serwer, **opcje)
+        self.host = host
+        self.port = port
+        self.sciezka_unix = sciezka_unix
+        self.petla = None
+        self.gotowe = threading.Event()
+        self.blad = None
+
+    def run(self):
+        self.petla = asyncio.new_event_loop()
+        try:
+            try:
+                self.petla.run_until_complete(self.wejscie.uruchom(self.host, self.port, self.sciezka_unix))
+            except OSError as e:
+                self.blad = e
+                return
+            finally:
+                self.gotowe.set()
+            self.petla.run_forever()
+            self.petla.run_until_complete(self.wejscie.zamknij())
+        finally:
+            self.petla.close()
+
+    def uruchom(self):
+        self.start()
+        self.gotowe.wait()
+        if self.blad:
+            raise self.blad
+        return self.wejscie.adres
+
+    def zatrzymaj(self):
+        if self.is_alive():
+            self.petla.call_soon_threadsafe(self.petla.stop)
+            self.join()
+
+
+# Klasa Połączenia producenta - strona klienta protokołu. zglos() wysyła
+# zgłoszenie bez czekania na odpowiedź; odpowiedzi i powiadomienia trafiają
+# do funkcji odbiorca(rodzaj, numer, *pola) wywoływanej w pętli producenta.
+class PolaczenieProducenta:
+    def __init__(self, czytnik, pisarz, odbiorca):
+        self.czytnik = czytnik
+        self.pisarz = pisarz
+        self.odbiorca = odbiorca
+        self.zadanie = asyncio.get_running_loop().create_task(self._czytaj())
+
+    @classmethod
+    async def polacz(cls, odbiorca, host='127.0.0.1', port=None, sciezka_unix=None):
+        if sciezka_unix is not None:
+            czytnik, pisarz = await asyncio.open_unix_connection(sciezka_unix)
+        else:
+            czytnik, pisarz = await asyncio.open_connection(host, port)
+        return cls(czytnik, pisarz, odbiorca)
+
+    # Czeka na miejsce w buforze gniazda - tędy dochodzi wstrzymanie serwera
+    async def zglos(self, numer, pliki):
+        self.pisarz.write(ramka_zgloszenia(numer, pliki))
+        await self.pisarz.drain()
+
+    async def _czytaj(self):
+        while True:
+            try:
+                tresc = await czytaj_ramke(self.czytnik)
+            except asyncio.IncompleteReadError:
+                return
+            self.odbiorca(*rozloz_odpowiedz(tresc))
+
+    async def zamknij(self):
+        self.pisarz.close()
+        self.zadanie.cancel()
+        await asyncio.gather(self.zadanie, return_exceptions=True)
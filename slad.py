@@ -0,0 +1,211 @@
+import csv
+import math
+import struct
+import sys
+import time
+from array import array
+
+# Ślad obciążenia: przybycia klientów z rozmiarami plików, pauzy, wznowienia
+# oraz dodanie i wycofanie dysków, z chwilami liczonymi od początku nagrania
+# (zegar nie staje w pauzie). Ślad nagrany z GUI albo wygenerowany odtwarza
+# się deterministycznie w SymulacjaZdarzeniowa - ten sam model co Serwer,
+# z wirtualnym zegarem - albo w czasie rzeczywistym na działającym Serwerze.
+#
+# Zdarzenia to krotki (czas, rodzaj, wartosc):
+#   'klient'     - lista rozmiarów plików
+#   'dysk'       - przepustowość dysku dołączonego do puli (także startowej);
+#                  dyski dostają kolejne id od 0, jak w Serwer
+#   'wycofanie'  - id wycofanego dysku
+#   'pauza', 'wznowienie' - bez wartości; pierwsze wznowienie rozpoczyna symulację
+
+RODZAJE = ('klient', 'dysk', 'wycofanie', 'pauza', 'wznowienie')
+
+# Format kolumnowy (.slad): nagłówek, potem kolumny little-endian jedna po
+# drugiej - czasy (float64), rodzaje (int8), wartości (int64: liczba plików
+# klienta, przepustowość albo id dysku) i wszystkie rozmiary plików (int64)
+MAGIA = b'SLAD'
+WERSJA = 1
+NAGLOWEK = struct.Struct('<4sIQQ')  # magia, wersja, liczba zdarzeń, liczba plików
+
+
+# Klasa Śladu obciążenia
+class Slad:
+    def __init__(self, zdarzenia=None, zegar=time.monotonic):
+        self.zdarzenia = list(zdarzenia) if zdarzenia is not None else []
+        self.zegar = zegar
+        self.poczatek = zegar()
+
+    def __len__(self):
+        return len(self.zdarzenia)
+
+    def __eq__(self, inny):
+        return self.zdarzenia == inny.zdarzenia
+
+    # Nagranie zdarzenia w chwili bieżącej (lub podanej)
+    def zapisz(self, rodzaj, wartosc=None, czas=None):
+        if czas is None:
+            czas = self.zegar() - self.poczatek
+        self.zdarzenia.append((czas, rodzaj, wartosc))
+
+    def zapisz_do_pliku(self, sciezka):
+        if sciezka.endswith('.csv'):
+            self._zapisz_csv(sciezka)
+        else:
+            self._zapisz_kolumnowo(sciezka)
+
+    def _zapisz_csv(self, sciezka):
+        with open(sciezka, 'w', newline='') as plik:
+            pisarz = csv.writer(plik)
+            pisarz.writerow(['czas', 'zdarzenie', 'wartosc'])
+            for czas, rodzaj, wartosc in self.zdarzenia:
+                if rodzaj == 'klient':
+                    wartosc = ' '.join(map(str, wartosc))
+                pisarz.writerow([repr(czas), rodzaj, '' if wartosc is None else wartosc])
+
+    def _zapisz_kolumnowo(self, sciezka):
+        czasy, rodzaje, wartosci, pliki = array('d'), array('b'), array('q'), array('q')
+        for czas, rodzaj, wartosc in self.zdarzenia:
+            czasy.append(czas)
+            rodzaje.append(RODZAJE.index(rodzaj))
+            if rodzaj == 'klient':
+                wartosci.append(len(wartosc))
+                pliki.extend(wartosc)
+            else:
+                wartosci.append(0 if wartosc is None else wartosc)
+        with open(sciezka, 'wb') as plik:
+            plik.write(NAGLOWEK.pack(MAGIA, WERSJA, len(czasy), len(pliki)))
+            for kolumna in (czasy, rodzaje, wartosci, pliki):
+                if sys.byteorder == 'big':
+                    kolumna.byteswap()
+                kolumna.tofile(plik)
+
+
+def _wczytaj_csv(sciezka):
+    zdarzenia = []
+    with open(sciezka, newline='') as plik:
+        for wiersz in csv.DictReader(plik):
+            rodzaj, wartosc = wiersz['zdarzenie'], wiersz['wartosc']
+            if rodzaj not in RODZAJE:
+                raise ValueError(f"Nieznane zdarzenie śladu: {rodzaj}")
+            if rodzaj == 'klient':
+                wartosc = [int(rozmiar) for rozmiar in wartosc.split()]
+            else:
+                wartosc = int(wartosc) if wartosc else None
+            zdarzenia.append((float(wiersz['czas']), rodzaj, wartosc))
+    return zdarzenia
+
+
+def _wczytaj_kolumnowo(sciezka):
+    with open(sciezka, 'rb') as plik:
+        magia, wersja, liczba, liczba_plikow = NAGLOWEK.unpack(plik.read(NAGLOWEK.size))
+        if magia != MAGIA or wersja != WERSJA:
+            raise ValueError(f"{sciezka} nie jest plikiem śladu w wersji {WERSJA}")
+        kolumny = []
+        for typ, dlugosc in (('d', liczba), ('b', liczba), ('q', liczba), ('q', liczba_plikow)):
+            kolumna = array(typ)
+            kolumna.fromfile(plik, dlugosc)
+            if sys.byteorder == 'big':
+                kolumna.byteswap()
+            kolumny.append(kolumna)
+    czasy, rodzaje, wartosci, pliki = kolumny
+    zdarzenia = []
+    pozycja = 0
+    for czas, kod, wartosc in zip(czasy, rodzaje, wartosci):
+        rodzaj = RODZAJE[kod]
+        if rodzaj == 'klient':
+            zdarzenia.append((czas, rodzaj, pliki[pozycja:pozycja + wartosc].tolist()))
+            pozycja += wartosc
+        else:
+            zdarzenia.append((czas, rodzaj, wartosc if rodzaj in ('dysk', 'wycofanie') else None))
+    return zdarzenia
+
+
+def wczytaj_slad(sciezka):
+    if sciezka.endswith('.csv'):
+        return Slad(_wczytaj_csv(sciezka))
+    return Slad(_wczytaj_kolumnowo(sciezka))
+
+
+# Deterministyczne odtworzenie śladu w symulacji zdarzeniowej. silnik(zegar)
+# tworzy silnik aukcji (domyślnie drzewo turniejowe). Zwraca symulację po
+# przetworzeniu wszystkich zdarzeń.
+def odtworz(slad, silnik=None):
+    # Import lokalny - symulacja importuje main, a main nagrywa ślady
+    from symulacja_zdarzeniowa import SymulacjaZdarzeniowa
+
+    symulacja = SymulacjaZdarzeniowa([])
+    if silnik is not None:
+        symulacja.aukcja = silnik(symulacja.zegar)
+    for czas, rodzaj, wartosc in slad.zdarzenia:
+        if rodzaj == 'klient':
+            symulacja.dodaj_klienta(czas, wartosc)
+        elif rodzaj == 'dysk':
+            symulacja.dodaj_dysk(czas, wartosc)
+        elif rodzaj == 'wycofanie':
+            symulacja.usun_dysk(czas, wartosc)
+        elif rodzaj == 'pauza':
+            symulacja.zatrzymaj_symulacje(czas)
+        elif rodzaj == 'wznowienie':
+            symulacja.rozpocznij_symulacje(czas)
+    symulacja.uruchom()
+    return symulacja
+
+
+# Odtworzenie śladu na działającym serwerze w czasie rzeczywistym
+# (przyspieszonym `tempo` razy). Serwer powinien startować bez dysków
+# (predkosci_dyskow=[]) - pulę odtwarzają zdarzenia 'dysk'. Kolejność
+# zdarzeń jest zachowana, ale przydziały zależą od planisty wątków - do
+# porównań służy odtworz().
+def odtworz_na_serwerze(slad, serwer, tempo=1.0):
+    poczatek = time.monotonic()
+    for czas, rodzaj, wartosc in slad.zdarzenia:
+        opoznienie = poczatek + czas / tempo - time.monotonic()
+        if opoznienie > 0:
+            time.sleep(opoznienie)
+        if rodzaj == 'klient':
+            serwer.dodaj_klienta(wartosc)
+        elif rodzaj == 'dysk':
+            serwer.dodaj_dysk(wartosc)
+        elif rodzaj == 'wycofanie':
+            serwer.usun_dysk(wartosc)
+        elif rodzaj == 'pauza':
+            serwer.zatrzymaj_symulacje()
+        elif rodzaj == 'wznowienie':
+            serwer.rozpocznij_symulacje()
+
+
+def percentyl(posortowane, p):
+    if not posortowane:
+        return 0.0
+    return posortowane[min(len(posortowane) - 1, math.ceil(p / 100 * len(posortowane)) - 1)]
+
+
+# Wskaźniki odtworzenia porównywane między wersjami planisty: czas oczekiwania
+# pliku (od przybycia klienta do przydziału) i przepustowość całego przebiegu
+def podsumuj(symulacja):
+    zakonczenia = symulacja.zakonczenia
+    if not zakonczenia:
+        return {"pliki": 0, "oczekiwanie_p50_s": 0.0, "oczekiwanie_p99_s": 0.0, "przepustowosc_B_s": 0.0}
+    oczekiwania = sorted(z.czas_przydzialu - symulacja.czasy_przybycia[z.id_klienta] for z in zakonczenia)
+    czas_trwania = max(z.czas for z in zakonczenia) - min(symulacja.czasy_przybycia.values())
+    return {
+        "pliki": len(zakonczenia),
+        "oczekiwanie_p50_s": percentyl(oczekiwania, 50),
+        "oczekiwanie_p99_s": percentyl(oczekiwania, 99),
+        "przepustowosc_B_s": sum(z.rozmiar for z in zakonczenia) / czas_trwania if czas_trwania else 0.0,
+    }
+
+
+# Lista pogorszeń względem wzorca: dłuższe p99 oczekiwania albo mniejsza
+# przepustowość o więcej niż `tolerancja` (względnie)
+def porownaj_ze_wzorcem(wynik, wzorzec, tolerancja=0.05):
+    pogorszenia = []
+    if wynik["pliki"] != wzorzec["pliki"]:
+        pogorszenia.append(f"pliki: {wynik['pliki']} zamiast {wzorzec['pliki']}")
+    if wynik["oczekiwanie_p99_s"] > wzorzec["oczekiwanie_p99_s"] * (1 + tolerancja):
+        pogorszenia.append(f"p99 oczekiwania: {wynik['oczekiwanie_p99_s']:.3f} s "
+                           f"(wzorzec {wzorzec['oczekiwanie_p99_s']:.3f} s)")
+    if wynik["przepustowosc_B_s"] < wzorzec["przepustowosc_B_s"] * (1 - tolerancja):
+        pogorszenia.append(f"przepustowość: {wynik['przepustowosc_B_s'] / 10**6:.1f} MB/s "
+                           f"(wzorzec {wzorzec['przepustowosc_B_s'] / 10**6:.1f} MB/s)")
+    return pogorszenia
@@ -0,0 +1,287 @@
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+
+# Zapis stanu serwera: zegar symulacji, klienci z pozostałymi plikami
+# i czasami oczekiwania oraz dyski z przesyłaniami w toku. Stan leży w dwóch
+# plikach little-endian:
+#   <sciezka>                 - nagłówek, kolumny klientów i kolumny dysków,
+#                               podmieniany atomowo przy każdym zapisie
+#   <sciezka>.rozmiary.<nr>   - tablica rozmiarów plików magazynu; rośnie tylko
+#                               przez dopisywanie, więc kolejny zapis dopisuje
+#                               nowe pozycje, a cały plik (pod nowym numerem)
+#                               powstaje dopiero po zagęszczeniu magazynu
+# Odczyt odwzorowuje oba pliki w pamięci (mmap) i kopiuje kolumny prosto do
+# tablic magazynu, bez parsowania. Przesyłania w toku wracają na swoje dyski
+# i ruszają od pierwszej nieprzesłanej porcji. Podzielony plik zapisywany
+# jest jako jego nieukończone przedziały: nieprzesłana reszta segmentu każdego
+# dysku i segmenty czekające w podziale; po odczycie z tych przedziałów
+# powstaje podział pliku, a segmenty w toku wracają na swoje dyski. Bez
+# podziału plików w odtworzonym serwerze albo z rzeczywistą kopią (plik
+# docelowy powstaje od nowa) plik rusza w całości od początku na dysku
+# swojego właściciela.
+
+MAGIA = b'STAN'
+WERSJA = 2
+# magia, wersja, wskazanie zegara symulacji, następny id dysku, liczba klientów,
+# liczba dysków, liczba przedziałów podzielonych plików, liczba pozycji
+# w pliku rozmiarów, numer pliku rozmiarów
+NAGLOWEK = struct.Struct('<4sIdQQQQQQ')
+
+# Kolumny klientów (pola MagazynKlientow) i dysków w kolejności zapisu
+KOLUMNY_KLIENTOW = (('identyfikatory', 'q'), ('poczatki', 'q'), ('konce', 'q'),
+                    ('czasy_startu', 'd'), ('czasy_zatrzymania', 'd'), ('wyniki_aukcji', 'd'))
+KOLUMNY_DYSKOW = (('id', 'q'), ('predkosc', 'q'), ('klient', 'q'), ('plik', 'q'), ('przeslano', 'q'),
+                  ('wycofany', 'b'))
+# Nieukończone przedziały podzielonych plików; dysk -1 - segment czekający w podziale
+KOLUMNY_SEGMENTOW = (('podzial', 'q'), ('klient', 'q'), ('plik', 'q'), ('czas_przydzialu', 'd'),
+                     ('przesuniecie', 'q'), ('dlugosc', 'q'), ('dysk', 'q'), ('wlasciciel', 'b'))
+
+
+def sciezka_rozmiarow(sciezka, numer):
+    return f"{sciezka}.rozmiary.{numer}"
+
+
+def _zapisz_kolumne(plik, kolumna):
+    if sys.byteorder == 'big':
+        kolumna = array(kolumna.typecode, kolumna)
+        kolumna.byteswap()
+    kolumna.tofile(plik)
+
+
+def _czytaj_kolumne(mapa, pozycja, typ, dlugosc):
+    kolumna = array(typ)
+    koniec = pozycja + dlugosc * kolumna.itemsize
+    if koniec > len(mapa):
+        raise ValueError("Uszkodzony zapis stanu: plik krótszy niż nagłówek zapowiada")
+    with memoryview(mapa)[pozycja:koniec] as fragment:
+        kolumna.frombytes(fragment)
+    if sys.byteorder == 'big':
+        kolumna.byteswap()
+    return kolumna, koniec
+
+
+def czytaj_naglowek(sciezka):
+    with open(sciezka, 'rb') as plik:
+        dane = plik.read(NAGLOWEK.size)
+    if len(dane) < NAGLOWEK.size:
+        raise ValueError(f"{sciezka} nie jest zapisem stanu")
+    magia, wersja, *pola = NAGLOWEK.unpack(dane)
+    if magia != MAGIA or wersja != WERSJA:
+        raise ValueError(f"{sciezka} nie jest zapisem stanu w wersji {WERSJA}")
+    return pola
+
+
+# Migawka stanu serwera zebrana pod blokadą harmonogramu - spójna między
+# magazynem a plikami przydzielonymi dyskom. Z tablicy rozmiarów kopiuje tylko
+# pozycje od `od` (gdy magazyn jest nadal w pokoleniu `pokolenie`).
+def migawka_serwera(serwer, pokolenie=None, od=0):
+    magazyn = serwer.magazyn
+    with serwer.blokada_aukcji:
+        czas = serwer.zegar()
+        klienci = {nazwa: getattr(magazyn, nazwa)[:] for nazwa, _ in KOLUMNY_KLIENTOW}
+        if magazyn.pokolenie != pokolenie or len(magazyn.rozmiary) < od:
+            od = None
+        nowe_rozmiary = magazyn.rozmiary[od or 0:]
+        dlugosc = len(magazyn.rozmiary)
+        dyski = {nazwa: array(typ) for nazwa, typ in KOLUMNY_DYSKOW}
+        segmenty = {nazwa: array(typ) for nazwa, typ in KOLUMNY_SEGMENTOW}
+        podzialy = {}  # id(podział) -> numer podziału w zapisie
+
+        def dodaj_przedzial(podzial, poczatek, ile, id_dysku, wlasciciel):
+            wiersz = (podzialy[id(podzial)], podzial.klient.indeks, podzial.rozmiar, podzial.czas_przydzialu,
+                      poczatek, ile, id_dysku, wlasciciel)
+            for (nazwa, _), wartosc in zip(KOLUMNY_SEGMENTOW, wiersz):
+                segmenty[nazwa].append(wartosc)
+
+        for dysk in serwer.dyski:
+            with dysk.blokada:
+                klient, plik, przesylanie = dysk.aktualny_klient, dysk.aktywny_plik, dysk.przesylanie
+                podzial, segment = dysk.podzial, dysk.segment
+                if podzial is None and plik is None and dysk.przydzial:
+                    klient, plik = dysk.przydzial
+                przeslano = przesylanie.stan()[0] if przesylanie else 0 if podzial is not None else dysk.wznowienie
+            if podzial is not None:
+                # Segmenty w podziale zmieniają się tylko pod blokadą harmonogramu
+                if id(podzial) not in podzialy:
+                    podzialy[id(podzial)] = len(podzialy)
+                    for poczatek, ile in podzial.segmenty:
+                        dodaj_przedzial(podzial, poczatek, ile, -1, False)
+                dodaj_przedzial(podzial, segment[0] + przeslano, segment[1] - przeslano, dysk.id_dysku,
+                                podzial.wlasciciel is dysk)
+                klient, plik = None, None
+            wiersz = (dysk.id_dysku, int(dysk.predkosc_przesylania), klient.indeks if klient else -1,
+                      plik or 0, przeslano if plik is not None else 0, dysk.wycofany)
+            for (nazwa, _), wartosc in zip(KOLUMNY_DYSKOW, wiersz):
+                dyski[nazwa].append(wartosc)
+        return {
+            "czas": czas,
+            "nastepny_id_dysku": serwer.nastepny_id_dysku,
+            "klienci": klienci,
+            "dyski": dyski,
+            "segmenty": segmenty,
+            "pokolenie": magazyn.pokolenie,
+            "od": od,
+            "rozmiary": nowe_rozmiary,
+            "dlugosc": dlugosc,
+        }
+
+
+# Klasa Zapisu stanu - zapis okresowy w wątku w tle i końcowy przy
+# zatrzymaniu. Pod blokadą harmonogramu powstaje tylko kopia kolumn, zapis
+# do plików odbywa się już bez niej.
+class ZapisStanu(threading.Thread):
+    def __init__(self, serwer, sciezka, okres=5.0):
+        super().__init__(daemon=True)
+        self.serwer = serwer
+        self.sciezka = sciezka
+        self.okres = okres
+        self.koniec = threading.Event()
+        self.blokada = threading.Lock()  # zapis okresowy i końcowy nie mogą się przeplatać
+        self.numer = None  # numer bieżącego pliku rozmiarów
+        self.pokolenie = None  # pokolenie magazynu zapisane w pliku rozmiarów
+        self.zapisane = 0  # pozycje zapisane w pliku rozmiarów
+        self.dopisane = 0  # pozycje zapisane ostatnim wywołaniem zapisz()
+
+    def _nastepny_numer(self):
+        if self.numer is not None:
+            return self.numer + 1
+        try:
+            return czytaj_naglowek(self.sciezka)[-1] + 1
+        except (OSError, ValueError):
+            return 0
+
+    def zapisz(self):
+        with self.blokada:
+            migawka = migawka_serwera(self.serwer, self.pokolenie, self.zapisane)
+            od = migawka["od"]
+            nowy_plik = od is None
+            if nowy_plik:
+                self.numer = self._nastepny_numer()
+                od = 0
+            with open(sciezka_rozmiarow(self.sciezka, self.numer), 'r+b' if od else 'wb') as plik:
+                plik.seek(od * 8)
+                _zapisz_kolumne(plik, migawka["rozmiary"])
+                plik.truncate()
+            self.pokolenie = migawka["pokolenie"]
+            self.zapisane = migawka["dlugosc"]
+            self.dopisane = len(migawka["rozmiary"])
+
+            klienci, dyski, segmenty = migawka["klienci"], migawka["dyski"], migawka["segmenty"]
+            tymczasowy = self.sciezka + ".tmp"
+            with open(tymczasowy, 'wb') as plik:
+                plik.write(NAGLOWEK.pack(MAGIA, WERSJA, migawka["czas"], migawka["nastepny_id_dysku"],
+                                         len(klienci["identyfikatory"]), len(dyski["id"]),
+                                         len(segmenty["podzial"]), self.zapisane, self.numer))
+                for nazwa, _ in KOLUMNY_KLIENTOW:
+                    _zapisz_kolumne(plik, klienci[nazwa])
+                for nazwa, _ in KOLUMNY_DYSKOW:
+                    _zapisz_kolumne(plik, dyski[nazwa])
+                for nazwa, _ in KOLUMNY_SEGMENTOW:
+                    _zapisz_kolumne(plik, segmenty[nazwa])
+            os.replace(tymczasowy, self.sciezka)
+            # Poprzednie pliki rozmiarów są zbędne dopiero, gdy nagłówek wskazuje nowy
+            if nowy_plik:
+                self._usun_stare_rozmiary()
+
+    def _usun_stare_rozmiary(self):
+        katalog, nazwa = os.path.split(self.sciezka)
+        biezacy = os.path.basename(sciezka_rozmiarow(self.sciezka, self.numer))
+        for plik in os.listdir(katalog or '.'):
+            if plik.startswith(nazwa + '.rozmiary.') and plik != biezacy:
+                os.remove(os.path.join(katalog, plik))
+
+    def run(self):
+        while not self.koniec.wait(self.okres):
+            self.zapisz()
+
+    def zatrzymaj(self):
+        self.koniec.set()
+        if self.is_alive():
+            self.join()
+        self.zapisz()
+
+
+# Serwer odtworzony z zapisu stanu, wstrzymany jak nowo utworzony - rusza
+# po rozpocznij_symulacje(). opcje trafiają do konstruktora Serwer (silnik
+# aukcji, metryki, dziennik...); pulę dysków wyznacza zapis.
+def wczytaj_stan(sciezka, **opcje):
+    # Import lokalny - main zapisuje i wczytuje stan przy starcie i zamknięciu
+    from main import Dysk, Klient, Serwer
+
+    with open(sciezka, 'rb') as plik, mmap.mmap(plik.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+        magia, wersja, czas, nastepny_id_dysku, liczba_klientow, liczba_dyskow, liczba_przedzialow, dlugosc, \
+            numer = NAGLOWEK.unpack_from(mapa)
+        if magia != MAGIA or wersja != WERSJA:
+            raise ValueError(f"{sciezka} nie jest zapisem stanu w wersji {WERSJA}")
+        pozycja = NAGLOWEK.size
+        klienci, dyski, segmenty = {}, {}, {}
+        for nazwa, typ in KOLUMNY_KLIENTOW:
+            klienci[nazwa], pozycja = _czytaj_kolumne(mapa, pozycja, typ, liczba_klientow)
+        for nazwa, typ in KOLUMNY_DYSKOW:
+            dyski[nazwa], pozycja = _czytaj_kolumne(mapa, pozycja, typ, liczba_dyskow)
+        for nazwa, typ in KOLUMNY_SEGMENTOW:
+            segmenty[nazwa], pozycja = _czytaj_kolumne(mapa, pozycja, typ, liczba_przedzialow)
+    rozmiary = array('q')
+    if dlugosc:
+        with open(sciezka_rozmiarow(sciezka, numer), 'rb') as plik, \
+                mmap.mmap(plik.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            rozmiary, _ = _czytaj_kolumne(mapa, 0, 'q', dlugosc)
+
+    serwer = Serwer(predkosci_dyskow=[], **opcje)
+    serwer.zegar.ustaw(czas)
+    magazyn = serwer.magazyn
+    for nazwa, _ in KOLUMNY_KLIENTOW:
+        setattr(magazyn, nazwa, klienci[nazwa])
+    magazyn.rozmiary = rozmiary
+    magazyn.przelicz_glowy()
+    pliki = sum(magazyn.konce) - sum(magazyn.poczatki)
+    magazyn.zuzyte = len(rozmiary) - pliki
+    serwer.klienci = [Klient.z_magazynu(magazyn, i) for i in range(liczba_klientow)]
+    if hasattr(serwer.aukcja, 'dodaj_klientow'):
+        serwer.aukcja.dodaj_klientow(serwer.klienci)
+    else:
+        for klient in serwer.klienci:
+            serwer.aukcja.dodaj_klienta(klient)
+    serwer.pliki_w_kolejce = pliki
+    serwer.zmienieni_klienci.update(serwer.klienci)
+
+    przedzialy = {}  # numer podziału -> wiersze jego przedziałów
+    for wiersz in zip(*(segmenty[nazwa] for nazwa, _ in KOLUMNY_SEGMENTOW)):
+        przedzialy.setdefault(wiersz[0], []).append(wiersz)
+    dyski_segmentow = set(segmenty['dysk'])
+
+    odtworzone = {}
+    for id_dysku, predkosc, klient, plik, przeslano, wycofany in zip(*(dyski[nazwa] for nazwa, _ in KOLUMNY_DYSKOW)):
+        if wycofany and klient < 0 and id_dysku not in dyski_segmentow:
+            continue  # wycofany dysk bez pliku opuścił już pulę
+        dysk = Dysk(id_dysku, serwer, predkosc)
+        dysk.wycofany = bool(wycofany)
+        if klient >= 0:
+            dysk.przydzial = (serwer.klienci[klient], plik)
+            dysk.wznowienie = przeslano
+        serwer.dyski.append(dysk)
+        odtworzone[id_dysku] = dysk
+        serwer.zdarzenie('dysk', predkosc, dysk=id_dysku, predkosc=predkosc)
+    serwer.nastepny_id_dysku = nastepny_id_dysku
+
+    for wiersze in przedzialy.values():
+        _, klient, rozmiar, czas_przydzialu = wiersze[0][:4]
+        klient = serwer.klienci[klient]
+        w_toku = [wiersz for wiersz in wiersze if wiersz[6] >= 0]
+        if serwer.podzialy is None or serwer.fabryka_kopii:
+            wlasciciel = max(w_toku, key=lambda wiersz: wiersz[7])
+            odtworzone[wlasciciel[6]].przydzial = (klient, rozmiar)
+            continue
+        podzial = serwer.podzialy.odtworz(klient, rozmiar, [wiersz[4:6] for wiersz in wiersze if wiersz[6] < 0],
+                                          len(wiersze), czas_przydzialu)
+        for *_, poczatek, ile, id_dysku, wlasciciel in w_toku:
+            dysk = odtworzone[id_dysku]
+            dysk.przydzial = (klient, rozmiar)
+            dysk.podzial, dysk.segment = podzial, (poczatek, ile)
+            if wlasciciel:
+                podzial.wlasciciel = dysk
+    return serwer
@@ -0,0 +1,238 @@
+import heapq
+import random
+from collections import namedtuple
+
+from aukcja import AukcjaTurniejowa
+from magazyn import MagazynKlientow, ZegarSymulacji
+from main import Klient, PROFILE_DYSKOW
+from podzial import PodzialyPlikow
+
+# Symulacja zdarzeniowa modelu Serwer/Dysk z wirtualnym zegarem.
+# Każdy dysk jest generatorem odtwarzającym pętlę Dysk.run: czekanie na plik,
+# aukcja, przesyłanie; generator zwraca czas trwania kroku albo sygnał czekania
+# na pracę. Przesyłanie jest modelowane w 10 krokach - łączny czas aktywnej
+# pracy (rozmiar / przepustowość) jest taki sam jak przy porcjach Dysk.przeslij_plik. Pauza zamraża pozostały czas bieżącego kroku, tak
+# jak Dysk.odczekaj, a dodanie klienta lub wznowienie od razu budzi czekające dyski.
+# Z rozmiarem segmentu duże pliki są dzielone jak w Serwer (podzial.py) - każdy
+# segment to osobne przesyłanie w KROKI_PRZESYLANIA krokach.
+# Zgodność z wątkowym Serwer (te same przydziały i chwile zakończeń) sprawdza
+# się, uruchamiając Serwer w trybie krokowym (krokowy.py) na tym samym scenariuszu.
+
+KROKI_PRZESYLANIA = 10
+
+CZEKAJ_NA_PRACE = 'praca'
+
+Zakonczenie = namedtuple('Zakonczenie', ['czas', 'id_dysku', 'id_klienta', 'rozmiar', 'czas_oczekiwania',
+                                         'czas_przydzialu'])
+
+
+# Klasa Dysku wirtualnego
+class DyskWirtualny:
+    def __init__(self, id_dysku, predkosc_przesylania):
+        self.id_dysku = id_dysku
+        self.predkosc_przesylania = predkosc_przesylania
+        self.aktywny_plik = None
+        self.aktualny_klient = None
+        self.postep_przesylania = 0
+        self.wycofany = False
+        self.proces = None
+        self.koniec_kroku = None  # chwila zakończenia bieżącego kroku przesyłania
+        self.pozostalo = None  # pozostały czas kroku zamrożony przez pauzę
+        self.wersja = 0  # unieważnia zaplanowany koniec kroku po pauzie
+
+
+# Klasa Symulacji zdarzeniowej
+class SymulacjaZdarzeniowa:
+    def __init__(self, predkosci_dyskow=None, aukcja=None, ziarno=None, rozmiar_segmentu=None):
+        self.czas = 0.0
+        self.los = random.Random(ziarno)
+        # Zegar czasu oczekiwania klientów - wirtualny czas bez pauz
+        self.zegar = ZegarSymulacji(lambda: self.czas, jednostka=1.0, wstrzymany=True)
+        self.aukcja = aukcja if aukcja is not None else AukcjaTurniejowa(zegar=self.zegar)
+        self.klienci = []
+        self.magazyn = MagazynKlientow(self.zegar)
+        if predkosci_dyskow is None:
+            predkosci_dyskow = [PROFILE_DYSKOW['hdd']] * 5
+        self.dyski = [DyskWirtualny(i, predkosc) for i, predkosc in enumerate(predkosci_dyskow)]
+        self.nastepny_id_dysku = len(self.dyski)
+        self.zakonczenia = []
+        self.czasy_przybycia = {}  # id klienta -> chwila przybycia
+        self.czy_aktywna = False
+        self.czy_aktywowana = False
+        # Podział plików większych niż rozmiar segmentu między dyski (bez - wyłączony)
+        self.podzialy = PodzialyPlikow(rozmiar_segmentu) if rozmiar_segmentu else None
+
+        self.zdarzenia = []  # kopiec (czas, numer, akcja)
+        self.numer_zdarzenia = 0
+        self.czekajace = set()  # dyski czekające na pracę lub wznowienie
+
+    def _zaplanuj(self, czas, akcja):
+        heapq.heappush(self.zdarzenia, (czas, self.numer_zdarzenia, akcja))
+        self.numer_zdarzenia += 1
+
+    # Zdarzenia zewnętrzne - odpowiedniki akcji z GUI
+    def dodaj_klienta(self, czas=0.0, pliki=None):
+        self._zaplanuj(czas, lambda: self._przybycie_klienta(pliki))
+
+    # Leniwy strumień par (czas, pliki) o niemalejących chwilach: następne
+    # przybycie jest pobierane ze strumienia dopiero przy obsłudze
+    # poprzedniego, więc w kolejce zdarzeń czeka najwyżej jedno
+    def dodaj_strumien_klientow(self, klienci):
+        klienci = iter(klienci)
+
+        def nastepny():
+            przybycie = next(klienci, None)
+            if przybycie is None:
+                return
+            czas, pliki = przybycie
+
+            def przybycie_klienta():
+                self._przybycie_klienta(pliki)
+                nastepny()
+            self._zaplanuj(czas, przybycie_klienta)
+        nastepny()
+
+    def rozpocznij_symulacje(self, czas=0.0):
+        self._zaplanuj(czas, self._rozpocznij)
+
+    def zatrzymaj_symulacje(self, czas):
+        self._zaplanuj(czas, self._zatrzymaj)
+
+    def dodaj_dysk(self, czas, predkosc_przesylania=PROFILE_DYSKOW['hdd']):
+        self._zaplanuj(czas, lambda: self._dodaj_dysk(predkosc_przesylania))
+
+    def usun_dysk(self, czas, id_dysku):
+        self._zaplanuj(czas, lambda: self._usun_dysk(id_dysku))
+
+    def _dodaj_dysk(self, predkosc_przesylania):
+        dysk = DyskWirtualny(self.nastepny_id_dysku, predkosc_przesylania)
+        self.nastepny_id_dysku += 1
+        self.dyski.append(dysk)
+        if self.czy_aktywowana:
+            self._uruchom_dysk(dysk)
+
+    # Jak Serwer.usun_dysk: dysk w trakcie przesyłania najpierw kończy plik
+    def _usun_dysk(self, id_dysku):
+        for dysk in self.dyski:
+            if dysk.id_dysku == id_dysku:
+                dysk.wycofany = True
+                if dysk.proces is None or dysk in self.czekajace:
+                    self.czekajace.discard(dysk)
+                    self.dyski.remove(dysk)
+                return
+
+    def _uruchom_dysk(self, dysk):
+        dysk.proces = self._proces_dysku(dysk)
+        self._wznow_proces(dysk)
+
+    def _przybycie_klienta(self, pliki):
+        klient = Klient(len(self.klienci) + 1, los=self.los, magazyn=self.magazyn, pliki=pliki)
+        self.klienci.append(klient)
+        self.czasy_przybycia[klient.id_klienta] = self.czas
+        klient.rozpocznij_odliczanie()
+        self.aukcja.dodaj_klienta(klient)
+        self._obudz()
+
+    def _rozpocznij(self):
+        self.zegar.wznow()
+        self.czy_aktywna = True
+        if not self.czy_aktywowana:
+            self.czy_aktywowana = True
+            for dysk in list(self.dyski):
+                self._uruchom_dysk(dysk)
+        for dysk in self.dyski:
+            if dysk.pozostalo is not None:
+                dysk.koniec_kroku = self.czas + dysk.pozostalo
+                dysk.pozostalo = None
+                self._zaplanuj_koniec_kroku(dysk)
+        self._obudz()
+
+    def _zatrzymaj(self):
+        self.czy_aktywna = False
+        for dysk in self.dyski:
+            if dysk.koniec_kroku is not None:
+                dysk.pozostalo = dysk.koniec_kroku - self.czas
+                dysk.koniec_kroku = None
+                dysk.wersja += 1
+        self.zegar.zatrzymaj()
+
+    def _obudz(self):
+        for dysk in sorted(self.czekajace, key=lambda d: d.id_dysku):
+            self._zaplanuj(self.czas, lambda d=dysk: self._wznow_proces(d))
+        self.czekajace.clear()
+
+    def _zaplanuj_koniec_kroku(self, dysk):
+        self._zaplanuj(dysk.koniec_kroku, lambda w=dysk.wersja: self._koniec_kroku(dysk, w))
+
+    def _koniec_kroku(self, dysk, wersja):
+        if wersja != dysk.wersja:
+            return
+        dysk.koniec_kroku = None
+        self._wznow_proces(dysk)
+
+    def _wznow_proces(self, dysk):
+        opoznienie = next(dysk.proces, None)
+        if opoznienie is None:
+            self.dyski.remove(dysk)
+        elif opoznienie == CZEKAJ_NA_PRACE:
+            self.czekajace.add(dysk)
+        else:
+            dysk.koniec_kroku = self.czas + opoznienie
+            self._zaplanuj_koniec_kroku(dysk)
+
+    def _przeslij(self, dysk, rozmiar):
+        czas_przesylania = rozmiar / dysk.predkosc_przesylania
+        for _ in range(KROKI_PRZESYLANIA):
+            yield czas_przesylania / KROKI_PRZESYLANIA
+            dysk.postep_przesylania += 100 // KROKI_PRZESYLANIA
+        dysk.postep_przesylania = 0
+
+    def _proces_dysku(self, dysk):
+        podzialy = self.podzialy
+        while not dysk.wycofany:
+            klient, plik, podzial, segment = None, None, None, None
+            while True:
+                if self.czy_aktywna:
+                    klient, plik = self.aukcja.przeprowadz_aukcje(dysk.predkosc_przesylania)
+                    if klient:
+                        break
+                    # Bez plików w aukcji dysk bierze segment cudzego pliku
+                    if podzialy and podzialy.czy_do_kradziezy():
+                        podzial, segment = podzialy.ukradnij()
+                        klient, plik = podzial.klient, podzial.rozmiar
+                        break
+                yield CZEKAJ_NA_PRACE
+            dysk.aktywny_plik = plik
+            dysk.aktualny_klient = klient
+            czas_przydzialu = self.czas
+            wlasciciel = podzial is None and podzialy is not None and podzialy.czy_podzielic(plik)
+            if wlasciciel:
+                podzial = podzialy.podziel(klient, plik, czas_przydzialu)
+                segment = podzialy.pobierz(podzial)
+                self._obudz()
+            if podzial is None:
+                yield from self._przeslij(dysk, plik)
+                self.zakonczenia.append(Zakonczenie(self.czas, dysk.id_dysku, klient.id_klienta, plik,
+                                                    klient.oblicz_czas_oczekiwania(), czas_przydzialu))
+            while segment:
+                yield from self._przeslij(dysk, segment[1])
+                # Zakończenie pliku odnotowuje dysk z ostatnim segmentem, z chwilą pierwszego przydziału
+                if podzial.zakoncz_segment():
+                    self.zakonczenia.append(Zakonczenie(self.czas, dysk.id_dysku, klient.id_klienta, plik,
+                                                        klient.oblicz_czas_oczekiwania(), podzial.czas_przydzialu))
+                segment = podzialy.pobierz(podzial) if wlasciciel else None
+            dysk.aktywny_plik = None
+            dysk.aktualny_klient = None
+
+    # Przetwarza zdarzenia do wyczerpania kolejki lub do podanego czasu
+    def uruchom(self, do_czasu=None):
+        while self.zdarzenia:
+            if do_czasu is not None and self.zdarzenia[0][0] > do_czasu:
+                self.czas = do_czasu
+                break
+            self.czas, _, akcja = heapq.heappop(self.zdarzenia)
+            akcja()
+        return self.zakonczenia
+
+    def czy_zakonczyc(self):
+        return all(not klient.pliki for klient in self.klienci)
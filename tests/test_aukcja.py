@@ -0,0 +1,149 @@
+import random
+
+import pytest
+
+from aukcja import AukcjaTurniejowa, AukcjaZPamieciaWynikow, aukcja_liniowa, aukcja_wsadowa, np
+from magazyn import MagazynKlientow, ZegarSymulacji
+from main import Klient, PROFILE_DYSKOW
+
+
+# Ręczne źródło zegara (nanosekundy) - czas płynie tylko przy przesun()
+class ZrodloReczne:
+    def __init__(self):
+        self.teraz = 0
+
+    def __call__(self):
+        return self.teraz
+
+    def przesun(self, sekundy):
+        self.teraz += int(sekundy * 1e9)
+
+
+SILNIKI = {
+    'turniejowa': lambda zegar: AukcjaTurniejowa(zegar=zegar),
+    'z pamięcią wyników': lambda zegar: AukcjaZPamieciaWynikow(zegar=zegar),
+    'z pamięcią wyników, bez numpy': lambda zegar: AukcjaZPamieciaWynikow(zegar=zegar, wektorowo=False),
+}
+
+
+# Dwie identyczne populacje klientów (wzorzec dla aukcji liniowej i kopia
+# dla silnika) w osobnych magazynach na wspólnym zegarze symulacji
+class Populacje:
+    def __init__(self, silnik, zegar, ziarno):
+        self.silnik = silnik
+        self.zegar = zegar
+        self.los = random.Random(ziarno)
+        self.wzorcowi = MagazynKlientow(zegar)
+        self.silnika = MagazynKlientow(zegar)
+        self.klienci_wzorcowi = []
+        self.klienci_silnika = []
+        self.liczba_plikow = 0
+
+    def dodaj(self, liczba):
+        for _ in range(liczba):
+            id_klienta = len(self.klienci_wzorcowi) + 1
+            ziarno = self.los.getrandbits(32)
+            wzorzec = Klient(id_klienta, los=random.Random(ziarno), magazyn=self.wzorcowi)
+            kopia = Klient(id_klienta, los=random.Random(ziarno), magazyn=self.silnika)
+            for klient in (wzorzec, kopia):
+                klient.rozpocznij_odliczanie()
+            self.klienci_wzorcowi.append(wzorzec)
+            self.klienci_silnika.append(kopia)
+            self.liczba_plikow += len(wzorzec.pliki)
+            self.silnik.dodaj_klienta(kopia)
+
+    # Zatrzymuje albo wznawia odliczanie wybranych klientów po obu stronach
+    def przelacz_odliczanie(self, indeksy):
+        for i in indeksy:
+            for klient in (self.klienci_wzorcowi[i], self.klienci_silnika[i]):
+                if klient.czy_odlicza():
+                    klient.zatrzymaj_odliczanie()
+                else:
+                    klient.rozpocznij_odliczanie()
+        self.silnik.odswiez()
+
+
+def licytuj(populacje, predkosc):
+    wzorzec_klient, wzorzec_plik = aukcja_liniowa(populacje.klienci_wzorcowi, predkosc)
+    klient, plik = populacje.silnik.przeprowadz_aukcje(predkosc)
+    wzorzec = (wzorzec_klient.id_klienta, wzorzec_plik) if wzorzec_klient else None
+    wynik = (klient.id_klienta, plik) if klient else None
+    return wzorzec, wynik
+
+
+@pytest.mark.parametrize('nazwa', SILNIKI)
+@pytest.mark.parametrize('ziarno', [1, 2, 3])
+def test_parytet_z_biegnacym_zegarem_i_pauzami(nazwa, ziarno):
+    zrodlo = ZrodloReczne()
+    zegar = ZegarSymulacji(zrodlo)
+    populacje = Populacje(SILNIKI[nazwa](zegar), zegar, ziarno)
+    los = random.Random(ziarno)
+    populacje.dodaj(200)
+    predkosci = list(PROFILE_DYSKOW.values())
+
+    runda = 0
+    while True:
+        wzorzec, wynik = licytuj(populacje, predkosci[runda % len(predkosci)])
+        assert wynik == wzorzec, f"runda {runda}"
+        if wzorzec is None:
+            break
+        runda += 1
+
+        # Zegar biegnie między aukcjami, a co jakiś czas cała symulacja stoi
+        zrodlo.przesun(los.uniform(0, 5))
+        if runda % 40 == 0:
+            zegar.zatrzymaj()
+            zrodlo.przesun(los.uniform(0, 600))
+        elif runda % 40 == 20:
+            zegar.wznow()
+        if runda % 25 == 0:
+            populacje.przelacz_odliczanie(los.sample(range(len(populacje.klienci_wzorcowi)), 30))
+        if runda % 100 == 0:
+            populacje.dodaj(10)
+    assert runda == populacje.liczba_plikow
+
+
+@pytest.mark.parametrize('nazwa', SILNIKI)
+def test_parytet_z_zamrozonym_zegarem(nazwa):
+    zegar = ZegarSymulacji(ZrodloReczne(), wstrzymany=True)
+    populacje = Populacje(SILNIKI[nazwa](zegar), zegar, 7)
+    populacje.dodaj(200)
+    # Równe czasy oczekiwania - o wyniku decydują rozmiary i remisy (niższy indeks)
+    while True:
+        wzorzec, wynik = licytuj(populacje, PROFILE_DYSKOW['ssd'])
+        assert wynik == wzorzec
+        if wzorzec is None:
+            break
+
+
+# Wektorowa aukcja wsadowa liczy pełne wyniki tylko dla próbki i kandydatów -
+# wybiera tych samych klientów co pętla w czystym Pythonie, także przy wielu
+# klientach, zatrzymanych odliczaniach i pauzach zegara
+@pytest.mark.skipif(np is None, reason="wymaga numpy")
+@pytest.mark.parametrize('ziarno', [1, 2])
+def test_aukcja_wsadowa_wektorowo_jak_w_pythonie(ziarno):
+    zrodlo = ZrodloReczne()
+    zegar = ZegarSymulacji(zrodlo)
+    los = random.Random(ziarno)
+    magazyn = MagazynKlientow(zegar)
+    klienci = [Klient(i + 1, los=los, magazyn=magazyn) for i in range(5000)]
+    for klient in klienci:
+        klient.czas_zatrzymania = los.uniform(0, 3600)
+        if los.random() < 0.7:
+            klient.rozpocznij_odliczanie()
+        zrodlo.przesun(0.01)
+    predkosci = list(PROFILE_DYSKOW.values())
+    for runda in range(60):
+        m = (1, 7, 40)[runda % 3]
+        predkosc = predkosci[runda % len(predkosci)]
+        wzorzec = aukcja_wsadowa(magazyn, m, predkosc, wektorowo=False)
+        wynik = aukcja_wsadowa(magazyn, m, predkosc)
+        assert [i for i, _ in wynik] == [i for i, _ in wzorzec], f"runda {runda}"
+        assert [w for _, w in wynik] == pytest.approx([w for _, w in wzorzec])
+        for i, _ in wynik:
+            klienci[i].pliki.pop(0)
+        zrodlo.przesun(los.uniform(0, 30))
+        if runda % 20 == 10:
+            zegar.zatrzymaj()
+        elif runda % 20 == 15:
+            zegar.wznow()
@@ -0,0 +1,19 @@
+import logging
+
+from dziennik import DziennikZdarzen, czytaj_dziennik
+
+
+# Wątek zapisujący przepisuje zakończenia i błędy plików do dziennika
+# tekstowego; pozostałe zdarzenia trafiają tylko do pliku JSON lines
+def test_wpisy_tekstowe_z_watku_zapisujacego(tmp_path, caplog):
+    sciezka = str(tmp_path / 'zdarzenia.jsonl')
+    with caplog.at_level(logging.INFO, logger='dziennik_testowy'):
+        with DziennikZdarzen(sciezka, log=logging.getLogger('dziennik_testowy')) as dziennik:
+            dziennik.zapisz('przydzial', 0.0, dysk=0, klient=1, plik=500)
+            dziennik.zapisz('zakonczenie', 1.0, dysk=0, klient=1, plik=500, trwanie=1.0)
+            dziennik.zapisz('blad', 2.0, dysk=1, klient=2, plik=700, blad="brak miejsca")
+    assert [(rekord.levelno, rekord.getMessage()) for rekord in caplog.records] == [
+        (logging.INFO, "Dysk 0: Zakończono przesyłanie pliku o rozmiarze 500"),
+        (logging.ERROR, "Dysk 1: Wystąpił błąd podczas przesyłania pliku - brak miejsca"),
+    ]
+    assert [zdarzenie['zdarzenie'] for zdarzenie in czytaj_dziennik(sciezka)] == ['przydzial', 'zakonczenie', 'blad']
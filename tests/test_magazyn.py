@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+import magazyn
+from magazyn import MagazynKlientow
+from main import Serwer
+from stan import ZapisStanu, wczytaj_stan
+
+
+def magazyn_z_dziurami(ziarno, liczba_klientow=2000):
+    los = random.Random(ziarno)
+    wynik = MagazynKlientow()
+    for i in range(liczba_klientow):
+        wynik.dodaj(i, sorted(los.randint(1, 10**9) for _ in range(los.randint(0, 6))))
+    for i in range(liczba_klientow):
+        for _ in range(los.randint(0, wynik.liczba_plikow(i))):
+            wynik.poczatki[i] += 1
+            wynik.zuzyte += 1
+    return wynik
+
+
+def pliki(magazyn_klientow):
+    return [magazyn_klientow.rozmiary[p:k].tolist() for p, k in zip(magazyn_klientow.poczatki, magazyn_klientow.konce)]
+
+
+@pytest.mark.parametrize('wektorowo', [True, False])
+def test_zagesc_zachowuje_pliki_klientow(monkeypatch, wektorowo):
+    if not wektorowo:
+        monkeypatch.setattr(magazyn, 'np', None)
+    elif magazyn.np is None:
+        pytest.skip("brak numpy")
+    zrodlo = magazyn_z_dziurami(1)
+    przed = pliki(zrodlo)
+    pokolenie = zrodlo.pokolenie
+    zrodlo.zagesc()
+    assert pliki(zrodlo) == przed
+    assert len(zrodlo.rozmiary) == sum(len(p) for p in przed)
+    assert zrodlo.zuzyte == 0 and zrodlo.pokolenie == pokolenie + 1
+    assert zrodlo.poczatki[0] == 0 and all(k == p for k, p in zip(zrodlo.konce, zrodlo.poczatki[1:]))
+
+
+def test_zagesc_bez_plikow():
+    zrodlo = MagazynKlientow()
+    zrodlo.dodaj(1, [])
+    zrodlo.dodaj(2, [5])
+    zrodlo.usun_plik(1)
+    zrodlo.zagesc()
+    assert pliki(zrodlo) == [[], []] and len(zrodlo.rozmiary) == 0
+
+
+def test_usun_plik_ze_srodka_nie_zmienia_pokolenia():
+    zrodlo = MagazynKlientow()
+    for i in range(10):
+        zrodlo.dodaj(i, [i * 10 + j for j in range(5)])
+    assert zrodlo.usun_plik(3, 2) == 32
+    assert zrodlo.usun_plik(3, -1) == 34
+    assert zrodlo.usun_plik(4, 0) == 40
+    assert pliki(zrodlo)[3:5] == [[30, 31, 33], [41, 42, 43, 44]]
+    assert zrodlo.pokolenie == 0
+    with pytest.raises(IndexError):
+        zrodlo.usun_plik(3, 3)
+
+
+# Zapis przyrostowy po zdjęciu pliku ze środka dopisuje tylko nowe pozycje
+def test_zapis_przyrostowy_po_zdjeciu_ze_srodka(tmp_path):
+    sciezka = str(tmp_path / 'stan')
+    serwer = Serwer(ziarno=3, predkosci_dyskow=[])
+    for _ in range(50):
+        serwer.dodaj_klienta()
+    zapis = ZapisStanu(serwer, sciezka)
+    zapis.zapisz()
+    numer = zapis.numer
+    klient = next(klient for klient in serwer.klienci if len(klient.pliki) > 2)
+    klient.pliki.pop(1)
+    zapis.zapisz()
+    assert zapis.numer == numer
+    assert zapis.dopisane == len(klient.pliki)
+    wczytany = wczytaj_stan(sciezka)
+    assert [list(k.pliki) for k in wczytany.klienci] == [list(k.pliki) for k in serwer.klienci]
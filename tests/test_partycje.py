@@ -0,0 +1,41 @@
+import random
+
+from aukcja import aukcja_liniowa
+from magazyn import MagazynKlientow, ZegarSymulacji
+from main import Klient, PROFILE_DYSKOW
+from partycje import AukcjaPartycjonowana, granice_bloku
+
+
+# Bloki procesów pokrywają wszystkich klientów, każdego raz i po kolei
+def test_bloki_pokrywaja_klientow():
+    for liczba in (1, 2, 3, 7):
+        for n in (0, 1, 5, 100, 1001):
+            bloki = [granice_bloku(numer, liczba, n) for numer in range(liczba)]
+            assert [i for poczatek, koniec in bloki for i in range(poczatek, koniec)] == list(range(n))
+
+
+# Aukcja w trzech procesach wybiera tych samych zwycięzców co aukcja liniowa,
+# także po powiększeniu pamięci współdzielonej
+def test_zgodnosc_z_aukcja_liniowa():
+    los = random.Random(3)
+    zegar = ZegarSymulacji()
+    magazyn_wzorcowy = MagazynKlientow(zegar)
+    wzorcowi = [Klient(i + 1, los=los, magazyn=magazyn_wzorcowy) for i in range(200)]
+    magazyn = MagazynKlientow(zegar)
+    klienci = [Klient(klient.id_klienta, magazyn=magazyn, pliki=klient.pliki) for klient in wzorcowi]
+    liczba_plikow = sum(len(klient.pliki) for klient in wzorcowi)
+    predkosci = list(PROFILE_DYSKOW.values())
+    with AukcjaPartycjonowana(3, pojemnosc=16) as silnik:
+        for klient in klienci:
+            silnik.dodaj_klienta(klient)
+        runda = 0
+        while True:
+            predkosc = predkosci[runda % len(predkosci)]
+            wzorzec_klient, wzorzec_plik = aukcja_liniowa(wzorcowi, predkosc)
+            klient, plik = silnik.przeprowadz_aukcje(predkosc)
+            if wzorzec_klient is None:
+                assert klient is None
+                break
+            assert (klient.id_klienta, plik) == (wzorzec_klient.id_klienta, wzorzec_plik)
+            runda += 1
+    assert runda == liczba_plikow
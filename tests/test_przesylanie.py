@@ -0,0 +1,97 @@
+import errno
+import filecmp
+import os
+
+import pytest
+
+from main import Dysk
+from przesylanie import KopiaPliku, KopiaZeroKopii
+
+ROZMIAR = 300 * 1024 + 17
+PORCJA = 64 * 1024
+
+
+# Dysk bez serwera (pomiary w benchmark.py) mierzy czas zegarem monotonicznym
+def test_dysk_bez_serwera_kopiuje_plik(tmp_path):
+    zrodlo = tmp_path / 'zrodlo'
+    cel = tmp_path / 'cel'
+    zrodlo.write_bytes(os.urandom(300 * 1024))
+    dysk = Dysk(0, None, 100 * 10**6, 64 * 1024)
+    dysk.przeslij_plik(300 * 1024, KopiaPliku(zrodlo, cel))
+    assert filecmp.cmp(zrodlo, cel, shallow=False)
+    assert dysk.przesylanie.przeslano == 300 * 1024
+
+
+def _zrodlo(tmp_path):
+    zrodlo = tmp_path / 'zrodlo'
+    zrodlo.write_bytes(os.urandom(ROZMIAR))
+    return zrodlo
+
+
+# Porcje w odwrotnej kolejności - każda metoda pisze pod swoim przesunięciem
+def _kopiuj_od_konca(kopia):
+    for przesuniecie in reversed(range(0, ROZMIAR, PORCJA)):
+        kopia.przeslij(przesuniecie, min(PORCJA, ROZMIAR - przesuniecie))
+    kopia.zamknij()
+
+
+def _awaria(numer_bledu):
+    def wywolanie(*argumenty):
+        raise OSError(numer_bledu, os.strerror(numer_bledu))
+    return wywolanie
+
+
+# Każda wymuszona metoda daje wierną kopię, a cel ma pełny rozmiar od chwili utworzenia
+@pytest.mark.parametrize('metoda', KopiaZeroKopii.METODY)
+def test_kopia_zero_kopii_wymuszona_metoda(tmp_path, metoda):
+    if metoda != 'mmap' and not hasattr(os, metoda):
+        pytest.skip(f"brak os.{metoda}")
+    zrodlo, cel = _zrodlo(tmp_path), tmp_path / 'cel'
+    kopia = KopiaZeroKopii(zrodlo, cel, metoda=metoda)
+    assert os.path.getsize(cel) == ROZMIAR
+    assert kopia.metoda == metoda
+    _kopiuj_od_konca(kopia)
+    assert filecmp.cmp(zrodlo, cel, shallow=False)
+
+
+# Bez posix_fallocate (np. system plików bez jego obsługi) prealokacja przez ftruncate
+def test_prealokacja_bez_fallocate(tmp_path, monkeypatch):
+    monkeypatch.setattr(os, 'posix_fallocate', _awaria(errno.EOPNOTSUPP), raising=False)
+    zrodlo, cel = _zrodlo(tmp_path), tmp_path / 'cel'
+    kopia = KopiaZeroKopii(zrodlo, cel)
+    assert os.path.getsize(cel) == ROZMIAR
+    _kopiuj_od_konca(kopia)
+    assert filecmp.cmp(zrodlo, cel, shallow=False)
+
+
+# Wywołanie systemowe nieobsługiwane dla pary plików przełącza na następną metodę
+@pytest.mark.parametrize('awarie, metoda', [
+    (('copy_file_range',), 'sendfile'),
+    (('copy_file_range', 'sendfile'), 'mmap'),
+])
+@pytest.mark.parametrize('numer_bledu', [errno.EXDEV, errno.ENOSYS])
+def test_kopia_zero_kopii_przechodzi_na_nastepna_metode(tmp_path, monkeypatch, awarie, metoda, numer_bledu):
+    for nazwa in awarie:
+        monkeypatch.setattr(os, nazwa, _awaria(numer_bledu), raising=False)
+    zrodlo, cel = _zrodlo(tmp_path), tmp_path / 'cel'
+    kopia = KopiaZeroKopii(zrodlo, cel)
+    _kopiuj_od_konca(kopia)
+    assert kopia.metoda == metoda
+    assert filecmp.cmp(zrodlo, cel, shallow=False)
+
+
+# Inne błędy (np. wejścia-wyjścia) i błąd ostatniej metody nie są ukrywane
+def test_kopia_zero_kopii_nie_ukrywa_bledow(tmp_path, monkeypatch):
+    monkeypatch.setattr(os, 'copy_file_range', _awaria(errno.EIO), raising=False)
+    kopia = KopiaZeroKopii(_zrodlo(tmp_path), tmp_path / 'cel')
+    with pytest.raises(OSError) as blad:
+        kopia.przeslij(0, PORCJA)
+    assert blad.value.errno == errno.EIO
+    kopia.zamknij()
+
+    monkeypatch.setattr(os, 'pwrite', _awaria(errno.ENOSYS))
+    kopia = KopiaZeroKopii(_zrodlo(tmp_path), tmp_path / 'cel2', metoda='mmap')
+    with pytest.raises(OSError) as blad:
+        kopia.przeslij(0, PORCJA)
+    assert blad.value.errno == errno.ENOSYS
+    kopia.zamknij()
@@ -0,0 +1,156 @@
+import filecmp
+import functools
+import glob
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from aukcja import AukcjaLiniowa, POLITYKI
+from main import Dysk, PROFILE_DYSKOW, Serwer
+from przesylanie import FabrykaKopii, KopiaPliku, KopiaZeroKopii
+
+
+# Testy obciążeniowe (rozmiary z zadania) uruchamiane tylko na życzenie: STRES=1
+stres = pytest.mark.skipif(os.environ.get('STRES') != '1', reason="test obciążeniowy - uruchom z STRES=1")
+
+
+@pytest.fixture
+def szybkie_przelaczanie():
+    przelaczanie = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # częste przełączanie wątków ujawnia wyścigi
+    yield
+    sys.setswitchinterval(przelaczanie)
+
+
+def serwer_z_plikami(liczba_plikow, **opcje):
+    serwer = Serwer(**opcje)
+    oczekiwane = Counter()
+    while sum(oczekiwane.values()) < liczba_plikow:
+        klient = serwer.dodaj_klienta()
+        oczekiwane.update((klient.id_klienta, plik) for plik in klient.pliki)
+    return serwer, oczekiwane
+
+
+# Równoległe aukcje z wielu wątków - każdy plik przydzielony dokładnie raz
+@pytest.mark.parametrize('liczba_watkow, liczba_plikow',
+                         [(2, 3000), (8, 3000), pytest.param(64, 100000, marks=stres)])
+def test_rownolegly_przydzial_bez_strat_i_duplikatow(szybkie_przelaczanie, liczba_watkow, liczba_plikow):
+    serwer, oczekiwane = serwer_z_plikami(liczba_plikow, ziarno=liczba_watkow)
+    przydzielone = [[] for _ in range(liczba_watkow)]
+    bledy = []
+
+    def pracuj(wynik):
+        try:
+            while True:
+                klient, plik = serwer.przydziel_plik()
+                if not klient:
+                    break
+                wynik.append((klient.id_klienta, plik))
+        except Exception as e:
+            bledy.append(e)
+
+    watki = [threading.Thread(target=pracuj, args=(wynik,)) for wynik in przydzielone]
+    for watek in watki:
+        watek.start()
+    for watek in watki:
+        watek.join()
+
+    assert not bledy
+    assert Counter(plik for wynik in przydzielone for plik in wynik) == oczekiwane
+    assert serwer.pliki_w_kolejce == 0
+
+
+# Zapisuje zakończenia plików z dziennika dysków
+class Zakonczenia:
+    def __init__(self):
+        self.pliki = []
+
+    def zapisz(self, zdarzenie, czas, **pola):
+        if zdarzenie == 'zakonczenie':
+            self.pliki.append((pola['klient'], pola['plik']))
+
+
+# Pełna ścieżka wątków dysków: każdy plik przesłany dokładnie raz, także
+# przy aukcji wsadowej i przy podziale plików na segmenty kradzione przez dyski
+@pytest.mark.parametrize('opcje', [{}, {'przydzial_wsadowy': True}, {'rozmiar_segmentu': 100 * 10**6}],
+                         ids=['aukcja', 'wsadowa', 'segmenty'])
+def test_dyski_przesylaja_kazdy_plik_raz(szybkie_przelaczanie, opcje):
+    zakonczenia = Zakonczenia()
+    serwer, oczekiwane = serwer_z_plikami(300, ziarno=5, predkosci_dyskow=[10**12] * 6, dziennik=zakonczenia,
+                                          **opcje)
+    for dysk in serwer.dyski:
+        dysk.rozmiar_porcji = 64 * 10**6
+    serwer.rozpocznij_symulacje()
+    koniec = time.monotonic() + 60
+    while Counter(zakonczenia.pliki) != oczekiwane and time.monotonic() < koniec:
+        time.sleep(0.01)
+    assert serwer.zatrzymaj_dyski(limit_czasu=5.0) == []
+    assert Counter(zakonczenia.pliki) == oczekiwane
+
+
+KOPIE = {'KopiaPliku': KopiaPliku}
+KOPIE.update((f'KopiaZeroKopii-{metoda}', functools.partial(KopiaZeroKopii, metoda=metoda))
+             for metoda in KopiaZeroKopii.METODY if metoda == 'mmap' or hasattr(os, metoda))
+
+
+# Segmenty pliku przesyłane przez kilka dysków do jednej kopii składają się
+# w plik identyczny ze źródłem przy każdym sposobie kopiowania
+@pytest.mark.parametrize('kopia', list(KOPIE))
+def test_segmenty_skladaja_sie_w_kopie(tmp_path, kopia):
+    fabryka = FabrykaKopii(tmp_path / 'zrodla', tmp_path / 'cele', kopia=KOPIE[kopia])
+    zakonczenia = Zakonczenia()
+    serwer = Serwer(predkosci_dyskow=[20 * 10**6] * 4, fabryka_kopii=fabryka, rozmiar_segmentu=10**6,
+                    dziennik=zakonczenia)
+    klienci = [serwer.dodaj_klienta([4 * 10**6]), serwer.dodaj_klienta([2500 * 1000 + 17])]
+    for klient in klienci:
+        fabryka.przygotuj_zrodla(klient)
+    oczekiwane = Counter((klient.id_klienta, klient.pliki[0]) for klient in klienci)
+    serwer.rozpocznij_symulacje()
+    koniec = time.monotonic() + 60
+    while Counter(zakonczenia.pliki) != oczekiwane and time.monotonic() < koniec:
+        time.sleep(0.01)
+    assert serwer.zatrzymaj_dyski(limit_czasu=5.0) == []
+    assert Counter(zakonczenia.pliki) == oczekiwane
+    for id_klienta, rozmiar in oczekiwane:
+        cel, = glob.glob(str(tmp_path / 'cele' / '*' / f'klient_{id_klienta}_{rozmiar}_*'))
+        zrodlo = tmp_path / 'zrodla' / f'klient_{id_klienta}' / str(rozmiar)
+        assert filecmp.cmp(zrodlo, cel, shallow=False)
+
+
+# Klient z podanymi plikami nie losuje własnych: nie zużywa generatora
+# serwera ani pozycji w tablicy rozmiarów magazynu
+def test_klient_z_podanymi_plikami():
+    serwer, wzorzec = Serwer(ziarno=4), Serwer(ziarno=4)
+    klient = serwer.dodaj_klienta([30, 10, 20])
+    assert list(klient.pliki) == [10, 20, 30]
+    assert list(serwer.dodaj_klienta().pliki) == list(wzorzec.dodaj_klienta().pliki)
+    assert serwer.magazyn.zuzyte == 0
+
+
+# Przydział wsadowy dla jednego dysku wybiera tak samo jak aukcja silnika,
+# także przy polityce innej niż domyślna
+@pytest.mark.parametrize('nazwa', list(POLITYKI))
+@pytest.mark.parametrize('wektorowo', [True, False])
+def test_przydzial_wsadowy_z_polityka_silnika(monkeypatch, nazwa, wektorowo):
+    if not wektorowo:
+        monkeypatch.setattr('aukcja.np', None)
+    wzorzec = Serwer(ziarno=5, aukcja=AukcjaLiniowa(POLITYKI[nazwa]))
+    serwer = Serwer(ziarno=5, aukcja=AukcjaLiniowa(POLITYKI[nazwa]))
+    los = random.Random(5)
+    for _ in range(50):
+        czas = los.uniform(0, 3600)
+        wzorzec.dodaj_klienta().czas_zatrzymania = czas
+        serwer.dodaj_klienta().czas_zatrzymania = czas
+    dysk = Dysk(0, None, PROFILE_DYSKOW['ssd'])
+    while True:
+        klient, plik = wzorzec.przydziel_plik(dysk.predkosc_przesylania)
+        przydzialy = serwer.przydziel_pliki([dysk])
+        if klient is None:
+            assert przydzialy == []
+            break
+        assert [(wybrany.id_klienta, rozmiar) for _, wybrany, rozmiar in przydzialy] == [(klient.id_klienta, plik)]
@@ -0,0 +1,46 @@
+import asyncio
+import tkinter as tk
+
+import pytest
+
+from main import GUI, opis_dysku
+from serwer_async import SerwerAsync
+
+
+async def _czekaj_na_przesylanie(serwer):
+    while not any(dysk.aktywny_plik for dysk in serwer.dyski):
+        await asyncio.sleep(0.001)
+
+
+def test_opis_dysku_async_w_trakcie_przesylania():
+    async def przebieg():
+        serwer = SerwerAsync(ziarno=1, predkosci_dyskow=[10**6] * 2)
+        assert opis_dysku(serwer.dyski[0]) == "Dysk 0 [1MB/s]: Wolny"
+        serwer.dodaj_klienta()
+        serwer.rozpocznij_symulacje()
+        await asyncio.wait_for(_czekaj_na_przesylanie(serwer), 5)
+        dysk = next(dysk for dysk in serwer.dyski if dysk.aktywny_plik)
+        assert f"Klient 1, {dysk.aktywny_plik // 10**6}MB" in opis_dysku(dysk)
+        await serwer.zamknij()
+
+    asyncio.run(przebieg())
+
+
+def test_gui_nad_serwerem_async():
+    try:
+        tk.Tk().destroy()
+    except tk.TclError:
+        pytest.skip("brak ekranu dla Tk")
+
+    async def przebieg():
+        serwer = SerwerAsync(ziarno=1, predkosci_dyskow=[10**6] * 2)
+        gui = GUI(serwer)
+        gui.dodaj_klienta()
+        gui.rozpocznij_symulacje()
+        await asyncio.wait_for(_czekaj_na_przesylanie(serwer), 5)
+        gui.aktualizuj_interfejs()
+        assert any("Klient 1" in label.cget("text") for label in gui.labels_dyski)
+        gui.root.destroy()
+        await serwer.zamknij()
+
+    asyncio.run(przebieg())
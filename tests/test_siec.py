@@ -0,0 +1,94 @@
+import asyncio
+from collections import Counter
+
+from main import PROFILE_DYSKOW, Serwer
+from siec import BLAD, GOTOWE, PRZYJETO, ZAKONCZENIE, PolaczenieProducenta, WatekWejscia, ramka_zgloszenia
+
+
+# Dziennik zliczający zdarzenia dysków
+class Licznik:
+    def __init__(self):
+        self.zdarzenia = Counter()
+
+    def zapisz(self, zdarzenie, czas, **pola):
+        self.zdarzenia[zdarzenie] += 1
+
+
+# Kopia, której każdy zapis porcji kończy się błędem
+class ZepsutaKopia:
+    def przeslij(self, przesuniecie, ile):
+        raise OSError("dysk docelowy niedostępny")
+
+    def zamknij(self):
+        pass
+
+
+# Wysyła zgłoszenia jedno za drugim; `przed_koncem` wywoływane po `czekaj` s,
+# zanim zacznie się czekanie na GOTOWE wszystkich zgłoszeń
+async def _zglos(adres, zgloszenia, czekaj=0.0, przed_koncem=None):
+    odpowiedzi = Counter()
+    koniec = asyncio.Event()
+
+    def odbierz(rodzaj, numer, *pola):
+        odpowiedzi[rodzaj] += 1
+        if odpowiedzi[GOTOWE] == len(zgloszenia):
+            koniec.set()
+
+    producent = await PolaczenieProducenta.polacz(odbierz, port=adres[1])
+    for numer, pliki in enumerate(zgloszenia):
+        producent.pisarz.write(ramka_zgloszenia(numer, pliki))
+    await asyncio.sleep(czekaj)
+    if przed_koncem:
+        przed_koncem()
+    await asyncio.wait_for(koniec.wait(), 60)
+    await producent.zamknij()
+    return odpowiedzi
+
+
+def _serwer(**opcje):
+    return Serwer(ziarno=0, predkosci_dyskow=[PROFILE_DYSKOW['nvme'] * 1000] * 4, **opcje)
+
+
+# Błąd kilku segmentów podzielonego pliku daje jedno BLAD i kończy zgłoszenie
+# dopiero po ostatnim segmencie
+def test_blad_segmentow_raz_na_plik():
+    licznik = Licznik()
+    serwer = _serwer(rozmiar_segmentu=1000, dziennik=licznik,
+                     fabryka_kopii=lambda dysk, klient, plik: ZepsutaKopia())
+    serwer.rozpocznij_symulacje()
+    wejscie = WatekWejscia(serwer, port=0)
+    adres = wejscie.uruchom()
+    try:
+        odpowiedzi = asyncio.run(_zglos(adres, [[10000, 500], [8000]]))
+    finally:
+        wejscie.zatrzymaj()
+        serwer.zatrzymaj_dyski(limit_czasu=5.0)
+    assert odpowiedzi[PRZYJETO] == 2
+    assert odpowiedzi[BLAD] == 3
+    assert odpowiedzi[ZAKONCZENIE] == 0
+    assert odpowiedzi[GOTOWE] == 2
+    assert licznik.zdarzenia['blad'] == 3
+
+
+# Wstrzymanie liczy pliki: zgłoszenie, które nie mieści się pod limitem,
+# czeka, więc kolejka nie przekracza limitu o rozmiar ramki
+def test_wstrzymanie_na_pliki_zgloszenia():
+    serwer = _serwer()
+    wejscie = WatekWejscia(serwer, port=0, gorny_limit=100)
+    adres = wejscie.uruchom()
+    w_kolejce = []
+
+    def wznow():
+        w_kolejce.append(serwer.pliki_w_kolejce)
+        serwer.rozpocznij_symulacje()
+
+    try:
+        odpowiedzi = asyncio.run(_zglos(adres, [[1000] * 30] * 10 + [[1000] * 150], czekaj=0.5,
+                                        przed_koncem=wznow))
+    finally:
+        wejscie.zatrzymaj()
+        serwer.zatrzymaj_dyski(limit_czasu=5.0)
+    assert w_kolejce == [90]
+    assert wejscie.wejscie.wstrzymania >= 1
+    assert odpowiedzi[GOTOWE] == 11
+    assert odpowiedzi[ZAKONCZENIE] == 450
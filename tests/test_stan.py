@@ -0,0 +1,156 @@
+import filecmp
+import glob
+import sys
+import time
+
+import pytest
+
+from main import Serwer
+from przesylanie import FabrykaKopii
+from stan import ZapisStanu, wczytaj_stan
+
+
+# Pliki czekające w serwerze: (id klienta, rozmiar) z kolejek klientów
+# i z plików przydzielonych dyskom, z postępem przesyłania
+def pliki_serwera(serwer):
+    pliki = {(klient.id_klienta, plik): 0 for klient in serwer.klienci for plik in klient.pliki}
+    for dysk in serwer.dyski:
+        if dysk.przydzial:
+            klient, plik = dysk.przydzial
+            pliki[(klient.id_klienta, plik)] = dysk.wznowienie
+    return pliki
+
+
+# Dziennik, którego zapis przydziału trwa - poszerza okno między przydziałem
+# pliku a początkiem przesyłania, w którym zapis stanu mógłby zgubić plik
+class WolnyDziennik:
+    def zapisz(self, zdarzenie, czas, **pola):
+        if zdarzenie == 'przydzial':
+            time.sleep(0.002)
+
+
+@pytest.fixture
+def szybkie_przelaczanie():
+    przelaczanie = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # częste przełączanie wątków ujawnia wyścigi
+    yield
+    sys.setswitchinterval(przelaczanie)
+
+
+def test_zapis_w_trakcie_przesylania_nie_gubi_plikow(tmp_path, szybkie_przelaczanie):
+    sciezka = str(tmp_path / 'stan')
+    serwer = Serwer(ziarno=1, predkosci_dyskow=[10**9] * 4, dziennik=WolnyDziennik())
+    for i in range(200):
+        serwer.dodaj_klienta([i * 1000 + j for j in range(1, 6)])
+    wszystkie = pliki_serwera(serwer)
+    zapis = ZapisStanu(serwer, sciezka)
+    serwer.rozpocznij_symulacje()
+
+    # Pliki tylko opuszczają serwer, więc każdy kolejny zapis zawiera podzbiór
+    # poprzedniego; plik zgubiony w chwili przejścia z aukcji na dysk
+    # zniknąłby z zapisu i pojawił się w następnym
+    poprzednie = wszystkie
+    zapisy = 0
+    koniec = time.monotonic() + 30
+    while poprzednie and time.monotonic() < koniec:
+        zapis.zapisz()
+        pliki = pliki_serwera(wczytaj_stan(sciezka))
+        assert pliki.keys() <= poprzednie.keys()
+        for plik, przeslano in pliki.items():
+            assert przeslano <= plik[1]
+        poprzednie = pliki
+        zapisy += 1
+    assert not poprzednie
+    assert zapisy > 10
+    assert serwer.zatrzymaj_dyski(limit_czasu=5.0) == []
+
+
+def test_wczytany_stan_konczy_przerwane_przesylania(tmp_path):
+    sciezka = str(tmp_path / 'stan')
+    serwer = Serwer(ziarno=2, predkosci_dyskow=[10**8] * 3)
+    for i in range(20):
+        serwer.dodaj_klienta([i * 10**6 + j * 10**5 for j in range(1, 4)])
+    serwer.rozpocznij_symulacje()
+    while not all(dysk.przesylanie and dysk.przesylanie.przeslano for dysk in serwer.dyski):
+        time.sleep(0.001)
+    serwer.zatrzymaj_dyski(limit_czasu=5.0)
+    ZapisStanu(serwer, sciezka).zapisz()
+
+    wczytany = wczytaj_stan(sciezka)
+    pliki = pliki_serwera(wczytany)
+    assert len(pliki) == serwer.pliki_w_kolejce + len(serwer.dyski)
+    assert sum(1 for przeslano in pliki.values() if przeslano) == len(serwer.dyski)
+    wczytany.rozpocznij_symulacje()
+    koniec = time.monotonic() + 30
+    while (not wczytany.czy_zakonczyc() or any(dysk.aktywny_plik for dysk in wczytany.dyski)) \
+            and time.monotonic() < koniec:
+        time.sleep(0.01)
+    assert wczytany.czy_zakonczyc()
+    assert not any(dysk.aktywny_plik for dysk in wczytany.dyski)
+    wczytany.zatrzymaj_dyski(limit_czasu=5.0)
+
+
+# Dziennik postępu i zakończeń plików
+class Postep:
+    def __init__(self):
+        self.konce = []  # koniec każdej przesłanej porcji (bajty od początku pliku)
+        self.zakonczenia = []
+
+    def zapisz(self, zdarzenie, czas, **pola):
+        if zdarzenie == 'postep':
+            self.konce.append(pola['przeslano'])
+        elif zdarzenie == 'zakonczenie':
+            self.zakonczenia.append((pola['klient'], pola['plik']))
+
+
+# Nieukończone przedziały podzielonych plików odtworzonego serwera
+def przedzialy(serwer):
+    wynik = [dysk.segment for dysk in serwer.dyski if dysk.podzial]
+    for podzial in {id(dysk.podzial): dysk.podzial for dysk in serwer.dyski if dysk.podzial}.values():
+        wynik.extend(podzial.segmenty)
+    return sorted(wynik)
+
+
+# Plik dzielony między dyski w chwili zapisu wraca jako jeden plik: segmenty
+# przesłane przed zapisem nie są powtarzane, a plik kończy się raz i w całości
+@pytest.mark.parametrize('kopia', [False, True], ids=['model', 'kopia'])
+def test_wczytany_stan_konczy_podzielony_plik(tmp_path, kopia):
+    sciezka = str(tmp_path / 'stan')
+    rozmiar, segment = 8 * 10**6, 10**6
+    fabryka = FabrykaKopii(tmp_path / 'zrodla', tmp_path / 'cele') if kopia else None
+    postep = Postep()
+    serwer = Serwer(predkosci_dyskow=[4 * 10**6] * 3, rozmiar_segmentu=segment, dziennik=postep,
+                    fabryka_kopii=fabryka)
+    klient = serwer.dodaj_klienta([rozmiar])
+    if kopia:
+        fabryka.przygotuj_zrodla(klient)
+    serwer.rozpocznij_symulacje()
+    koniec = time.monotonic() + 30
+    while not all(dysk.podzial and dysk.przesylanie and dysk.przesylanie.przeslano for dysk in serwer.dyski) \
+            and time.monotonic() < koniec:
+        time.sleep(0.001)
+    serwer.zatrzymaj_dyski(limit_czasu=5.0)
+    ZapisStanu(serwer, sciezka).zapisz()
+    przeslane = {}  # segment -> bajty przesłane przed zapisem
+    for koniec_porcji in postep.konce:
+        numer = (koniec_porcji - 1) // segment
+        przeslane[numer] = max(przeslane.get(numer, 0), koniec_porcji - numer * segment)
+    assert not postep.zakonczenia and len(przeslane) >= 3
+
+    odnowiony = Postep()
+    opcje = {'fabryka_kopii': FabrykaKopii(tmp_path / 'zrodla', tmp_path / 'cele_po_wczytaniu')} if kopia else {}
+    wczytany = wczytaj_stan(sciezka, rozmiar_segmentu=segment, dziennik=odnowiony, **opcje)
+    if not kopia:
+        reszta = przedzialy(wczytany)
+        for (poczatek, ile), (nastepny, _) in zip(reszta, reszta[1:]):
+            assert poczatek + ile <= nastepny
+        assert sum(ile for _, ile in reszta) == rozmiar - sum(przeslane.values())
+    wczytany.rozpocznij_symulacje()
+    koniec = time.monotonic() + 30
+    while not odnowiony.zakonczenia and time.monotonic() < koniec:
+        time.sleep(0.01)
+    assert wczytany.zatrzymaj_dyski(limit_czasu=5.0) == []
+    assert odnowiony.zakonczenia == [(klient.id_klienta, rozmiar)]
+    if kopia:
+        cel, = glob.glob(str(tmp_path / 'cele_po_wczytaniu' / '*' / f'klient_{klient.id_klienta}_{rozmiar}_*'))
+        assert filecmp.cmp(fabryka.sciezka_zrodla(klient, rozmiar), cel, shallow=False)
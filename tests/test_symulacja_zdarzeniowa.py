@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from krokowy import TrybKrokowy
+from main import PROFILE_DYSKOW, Serwer
+from symulacja_zdarzeniowa import SymulacjaZdarzeniowa
+
+PREDKOSCI = [PROFILE_DYSKOW['hdd'], PROFILE_DYSKOW['ssd'], PROFILE_DYSKOW['hdd'] * 3]
+
+
+# Zakończenia plików z dziennika serwera: (czas, dysk, klient, rozmiar).
+# Dziennik dostaje czas symulacji bez pauz, symulacja zdarzeniowa podaje
+# czas wirtualny z pauzami - ten odczytujemy z trybu krokowego.
+class Zakonczenia:
+    def __init__(self, zegar):
+        self.zegar = zegar
+        self.pliki = []
+
+    def zapisz(self, zdarzenie, czas, **pola):
+        if zdarzenie == 'zakonczenie':
+            self.pliki.append((self.zegar(), pola['dysk'], pola['klient'], pola['plik']))
+
+
+# Ten sam scenariusz dla obu modeli: akcje (chwila, nazwa metody)
+def scenariusz(ziarno, pauzy):
+    los = random.Random(ziarno)
+    akcje = [(0.0, 'dodaj_klienta')] * 8 + [(0.0, 'rozpocznij_symulacje')]
+    akcje += [(los.uniform(0, 120), 'dodaj_klienta') for _ in range(30)]
+    if pauzy:
+        for start in (15.0, 45.0, 90.0):
+            akcje += [(start, 'zatrzymaj_symulacje'), (start + los.uniform(1, 20), 'rozpocznij_symulacje')]
+    return sorted(akcje, key=lambda akcja: akcja[0])
+
+
+def przebieg_zdarzeniowy(ziarno, akcje, **opcje):
+    symulacja = SymulacjaZdarzeniowa(PREDKOSCI, ziarno=ziarno, **opcje)
+    for czas, nazwa in akcje:
+        getattr(symulacja, nazwa)(czas)
+    return [(z.czas, z.id_dysku, z.id_klienta, z.rozmiar) for z in symulacja.uruchom()]
+
+
+def przebieg_watkowy(ziarno, akcje, **opcje):
+    krokowy = TrybKrokowy()
+    zakonczenia = Zakonczenia(krokowy.teraz)
+    serwer = Serwer(ziarno=ziarno, predkosci_dyskow=PREDKOSCI, dziennik=zakonczenia, krokowy=krokowy, **opcje)
+    for dysk in serwer.dyski:
+        dysk.rozmiar_porcji = 16 * 10**6  # mniej kroków wątków, ten sam czas przesyłania
+    for czas, nazwa in akcje:
+        krokowy.zaplanuj(czas, getattr(serwer, nazwa))
+    krokowy.uruchom()
+    krokowy.zamknij()
+    assert serwer.zatrzymaj_dyski(limit_czasu=5.0) == []
+    return zakonczenia.pliki
+
+
+@pytest.mark.parametrize('pauzy', [False, True], ids=['bez pauz', 'z pauzami'])
+@pytest.mark.parametrize('opcje', [{}, {'rozmiar_segmentu': 128 * 10**6}], ids=['pliki', 'segmenty'])
+@pytest.mark.parametrize('ziarno', [1, 2])
+def test_symulacja_zdarzeniowa_zgodna_z_serwerem(ziarno, opcje, pauzy):
+    akcje = scenariusz(ziarno, pauzy)
+    zdarzeniowe = przebieg_zdarzeniowy(ziarno, akcje, **opcje)
+    watkowe = przebieg_watkowy(ziarno, akcje, **opcje)
+    assert len(watkowe) == len(zdarzeniowe) > 150
+    # Te same przydziały w tej samej kolejności, chwile zakończeń z dokładnością zaokrągleń
+    assert [z[1:] for z in watkowe] == [z[1:] for z in zdarzeniowe]
+    for (czas, *_), (wzorzec, *_) in zip(watkowe, zdarzeniowe):
+        assert czas == pytest.approx(wzorzec, rel=1e-9, abs=1e-6)